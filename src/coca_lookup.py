@@ -6,17 +6,119 @@
 
 import sqlite3
 import re
+from bisect import bisect_left
+from functools import lru_cache
 from typing import Optional, Dict, List
 from logger import LOG
 
+try:
+    import numpy as np
+except ImportError:  # numpy为可选依赖，缺失时批量分级退化为逐个二分查找
+    np = None
+
+# 与DatabaseManager使用同一个db_conn模块实例，才能共享同一个连接
+try:
+    from src.db_conn import DEFAULT_DB_PATH, get_connection, get_lock, lock_for
+except ImportError:
+    from db_conn import DEFAULT_DB_PATH, get_connection, get_lock, lock_for
+
+# 查询语句统一定义为常量，保证每次执行的SQL文本一致，命中sqlite3的语句缓存
+# 不区分大小写的查询使用 COLLATE NOCASE，配合 idx_coca_word_nocase 走索引而不是全表 LOWER() 扫描
+_SQL_RANK_NOCASE = "SELECT rank FROM t_coca WHERE word = ? COLLATE NOCASE LIMIT 1"
+_SQL_WORD_DETAILS = """
+    SELECT rank, pos, word, total, spoken, fiction, magazine, newspaper, academic
+    FROM t_coca 
+    WHERE word = ? COLLATE NOCASE
+    LIMIT 1
+"""
+_SQL_CREATE_NOCASE_INDEX = "CREATE INDEX IF NOT EXISTS idx_coca_word_nocase ON t_coca(word COLLATE NOCASE)"
+# 查询前会先把单词转为小写，这里检查词表是否全部以小写存储
+_SQL_FIND_NON_LOWERCASE = "SELECT word FROM t_coca WHERE word != LOWER(word) LIMIT 1"
+
+# 单词标准化时需要移除的字符（保留字母数字、空白和连字符），预编译避免每次调用查找正则缓存
+_NORM_RE = re.compile(r'[^\w\s-]')
+# 纯ASCII输入改用 str.translate 删除字符，删除表由同一正则生成，结果与 _NORM_RE 完全一致
+_ASCII_DELETE_TABLE = {c: None for c in range(128) if _NORM_RE.match(chr(c))}
+
+# 批量查询：占位符按块拼接，每块不超过SQLite默认的变量上限
+_SQL_RANK_IN = "SELECT word, rank FROM t_coca WHERE word COLLATE NOCASE IN ({placeholders})"
+_MAX_IN_PARAMS = 999
+# 整表加载：按排名倒序，同一单词的多个词性条目最终保留排名最小的一条
+_SQL_ALL_RANKS = "SELECT word, rank FROM t_coca ORDER BY rank DESC"
+_SQL_COUNT = "SELECT COUNT(*) FROM t_coca"
+_SQL_RANK_RANGE = "SELECT MIN(rank), MAX(rank) FROM t_coca"
+
+# 词根匹配时尝试去掉的后缀/前缀（按优先级排列），预先算好长度
+_SUFFIX_RULES = tuple((suffix, len(suffix)) for suffix in
+                      ('s', 'es', 'ed', 'ing', 'er', 'est', 'ly', 'tion', 'sion', 'ness', 'ment'))
+_PREFIX_RULES = tuple((prefix, len(prefix)) for prefix in
+                      ('un', 're', 'pre', 'dis', 'mis', 'over', 'under', 'out'))
+
+# 频率等级：排名 <= 边界值 即属于对应等级，超过最后一个边界为"很低频"
+_LEVEL_BOUNDS = (100, 500, 1000, 2000, 5000, 10000)
+_LEVEL_NAMES = ("极高频", "高频", "中高频", "中频", "中低频", "低频", "很低频")
+
+# 进程内LRU缓存容量：字幕中的单词高度重复，常用词几乎都能命中缓存
+_RANK_CACHE_SIZE = 8192
+
 class COCADatabaseLookup:
     """基于数据库的COCA词频查询类"""
     
-    def __init__(self, db_path: str = "data/englishcut.db"):
-        """初始化COCA查询器"""
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, conn: Optional[sqlite3.Connection] = None):
+        """
+        初始化COCA查询器
+        
+        参数:
+        - db_path: 数据库文件路径
+        - conn: 外部注入的连接（可选），默认使用 db_conn 中与DatabaseManager共享的长连接
+        """
         self.db_path = db_path
+        self._conn = conn
+        self._index_checked = False
+        # 单词排名回退查询复用的游标
+        self._rank_cursor = None
+        # 连接被多个线程和DatabaseManager共享，访问时持有同一把可重入锁
+        self._lock = lock_for(conn) if conn is not None else get_lock(db_path)
+        # t_coca运行期只读且只有几万行，首次使用时整表加载为 单词→排名 字典
+        self._rank_map = None
+        self._rank_map_loaded = False
+        # 按标准化单词缓存查询结果，重复单词不再访问SQLite
+        self._cached_rank = lru_cache(maxsize=_RANK_CACHE_SIZE)(self._lookup_rank)
+        self._cached_root_rank = lru_cache(maxsize=_RANK_CACHE_SIZE)(self._find_root_word_frequency)
         LOG.info("🔤 COCA数据库查询器初始化完成")
     
+    def _get_conn(self) -> sqlite3.Connection:
+        """获取连接（共享连接每次从 db_conn 取，关闭后会自动重新打开），首次使用时检查索引"""
+        conn = self._conn if self._conn is not None else get_connection(self.db_path)
+        if not self._index_checked:
+            self._index_checked = True
+            self._ensure_index(conn)
+        return conn
+    
+    def _ensure_index(self, conn: sqlite3.Connection):
+        """确保t_coca上存在不区分大小写的索引（一次性迁移）"""
+        try:
+            # 连接与DatabaseManager共享：持锁执行，避免与其他线程的事务交错；
+            # 本线程已在事务中（如在 _transaction() 内首次查询）时索引随该事务提交，
+            # 不能在这里提交调用方尚未完成的写入
+            with self._lock:
+                if conn.in_transaction:
+                    conn.execute(_SQL_CREATE_NOCASE_INDEX)
+                else:
+                    conn.execute("BEGIN")
+                    try:
+                        conn.execute(_SQL_CREATE_NOCASE_INDEX)
+                        conn.execute("COMMIT")
+                    except Exception:
+                        conn.execute("ROLLBACK")
+                        raise
+            
+            sample = conn.execute(_SQL_FIND_NON_LOWERCASE).fetchone()
+            if sample:
+                LOG.warning(f"⚠️ t_coca 中存在非小写单词（如 '{sample[0]}'），大小写不同的条目将按同一单词处理")
+        except Exception as e:
+            LOG.warning(f"⚠️ 创建COCA索引失败（将退化为全表扫描）: {e}")
+    
     def get_frequency_rank(self, word: str) -> Optional[int]:
         """
         从t_coca表获取单词的频率排名
@@ -34,45 +136,94 @@ class COCADatabaseLookup:
         normalized_word = self._normalize_word(word.strip())
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # 精确匹配查询
-                cursor.execute("SELECT rank FROM t_coca WHERE word = ? LIMIT 1", (normalized_word,))
-                result = cursor.fetchone()
-                
-                if result:
-                    return result[0]
-                
-                # 如果没有找到，尝试不区分大小写查询
-                cursor.execute("SELECT rank FROM t_coca WHERE LOWER(word) = LOWER(?) LIMIT 1", (normalized_word,))
-                result = cursor.fetchone()
-                
-                if result:
-                    return result[0]
-                
-                # 如果是短语，尝试估算
-                if ' ' in normalized_word:
-                    return self._estimate_phrase_frequency(normalized_word)
-                
-                # 尝试词根匹配
-                root_rank = self._find_root_word_frequency(normalized_word)
-                if root_rank:
-                    return root_rank + 500  # 变形词的排名通常低于原词
-                
-                # 未找到，返回None
-                return None
-                
+            return self._cached_rank(normalized_word)
         except Exception as e:
             LOG.error(f"COCA查询失败: {e}")
             return None
     
+    def _lookup_rank(self, normalized_word: str) -> Optional[int]:
+        """查询标准化单词的排名（结果经LRU缓存，异常不会被缓存）"""
+        rank = self._find_exact_rank(normalized_word)
+        if rank:
+            return rank
+        
+        # 如果是短语，尝试估算
+        if ' ' in normalized_word:
+            return self._estimate_phrase_frequency(normalized_word)
+        
+        # 尝试词根匹配
+        root_rank = self._cached_root_rank(normalized_word)
+        if root_rank:
+            return root_rank + 500  # 变形词的排名通常低于原词
+        
+        # 未找到，返回None
+        return None
+    
+    def _find_exact_rank(self, normalized_word: str) -> Optional[int]:
+        """查找单词本身的排名（优先使用内存词表）"""
+        rank_map = self._get_rank_map()
+        if rank_map is not None:
+            return rank_map.get(normalized_word)
+        
+        # 词表未能加载时回退到数据库查询：输入已是小写，一次NOCASE索引查询即可，
+        # 不再先做一次区分大小写的精确查询
+        with self._lock:
+            return self._query_rank(normalized_word)
+    
+    def _query_rank(self, word: str) -> Optional[int]:
+        """
+        用专用游标执行单词排名查询（调用方需持有 self._lock）
+        
+        游标在首次使用时创建并一直复用，语句本身由连接的语句缓存保存，
+        每次查询只需重新绑定参数，不再创建游标或重新编译SQL。
+        """
+        conn = self._get_conn()
+        if self._rank_cursor is None or self._rank_cursor.connection is not conn:
+            self._rank_cursor = conn.cursor()
+        
+        result = self._rank_cursor.execute(_SQL_RANK_NOCASE, (word,)).fetchone()
+        return result[0] if result else None
+    
+    def _get_rank_map(self) -> Optional[Dict[str, int]]:
+        """获取内存词表，首次调用时加载；加载失败返回None"""
+        if not self._rank_map_loaded:
+            with self._lock:
+                if not self._rank_map_loaded:
+                    self._rank_map = self._load()
+                    self._rank_map_loaded = True
+        return self._rank_map
+    
+    def _load(self) -> Optional[Dict[str, int]]:
+        """将t_coca整表加载为 小写单词→排名 字典"""
+        try:
+            cursor = self._get_conn().cursor()
+            cursor.execute(_SQL_ALL_RANKS)
+            rank_map = {word.lower(): rank for word, rank in cursor.fetchall() if word is not None}
+            LOG.info(f"🔤 COCA词表已加载到内存: {len(rank_map)} 个单词")
+            return rank_map
+        except Exception as e:
+            LOG.warning(f"⚠️ 加载COCA词表失败，将直接查询数据库: {e}")
+            return None
+    
+    def clear_cache(self):
+        """清空查询缓存和内存词表（t_coca表数据变化后调用）"""
+        with self._lock:
+            self._rank_map = None
+            self._rank_map_loaded = False
+        self._cached_rank.cache_clear()
+        self._cached_root_rank.cache_clear()
+    
     def _normalize_word(self, word: str) -> str:
         """标准化单词"""
         # 转换为小写，移除标点符号，保留空格和连字符
-        normalized = word.lower().strip()
-        normalized = re.sub(r'[^\w\s-]', '', normalized)
-        return normalized
+        word = word.lower().strip()
+        
+        # 常见情况是纯字母数字的单词，无需删除任何字符
+        if word.isalnum():
+            return word
+        if word.isascii():
+            return word.translate(_ASCII_DELETE_TABLE)
+        return _NORM_RE.sub('', word)
     
     def _estimate_phrase_frequency(self, phrase: str) -> Optional[int]:
         """估算短语频率（基于组成词的频率）"""
@@ -81,24 +232,20 @@ class COCADatabaseLookup:
             return None
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                word_ranks = []
-                for word in words:
-                    cursor.execute("SELECT rank FROM t_coca WHERE LOWER(word) = LOWER(?) LIMIT 1", (word,))
-                    result = cursor.fetchone()
-                    if result:
-                        word_ranks.append(result[0])
-                    else:
-                        # 如果某个词找不到，使用较高的默认排名
-                        word_ranks.append(10000)
-                
-                if word_ranks:
-                    # 短语作为重点背诵词汇，设置较大排名（低频度）
-                    avg_rank = sum(word_ranks) // len(word_ranks)
-                    # 确保短语排名在20000以上，标记为重点背诵词汇
-                    return max(20000, avg_rank + 5000)  # 短语是重点背诵词汇
+            rank_map = self._get_rank_map()
+            if rank_map is not None:
+                # 如果某个词找不到，使用较高的默认排名
+                word_ranks = [rank_map.get(word, 10000) for word in words]
+            else:
+                with self._lock:
+                    word_ranks = []
+                    for word in words:
+                        rank = self._query_rank(word)
+                        word_ranks.append(rank if rank is not None else 10000)
+            
+            # 短语作为重点背诵词汇，设置较大排名（低频度），确保在20000以上
+            avg_rank = sum(word_ranks) // len(word_ranks)
+            return max(20000, avg_rank + 5000)
                 
         except Exception as e:
             LOG.error(f"短语频率估算失败: {e}")
@@ -107,52 +254,78 @@ class COCADatabaseLookup:
     
     def _find_root_word_frequency(self, word: str) -> Optional[int]:
         """查找词根的频率"""
+        candidates = self._root_candidates(word)
+        if not candidates:
+            return None
+        
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # 常见词缀
-                suffixes = ['s', 'es', 'ed', 'ing', 'er', 'est', 'ly', 'tion', 'sion', 'ness', 'ment']
-                
-                for suffix in suffixes:
-                    if word.endswith(suffix) and len(word) > len(suffix) + 2:
-                        root = word[:-len(suffix)]
-                        cursor.execute("SELECT rank FROM t_coca WHERE LOWER(word) = LOWER(?) LIMIT 1", (root,))
-                        result = cursor.fetchone()
-                        if result:
-                            return result[0]
-                
-                # 尝试去掉常见前缀
-                prefixes = ['un', 're', 'pre', 'dis', 'mis', 'over', 'under', 'out']
-                for prefix in prefixes:
-                    if word.startswith(prefix) and len(word) > len(prefix) + 2:
-                        root = word[len(prefix):]
-                        cursor.execute("SELECT rank FROM t_coca WHERE LOWER(word) = LOWER(?) LIMIT 1", (root,))
-                        result = cursor.fetchone()
-                        if result:
-                            return result[0]
+            rank_map = self._get_rank_map()
+            if rank_map is None:
+                # 词表未能加载时，一次 IN 查询取回所有候选词根
+                rank_map = self._query_ranks(candidates)
+            
+            # 按候选顺序（先后缀、后前缀）返回第一个找到的词根排名
+            for root in candidates:
+                rank = rank_map.get(root)
+                if rank:
+                    return rank
                             
         except Exception as e:
             LOG.error(f"词根查找失败: {e}")
         
         return None
     
+    def _root_candidates(self, word: str) -> List[str]:
+        """生成去掉常见后缀/前缀后的候选词根"""
+        length = len(word)
+        candidates = [word[:-size] for suffix, size in _SUFFIX_RULES
+                      if length > size + 2 and word.endswith(suffix)]
+        candidates += [word[size:] for prefix, size in _PREFIX_RULES
+                       if length > size + 2 and word.startswith(prefix)]
+        return candidates
+    
+    def _query_ranks(self, normalized_words: List[str]) -> Dict[str, int]:
+        """用分块的 IN 查询批量取回单词排名（同一单词取排名最小的条目）"""
+        rank_map = {}
+        unique_words = list(dict.fromkeys(normalized_words))
+        
+        with self._lock:
+            cursor = self._get_conn().cursor()
+            
+            for start in range(0, len(unique_words), _MAX_IN_PARAMS):
+                chunk = unique_words[start:start + _MAX_IN_PARAMS]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(_SQL_RANK_IN.format(placeholders=placeholders), chunk)
+                
+                # 同一单词可能有多个词性条目，取最高频（排名最小）的一条
+                for found_word, rank in cursor.fetchall():
+                    key = found_word.lower()
+                    if key not in rank_map or rank < rank_map[key]:
+                        rank_map[key] = rank
+        
+        return rank_map
+    
     def get_frequency_level(self, rank: int) -> str:
         """根据排名获取频率等级"""
-        if rank <= 100:
-            return "极高频"
-        elif rank <= 500:
-            return "高频"
-        elif rank <= 1000:
-            return "中高频"
-        elif rank <= 2000:
-            return "中频"
-        elif rank <= 5000:
-            return "中低频"
-        elif rank <= 10000:
-            return "低频"
-        else:
-            return "很低频"
+        # 只在6个边界中二分查找，比lru_cache的参数哈希和字典查找还快，不需要缓存
+        return _LEVEL_NAMES[bisect_left(_LEVEL_BOUNDS, rank)]
+    
+    def batch_get_frequency_level(self, ranks) -> List[str]:
+        """
+        批量获取频率等级
+        
+        参数:
+        - ranks: 排名序列（列表或numpy数组）
+        
+        返回:
+        - List[str]: 与输入顺序一致的频率等级列表
+        """
+        if np is not None:
+            # 在numpy的C循环中一次完成全部分桶
+            indexes = np.searchsorted(_LEVEL_BOUNDS, np.asarray(ranks), side='left')
+            return [_LEVEL_NAMES[i] for i in indexes.tolist()]
+        
+        return [_LEVEL_NAMES[bisect_left(_LEVEL_BOUNDS, rank)] for rank in ranks]
     
     def batch_lookup(self, words: List[str]) -> Dict[str, Optional[int]]:
         """批量查询词频"""
@@ -161,16 +334,20 @@ class COCADatabaseLookup:
         if not words:
             return results
         
+        normalized = {word: self._normalize_word(word) for word in words}
+        
+        rank_map = self._get_rank_map()
+        if rank_map is not None:
+            for word, normalized_word in normalized.items():
+                results[word] = rank_map.get(normalized_word)
+            return results
+        
+        # 词表未能加载时：去重后用 IN 查询一次取回整块单词的排名
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                for word in words:
-                    normalized_word = self._normalize_word(word)
-                    cursor.execute("SELECT rank FROM t_coca WHERE LOWER(word) = LOWER(?) LIMIT 1", (normalized_word,))
-                    result = cursor.fetchone()
-                    results[word] = result[0] if result else None
-                    
+            rank_map = self._query_ranks(list(normalized.values()))
+            for word, normalized_word in normalized.items():
+                results[word] = rank_map.get(normalized_word)
+        
         except Exception as e:
             LOG.error(f"批量查询失败: {e}")
             # 如果批量查询失败，回退到单个查询
@@ -179,6 +356,25 @@ class COCADatabaseLookup:
         
         return results
     
+    def get_frequency_ranks(self, words: List[str]) -> Dict[str, Optional[int]]:
+        """
+        批量获取频率排名，结果与逐个调用 get_frequency_rank 相同（包括短语估算和词根匹配）
+        
+        先用 batch_lookup 一次取回所有单词本身的排名，只有找不到的单词才逐个走完整查询路径。
+        
+        参数:
+        - words: 单词或短语列表
+        
+        返回:
+        - Dict[str, Optional[int]]: 原始输入 → 排名
+        """
+        exact_ranks = self.batch_lookup([word for word in words if word and word.strip()])
+        results = {}
+        for word in words:
+            if word not in results:
+                results[word] = exact_ranks.get(word) or self.get_frequency_rank(word)
+        return results
+    
     def get_word_details(self, word: str) -> Optional[Dict]:
         """
         获取单词的详细信息（包括不同语料库的频率）
@@ -192,16 +388,12 @@ class COCADatabaseLookup:
         normalized_word = self._normalize_word(word.strip())
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
+            with self._lock:
+                cursor = self._get_conn().cursor()
+                # 只在这个游标上使用Row，不影响共享连接上的其他查询
+                cursor.row_factory = sqlite3.Row
                 
-                cursor.execute("""
-                    SELECT rank, pos, word, total, spoken, fiction, magazine, newspaper, academic
-                    FROM t_coca 
-                    WHERE LOWER(word) = LOWER(?) 
-                    LIMIT 1
-                """, (normalized_word,))
+                cursor.execute(_SQL_WORD_DETAILS, (normalized_word,))
                 
                 result = cursor.fetchone()
                 if result:
@@ -215,13 +407,13 @@ class COCADatabaseLookup:
     def get_database_stats(self) -> Dict:
         """获取COCA数据库统计信息"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock:
+                cursor = self._get_conn().cursor()
                 
-                cursor.execute("SELECT COUNT(*) FROM t_coca")
+                cursor.execute(_SQL_COUNT)
                 total_words = cursor.fetchone()[0]
                 
-                cursor.execute("SELECT MIN(rank), MAX(rank) FROM t_coca")
+                cursor.execute(_SQL_RANK_RANGE)
                 rank_range = cursor.fetchone()
                 
                 return {
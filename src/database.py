@@ -7,159 +7,651 @@
 import sqlite3
 import os
 import sys
+import threading
 # 添加当前目录到系统路径，以支持模块导入
 current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
 
-from typing import List, Dict, Optional, Tuple
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 from datetime import datetime
 from src.logger import LOG
+from src.db_conn import DEFAULT_DB_PATH, close_connection, forget, get_connection, get_lock, lock_for, reader
+
+# 流式读取时每批从游标取出的行数
+_FETCH_BATCH_SIZE = 1000
+
+# SQLite 3.37 起支持 STRICT 表：按声明类型存储，不再逐值做类型亲和转换
+_STRICT_TABLES = sqlite3.sqlite_version_info >= (3, 37, 0)
+
+# 重点单词表定义；旧库中结构不同的表在初始化时按此定义重建。
+# created_at 存秒级时间戳（UTC）：比 "YYYY-MM-DD HH:MM:SS" 文本短，按时间排序时直接比较整数
+_KEYWORDS_TABLE_SQL = """CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    subtitle_id INTEGER NOT NULL,
+    key_word TEXT NOT NULL,
+    phonetic_symbol TEXT,
+    explain_text TEXT,
+    created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    coca INTEGER,
+    is_selected INTEGER DEFAULT 0,
+    FOREIGN KEY (subtitle_id) REFERENCES t_subtitle (id) ON DELETE CASCADE
+)""" + (" STRICT" if _STRICT_TABLES else "")
+_KEYWORDS_COLUMNS = "id, subtitle_id, key_word, phonetic_symbol, explain_text, created_at, coca, is_selected"
+# 重建时把旧的 CURRENT_TIMESTAMP 文本转换为时间戳，无法解析的值取当前时间
+_SQL_EPOCH_CREATED_AT = """CASE WHEN typeof(created_at) = 'integer' THEN created_at
+    ELSE COALESCE(CAST(strftime('%s', created_at) AS INTEGER), CAST(strftime('%s', 'now') AS INTEGER)) END"""
+
+# 依赖迁移字段或重建后的表的索引，在字段迁移和表重建之后创建：
+# 按字幕查询单词时按 created_at 顺序扫描；(subtitle_id, coca) 部分索引只收录有排名的单词，
+# 批量选择按字幕ID和词频阈值直接定位需要改写的单词（coca > ? 之类的条件本身蕴含 IS NOT NULL），
+# new_file_path / new_name 用于按预处理视频查找系列
+_MIGRATED_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_keywords_subtitle_created ON t_keywords(subtitle_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_keywords_word ON t_keywords(key_word)",
+    "CREATE INDEX IF NOT EXISTS idx_keywords_subid_coca_nn ON t_keywords(subtitle_id, coca) WHERE coca IS NOT NULL",
+    "CREATE INDEX IF NOT EXISTS idx_series_new_file_path ON t_series(new_file_path)",
+    "CREATE INDEX IF NOT EXISTS idx_series_new_name ON t_series(new_name)",
+)
+
+# 表结构版本，记录在 PRAGMA user_version 中；修改建表、索引、迁移或全文索引时递增，
+# 已是当前版本的数据库在初始化时直接跳过全部DDL
+_SCHEMA_VERSION = 5
+_SQL_SCHEMA_STATE = """
+    SELECT (SELECT user_version FROM pragma_user_version),
+           EXISTS (SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 't_keywords_fts')
+"""
+
+# 基础表结构与索引，初始化时作为一个脚本执行
+_SCHEMA_SQL = """
+-- 创建系列表（媒体文件元数据）
+CREATE TABLE IF NOT EXISTS t_series (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    file_path TEXT,
+    file_type TEXT,
+    duration REAL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    new_name TEXT,
+    new_file_path TEXT,
+    second_name TEXT,
+    second_file_path TEXT,
+    third_name TEXT,
+    third_file_path TEXT,
+    first_name TEXT,
+    first_file_path TEXT
+);
+
+-- 创建字幕表
+CREATE TABLE IF NOT EXISTS t_subtitle (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    series_id INTEGER NOT NULL,
+    begin_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    english_text TEXT,
+    chinese_text TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (series_id) REFERENCES t_series (id) ON DELETE CASCADE
+);
+
+-- 创建重点单词表
+""" + _KEYWORDS_TABLE_SQL.format(table="t_keywords") + """;
+
+-- 创建索引以提高查询性能
+-- 按系列查询字幕/单词时按 begin_time 顺序扫描索引，无需额外排序
+CREATE INDEX IF NOT EXISTS idx_subtitle_series_begin ON t_subtitle(series_id, begin_time, id);
+CREATE INDEX IF NOT EXISTS idx_subtitle_time ON t_subtitle(begin_time, end_time);
+
+-- 旧的单列索引是上面复合索引的前缀，删除以减少写入时的索引维护
+DROP INDEX IF EXISTS idx_subtitle_series_id;
+DROP INDEX IF EXISTS idx_keywords_subtitle_id;
+-- 单列的 coca 索引由按字幕ID和词频筛选的部分索引 idx_keywords_subid_coca_nn 取代
+DROP INDEX IF EXISTS idx_keywords_coca;
+DROP INDEX IF EXISTS idx_keywords_coca_notnull;
+"""
+
+# 高频语句固定为模块常量：每次调用传入完全相同的SQL文本，
+# 连接的语句缓存（按SQL文本查找）即可命中，解析和查询规划每个连接只做一次
+_SERIES_COLUMNS = (
+    'name', 'file_path', 'file_type', 'duration',
+    'new_name', 'new_file_path',
+    'first_name', 'first_file_path',
+    'second_name', 'second_file_path',
+    'third_name', 'third_file_path',
+)
+_SQL_INSERT_SERIES = f"""
+    INSERT INTO t_series ({', '.join(_SERIES_COLUMNS)})
+    VALUES ({', '.join('?' * len(_SERIES_COLUMNS))})
+"""
+# 烧制视频信息：未提供的字段传 NULL，由 COALESCE 保留原值，无论更新哪些字段都是同一条语句
+_VIDEO_INFO_COLUMNS = _SERIES_COLUMNS[4:]
+_SQL_UPDATE_SERIES_VIDEO_INFO = f"""
+    UPDATE t_series
+    SET {', '.join(f'{column} = COALESCE(?, {column})' for column in _VIDEO_INFO_COLUMNS)},
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+"""
+_SQL_INSERT_SUBTITLE = """
+    INSERT INTO t_subtitle (series_id, begin_time, end_time, english_text, chinese_text)
+    VALUES (?, ?, ?, ?, ?)
+"""
+_SQL_INSERT_KEYWORD = """
+    INSERT INTO t_keywords (subtitle_id, key_word, phonetic_symbol, explain_text, coca, is_selected)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+# SQLite 3.35 起支持 INSERT ... RETURNING，多行 VALUES 插入可直接返回整批ID；
+# 每条语句最多插入的行数固定，分块后完整的块复用同一条语句文本
+# （参数个数最多1200，远低于支持 RETURNING 的版本中32766的默认上限）
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+_RETURNING_BATCH_ROWS = 100
+
+@lru_cache(maxsize=None)
+def _multirow_insert_sql(insert_sql: str, row_count: int) -> str:
+    """
+    把单行插入语句展开为 row_count 行的 INSERT ... VALUES (...), (...) RETURNING id
+    
+    参数:
+    - insert_sql: 以 "VALUES (?, ...)" 结尾的单行插入语句
+    - row_count: 行数
+    
+    返回:
+    - str: 多行插入语句
+    """
+    head, _, placeholders = insert_sql.rpartition("VALUES")
+    placeholders = placeholders.strip()
+    return f"{head}VALUES {', '.join([placeholders] * row_count)} RETURNING id"
+
+_SQL_SUBTITLES_BY_SERIES = """
+    SELECT * FROM t_subtitle 
+    WHERE series_id = ? 
+    ORDER BY begin_time
+"""
+# 字幕表格直接展示的列：时间保留两位小数，超过 ?1 个字符的文本截断并加省略号
+_SQL_SUBTITLES_DISPLAY = """
+    SELECT
+        id,
+        ROUND(begin_time, 2),
+        ROUND(end_time, 2),
+        CASE WHEN LENGTH(english_text) > ?1 THEN SUBSTR(english_text, 1, ?1) || '...' ELSE COALESCE(english_text, '') END,
+        CASE WHEN LENGTH(chinese_text) > ?1 THEN SUBSTR(chinese_text, 1, ?1) || '...' ELSE COALESCE(chinese_text, '') END
+    FROM t_subtitle
+    WHERE series_id = ?2
+    ORDER BY begin_time
+"""
+_SQL_SERIES_BY_ID = "SELECT * FROM t_series WHERE id = ?"
+_SQL_ALL_SERIES = "SELECT * FROM t_series ORDER BY created_at DESC LIMIT ? OFFSET ?"
+_SQL_COUNT_SERIES = "SELECT COUNT(*) FROM t_series"
+# 按预处理视频路径或文件名查找系列，路径完全匹配的排在前面；两个条件各走一个索引
+_SQL_SERIES_BY_NEW_FILE = """
+    SELECT * FROM t_series
+    WHERE new_file_path = ? OR new_name = ?
+    ORDER BY new_file_path = ? DESC, id
+    LIMIT 1
+"""
+# 各表记录数、独特单词数和总时长合并为一次查询：系列数和总时长在同一次扫描中聚合，
+# 独特单词数按顺序扫描 idx_keywords_word 覆盖索引（与记录数分开统计才不需要临时B树去重）
+_SQL_STATISTICS = """
+    SELECT
+        ser.series_count,
+        (SELECT COUNT(*) FROM t_subtitle),
+        (SELECT COUNT(*) FROM t_keywords),
+        (SELECT COUNT(DISTINCT key_word) FROM t_keywords),
+        ser.total_duration
+    FROM (SELECT COUNT(*) AS series_count, COALESCE(SUM(duration), 0) AS total_duration FROM t_series) AS ser
+"""
+_SQL_DELETE_SERIES_KEYWORDS = """
+    DELETE FROM t_keywords
+    WHERE subtitle_id IN (SELECT id FROM t_subtitle WHERE series_id = ?)
+"""
+_SQL_SERIES_HAS_SUBTITLES = "SELECT EXISTS (SELECT 1 FROM t_subtitle WHERE series_id = ?)"
+_SQL_SUBTITLE_BY_ID = "SELECT * FROM t_subtitle WHERE id = ?"
+_SQL_TRANSLATION = "SELECT chinese_text FROM t_subtitle WHERE id = ?"
+_SQL_UPDATE_KEYWORD_SELECTION = "UPDATE t_keywords SET is_selected = ? WHERE id = ?"
+_SQL_UPDATE_KEYWORD_COCA = "UPDATE t_keywords SET coca = ? WHERE id = ?"
+# 批量选择规则只在参数上不同：all/none 直接设置选中状态；cocaN 拆成按阈值选中、取消选中两条
+# 范围条件的更新，不用逐行计算 CASE（没有COCA排名的单词不变）。
+# 每条语句都只改写选中状态确实变化的单词，重复执行同一规则不产生任何写入。
+# 系列的字幕ID由子查询在语句内通过覆盖索引取得，不在Python中缓存：展开成 IN (?, ?, ...) 会让
+# 语句文本随字幕数变化而无法命中语句缓存，且其他进程（如独立运行的脚本）增删字幕时缓存无从失效
+_SQL_SET_SERIES_SELECTION = """
+    UPDATE t_keywords
+    SET is_selected = ?1
+    WHERE is_selected IS NOT ?1
+      AND subtitle_id IN (SELECT id FROM t_subtitle WHERE series_id = ?2)
+"""
+_SQL_SELECT_SERIES_ABOVE_COCA = """
+    UPDATE t_keywords
+    SET is_selected = 1
+    WHERE coca > ? AND is_selected IS NOT 1
+      AND subtitle_id IN (SELECT id FROM t_subtitle WHERE series_id = ?)
+"""
+_SQL_DESELECT_SERIES_UP_TO_COCA = """
+    UPDATE t_keywords
+    SET is_selected = 0
+    WHERE coca <= ? AND is_selected IS NOT 0
+      AND subtitle_id IN (SELECT id FROM t_subtitle WHERE series_id = ?)
+"""
+# 选择规则 → 依次执行的 (更新语句, 选中状态或COCA阈值)，每条语句的参数都是 (值, 系列ID)
+_SELECTION_RULES = {
+    "all": ((_SQL_SET_SERIES_SELECTION, 1),),
+    "none": ((_SQL_SET_SERIES_SELECTION, 0),),
+    "coca5000": ((_SQL_SELECT_SERIES_ABOVE_COCA, 5000), (_SQL_DESELECT_SERIES_UP_TO_COCA, 5000)),
+    "coca10000": ((_SQL_SELECT_SERIES_ABOVE_COCA, 10000), (_SQL_DESELECT_SERIES_UP_TO_COCA, 10000)),
+}
+# 单词查询都带 LIMIT ? OFFSET ?，分页与否共用同一条语句（LIMIT -1 表示不限制）
+_SQL_KEYWORDS_BY_SUBTITLE = """
+    SELECT * FROM t_keywords 
+    WHERE subtitle_id = ?
+    ORDER BY created_at
+    LIMIT ? OFFSET ?
+"""
+_SQL_KEYWORDS_BY_SERIES = """
+    SELECT k.*, s.begin_time, s.end_time
+    FROM t_keywords k
+    JOIN t_subtitle s ON k.subtitle_id = s.id
+    WHERE s.series_id = ?
+    ORDER BY s.begin_time, k.created_at
+    LIMIT ? OFFSET ?
+"""
+_SQL_ALL_KEYWORDS = "SELECT * FROM t_keywords ORDER BY created_at DESC LIMIT ? OFFSET ?"
+_SQL_COUNT_SERIES_KEYWORDS = """
+    SELECT COUNT(*) FROM t_keywords
+    WHERE subtitle_id IN (SELECT id FROM t_subtitle WHERE series_id = ?)
+"""
+
+_SQL_SEARCH_KEYWORDS = """
+    SELECT 
+        k.*,
+        s.begin_time,
+        s.end_time,
+        s.english_text,
+        s.chinese_text,
+        ser.name as series_name
+    FROM t_keywords k
+    JOIN t_subtitle s ON k.subtitle_id = s.id
+    JOIN t_series ser ON s.series_id = ser.id
+    WHERE {condition}
+    ORDER BY k.key_word, ser.name, s.begin_time
+    LIMIT ? OFFSET ?
+"""
+# 搜索语句的四种变体预先拼接好：(是否使用全文索引, 是否搜索解释) → SQL
+_SQL_SEARCH_VARIANTS = {
+    (True, False): _SQL_SEARCH_KEYWORDS.format(
+        condition="k.id IN (SELECT rowid FROM t_keywords_fts WHERE key_word LIKE ?)"),
+    (True, True): _SQL_SEARCH_KEYWORDS.format(condition="""k.id IN (
+            SELECT rowid FROM t_keywords_fts WHERE key_word LIKE ?
+            UNION
+            SELECT rowid FROM t_keywords_fts WHERE explain_text LIKE ?
+        )"""),
+    (False, False): _SQL_SEARCH_KEYWORDS.format(condition="k.key_word LIKE ?"),
+    (False, True): _SQL_SEARCH_KEYWORDS.format(condition="(k.key_word LIKE ? OR k.explain_text LIKE ?)"),
+}
+
+# 写入文本时的字符替换：单引号 → 反引号，英文冒号 → 中文冒号
+_TEXT_REPLACE_TABLE = str.maketrans({"'": "`", ":": "："})
+
+def _sanitize_text(text: Optional[str]) -> str:
+    """替换文本中的特殊字符，空值返回空字符串（一次 translate 完成全部替换）"""
+    return text.translate(_TEXT_REPLACE_TABLE) if text else ''
+
+# 新单词默认选中的COCA排名下限（排名大于此值即较生僻的单词默认选中）；
+# is_selected 之后可由用户修改，因此是普通字段而不是生成列
+_AUTO_SELECT_MIN_COCA = 5000
+
+# 迁移时按顺序补齐的字段：(表名, 字段名, 字段定义)
+# 新建的表已包含全部字段，只有旧版数据库才需要 ALTER TABLE；字段顺序与迁移后的旧库一致
+_MIGRATION_COLUMNS = (
+    ('t_series', 'new_name', 'TEXT'),
+    ('t_series', 'new_file_path', 'TEXT'),
+    ('t_series', 'second_name', 'TEXT'),
+    ('t_series', 'second_file_path', 'TEXT'),
+    ('t_series', 'third_name', 'TEXT'),
+    ('t_series', 'third_file_path', 'TEXT'),
+    ('t_series', 'first_name', 'TEXT'),
+    ('t_series', 'first_file_path', 'TEXT'),
+    ('t_keywords', 'coca', 'INTEGER'),
+    ('t_keywords', 'is_selected', 'INTEGER DEFAULT 0'),
+)
 
 class DatabaseManager:
     """数据库管理器"""
     
-    def __init__(self, db_path: str = "data/englishcut.db"):
-        """初始化数据库连接"""
+    # 已确认存在的数据目录
+    _dirs_ensured = set()
+    
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, conn: Optional[sqlite3.Connection] = None,
+                 coca_lookup=None):
+        """
+        初始化数据库连接
+        
+        参数:
+        - db_path: 数据库文件路径
+        - conn: 外部注入的连接（可选），默认使用 db_conn 中按路径共享的长连接
+        - coca_lookup: 写入单词时补全COCA排名的查询器（可选），默认在首次使用时按本数据库创建
+        """
         self.db_path = db_path
+        self._conn = conn
+        self._coca_lookup = coca_lookup
         
-        # 确保数据目录存在
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # 确保数据目录存在（外部注入连接时数据库已打开，无需创建）
+        if conn is None:
+            self._ensure_data_dir(db_path)
         
         # 初始化数据库
         self._init_database()
         LOG.info(f"📊 数据库初始化完成: {db_path}")
+        
+        # 调试模式下检查批量写入语句是否仍然走索引
+        if os.environ.get("DEBUG"):
+            self._check_query_plans()
+    
+    def _check_query_plans(self) -> List[str]:
+        """
+        检查按系列批量更新/删除单词的语句的查询计划，出现整表扫描 t_keywords 时告警
+        
+        表结构或索引调整（如给列加 COLLATE）可能让这些语句悄悄退化为全表扫描，
+        只在设置了 DEBUG 环境变量时于初始化阶段检查。
+        
+        返回:
+        - List[str]: 退化为整表扫描的语句
+        """
+        # 参数只用于生成查询计划，取值不影响结果
+        checks = [(sql, (value, 0)) for statements in _SELECTION_RULES.values() for sql, value in statements]
+        checks.append((_SQL_DELETE_SERIES_KEYWORDS, (0,)))
+        
+        regressed = []
+        with self._connect() as conn:
+            for sql, params in checks:
+                details = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+                if any(detail.startswith("SCAN t_keywords") for detail in details) and sql not in regressed:
+                    regressed.append(sql)
+                    LOG.warning(f"⚠️ 语句未使用索引，将扫描整张 t_keywords 表: {' '.join(sql.split())} | {'; '.join(details)}")
+        return regressed
+    
+    @classmethod
+    def _ensure_data_dir(cls, db_path: str):
+        """
+        创建数据库所在目录，每个目录在进程内只创建一次
+        
+        参数:
+        - db_path: 数据库文件路径（位于当前目录或为 :memory: 时无需创建）
+        """
+        data_dir = os.path.dirname(db_path)
+        if not data_dir or data_dir in cls._dirs_ensured:
+            return
+        os.makedirs(data_dir, exist_ok=True)
+        cls._dirs_ensured.add(data_dir)
     
     def _init_database(self):
-        """初始化数据库表结构"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        """初始化数据库表结构（数据库已是当前版本时只读取一次版本号）"""
+        with self._connect() as conn:
+            user_version, has_fts = conn.execute(_SQL_SCHEMA_STATE).fetchone()
+            if user_version == _SCHEMA_VERSION:
+                self._keyword_fts = bool(has_fts)
+                return
+            
+            # 建表、建索引、字段迁移和全文索引在同一个事务内完成，只提交一次。
+            # executescript 执行前会先提交未完成的事务，因此 BEGIN 写在脚本开头
+            conn.executescript("BEGIN;\n" + _SCHEMA_SQL)
+            try:
+                cursor = conn.cursor()
+                
+                # 执行数据库迁移：版本号非0的数据库在首次设置版本号时已补齐全部字段
+                if user_version == 0:
+                    self._migrate_database(cursor)
+                
+                # 旧库的 t_keywords 按新表结构重建（依赖迁移补齐的字段）
+                self._rebuild_keywords_table(cursor)
+                for sql in _MIGRATED_INDEX_SQL:
+                    cursor.execute(sql)
+                
+                # 单词全文索引（依赖迁移后的表结构）
+                self._keyword_fts = self._ensure_keyword_fts(cursor)
+                
+                # 更新统计信息，让查询规划器选用复合索引
+                cursor.execute("ANALYZE t_series")
+                cursor.execute("ANALYZE t_subtitle")
+                cursor.execute("ANALYZE t_keywords")
+                
+                # 版本号随本事务一起提交，之后启动时跳过以上全部步骤
+                cursor.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            except BaseException:
+                conn.rollback()
+                raise
             
-            # 创建系列表（媒体文件元数据）
+            conn.commit()
+    
+    def _rebuild_keywords_table(self, cursor):
+        """
+        旧库中的 t_keywords 与当前定义不一致（非 STRICT 或 created_at 仍为文本）时，
+        按新定义重建并复制数据，文本时间转换为秒级时间戳（只在升级时执行一次）
+        
+        保留原有ID和 AUTOINCREMENT 序号，全文索引的 rowid 对应关系不变，无需重建索引；
+        同步触发器随旧表删除，之后由 _ensure_keyword_fts 重新创建。
+        字幕已不存在的孤立单词原样移到 t_keywords_orphaned 表，不会被删除。
+        已有数据无法按声明类型存储时回滚到保存点，继续使用原表。
+        
+        参数:
+        - cursor: 初始化事务内的游标
+        """
+        cursor.execute("SELECT type FROM pragma_table_info('t_keywords') WHERE name = 'created_at'")
+        row = cursor.fetchone()
+        needs_rebuild = row is not None and row[0].upper() != 'INTEGER'
+        if _STRICT_TABLES and not needs_rebuild:
+            cursor.execute("SELECT strict FROM pragma_table_list WHERE schema = 'main' AND name = 't_keywords'")
+            row = cursor.fetchone()
+            needs_rebuild = row is not None and not row[0]
+        if not needs_rebuild:
+            return
+        
+        cursor.execute("SAVEPOINT keywords_rebuild")
+        try:
+            cursor.execute(_KEYWORDS_TABLE_SQL.format(table="t_keywords_rebuild"))
+            # 外键生效前删除字幕不会级联删除单词，这些孤立单词在新表启用外键约束后无法保留，
+            # 原样移到 t_keywords_orphaned（无外键约束）保存，不随重建丢失
+            cursor.execute(f"""
+                INSERT INTO t_keywords_rebuild ({_KEYWORDS_COLUMNS})
+                SELECT {_KEYWORDS_COLUMNS.replace('created_at', _SQL_EPOCH_CREATED_AT)} FROM t_keywords
+                WHERE subtitle_id IN (SELECT id FROM t_subtitle)
+            """)
+            copied = cursor.rowcount
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS t_keywords_orphaned AS
+                SELECT {_KEYWORDS_COLUMNS} FROM t_keywords WHERE 0
+            """)
+            cursor.execute(f"""
+                INSERT INTO t_keywords_orphaned ({_KEYWORDS_COLUMNS})
+                SELECT {_KEYWORDS_COLUMNS} FROM t_keywords
+                WHERE id NOT IN (SELECT id FROM t_keywords_rebuild)
+            """)
+            orphaned = cursor.rowcount
             cursor.execute("""
-                CREATE TABLE IF NOT EXISTS t_series (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    file_path TEXT,
-                    file_type TEXT,
-                    duration REAL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
+                UPDATE sqlite_sequence
+                SET seq = (SELECT seq FROM sqlite_sequence WHERE name = 't_keywords')
+                WHERE name = 't_keywords_rebuild'
             """)
+            cursor.execute("DROP TABLE t_keywords")
+            cursor.execute("ALTER TABLE t_keywords_rebuild RENAME TO t_keywords")
+            cursor.execute("RELEASE keywords_rebuild")
+            LOG.info(f"📊 t_keywords 已按新表结构重建: 保留 {copied} 个单词")
+            if orphaned:
+                LOG.warning(f"⚠️ {orphaned} 个单词所属的字幕已不存在，已移到 t_keywords_orphaned 表保存")
+        except sqlite3.Error as e:
+            cursor.execute("ROLLBACK TO keywords_rebuild")
+            cursor.execute("RELEASE keywords_rebuild")
+            LOG.warning(f"⚠️ t_keywords 重建失败，继续使用原表: {e}")
+    
+    def _ensure_keyword_fts(self, cursor) -> bool:
+        """
+        创建 t_keywords.key_word / explain_text 的 FTS5 trigram 全文索引及同步触发器
+        
+        trigram 分词器可以直接用索引加速 LIKE '%...%' 查询，匹配结果与普通 LIKE 一致。
+        
+        返回:
+        - bool: 全文索引是否可用（SQLite 未编译 FTS5 时返回 False）
+        """
+        try:
+            cursor.execute("SELECT name FROM pragma_table_info('t_keywords_fts')")
+            columns = {row[0] for row in cursor.fetchall()}
+            
+            if columns and 'explain_text' not in columns:
+                # 旧版全文索引只包含 key_word，删除后按新结构重建
+                for trigger in ('insert', 'delete', 'update'):
+                    cursor.execute(f"DROP TRIGGER IF EXISTS trg_keywords_fts_{trigger}")
+                cursor.execute("DROP TABLE t_keywords_fts")
+                columns = set()
             
-            # 创建字幕表
             cursor.execute("""
-                CREATE TABLE IF NOT EXISTS t_subtitle (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    series_id INTEGER NOT NULL,
-                    begin_time REAL NOT NULL,
-                    end_time REAL NOT NULL,
-                    english_text TEXT,
-                    chinese_text TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (series_id) REFERENCES t_series (id) ON DELETE CASCADE
+                CREATE VIRTUAL TABLE IF NOT EXISTS t_keywords_fts USING fts5(
+                    key_word, explain_text, content='t_keywords', content_rowid='id', tokenize='trigram'
                 )
             """)
-            
-            # 创建重点单词表
             cursor.execute("""
-                CREATE TABLE IF NOT EXISTS t_keywords (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    subtitle_id INTEGER NOT NULL,
-                    key_word TEXT NOT NULL,
-                    phonetic_symbol TEXT,
-                    explain_text TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (subtitle_id) REFERENCES t_subtitle (id) ON DELETE CASCADE
-                )
+                CREATE TRIGGER IF NOT EXISTS trg_keywords_fts_insert AFTER INSERT ON t_keywords BEGIN
+                    INSERT INTO t_keywords_fts(rowid, key_word, explain_text)
+                    VALUES (new.id, new.key_word, new.explain_text);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_keywords_fts_delete AFTER DELETE ON t_keywords BEGIN
+                    INSERT INTO t_keywords_fts(t_keywords_fts, rowid, key_word, explain_text)
+                    VALUES ('delete', old.id, old.key_word, old.explain_text);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_keywords_fts_update AFTER UPDATE OF key_word, explain_text ON t_keywords BEGIN
+                    INSERT INTO t_keywords_fts(t_keywords_fts, rowid, key_word, explain_text)
+                    VALUES ('delete', old.id, old.key_word, old.explain_text);
+                    INSERT INTO t_keywords_fts(rowid, key_word, explain_text)
+                    VALUES (new.id, new.key_word, new.explain_text);
+                END
             """)
             
-            # 创建索引以提高查询性能
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_subtitle_series_id ON t_subtitle(series_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_subtitle_time ON t_subtitle(begin_time, end_time)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_keywords_subtitle_id ON t_keywords(subtitle_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_keywords_word ON t_keywords(key_word)")
+            if not columns:
+                # 首次创建时为已有单词建立索引
+                cursor.execute("INSERT INTO t_keywords_fts(t_keywords_fts) VALUES ('rebuild')")
+                LOG.info("📊 已创建单词全文索引 t_keywords_fts")
             
-            # 执行数据库迁移
-            self._migrate_database(cursor)
+            return True
+        except Exception as e:
+            LOG.warning(f"⚠️ 创建单词全文索引失败，搜索将使用全表扫描: {e}")
+            return False
+    
+    def _use_keyword_fts(self, keyword: str) -> bool:
+        """
+        判断搜索词能否走 trigram 全文索引
+        
+        少于3个字符或含有 LIKE 通配符时，trigram 索引的匹配结果与 LIKE 不完全一致
+        （如不足3个字符的中文），这类搜索直接查询 t_keywords。
+        """
+        return self._keyword_fts and len(keyword) >= 3 and '%' not in keyword and '_' not in keyword
+    
+    def _get_conn(self) -> Tuple[sqlite3.Connection, threading.RLock]:
+        """
+        获取当前使用的连接及保护它的锁
+        
+        每次调用都按当前的 db_path 取连接，切换 db_path 后立即生效。
+        """
+        if self._conn is not None:
+            return self._conn, lock_for(self._conn)
+        return get_connection(self.db_path), get_lock(self.db_path)
+    
+    @contextmanager
+    def _connect(self):
+        """持有锁使用共享的读写连接（自动提交模式）"""
+        conn, lock = self._get_conn()
+        with lock:
+            yield conn
+    
+    @contextmanager
+    def _reader(self):
+        """
+        获取只读查询使用的连接
+        
+        默认从 db_conn 的只读连接池借出，查询不必等待写事务释放锁；
+        使用外部注入的连接时退化为持锁使用该连接。
+        """
+        if self._conn is not None:
+            with self._connect() as conn:
+                yield conn
+        else:
+            with reader(self.db_path) as conn:
+                yield conn
+    
+    @contextmanager
+    def _transaction(self):
+        """
+        持有锁并在显式事务中执行写操作，正常退出时提交，异常时回滚
+        
+        使用 BEGIN IMMEDIATE 在事务开始时就取得写锁：整批写入只在提交时同步一次，
+        也避免先读后写的事务在升级写锁时与其他进程互相等待而报 SQLITE_BUSY。
+        在已开启的事务中嵌套调用时改用保存点，由最外层统一提交，内层失败只撤销自己的写入。
+        """
+        with self._connect() as conn:
+            if conn.in_transaction:
+                conn.execute("SAVEPOINT nested_write")
+                try:
+                    yield conn
+                except BaseException:
+                    conn.execute("ROLLBACK TO nested_write")
+                    conn.execute("RELEASE nested_write")
+                    raise
+                else:
+                    conn.execute("RELEASE nested_write")
+                return
             
-            conn.commit()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+    
+    def close(self):
+        """
+        关闭数据库连接（共享连接关闭后，下次访问时会重新打开）
+        
+        外部注入的连接归调用方所有，不会被关闭，只注销为它登记的锁
+        """
+        if self._conn is not None:
+            with lock_for(self._conn):
+                forget(self._conn)
+        else:
+            close_connection(self.db_path)
     
     def _migrate_database(self, cursor):
-        """执行数据库迁移，添加新字段"""
+        """执行数据库迁移，为旧版数据库补齐缺失字段（字段齐全时只执行一次查询）"""
         try:
-            # 检查 t_series 表是否已有 new_name 和 new_file_path 字段
-            cursor.execute("PRAGMA table_info(t_series)")
-            columns = [column[1] for column in cursor.fetchall()]
-            
-            # 添加 new_name 字段（如果不存在）
-            if 'new_name' not in columns:
-                cursor.execute("ALTER TABLE t_series ADD COLUMN new_name TEXT")
-                LOG.info("📊 已添加 new_name 字段到 t_series 表")
-            
-            # 添加 new_file_path 字段（如果不存在）
-            if 'new_file_path' not in columns:
-                cursor.execute("ALTER TABLE t_series ADD COLUMN new_file_path TEXT")
-                LOG.info("📊 已添加 new_file_path 字段到 t_series 表")
-            
-            # 添加 second_name 字段（如果不存在）
-            if 'second_name' not in columns:
-                cursor.execute("ALTER TABLE t_series ADD COLUMN second_name TEXT")
-                LOG.info("📊 已添加 second_name 字段到 t_series 表")
-            
-            # 添加 second_file_path 字段（如果不存在）
-            if 'second_file_path' not in columns:
-                cursor.execute("ALTER TABLE t_series ADD COLUMN second_file_path TEXT")
-                LOG.info("📊 已添加 second_file_path 字段到 t_series 表")
-            
-            # 添加 third_name 字段（如果不存在）
-            if 'third_name' not in columns:
-                cursor.execute("ALTER TABLE t_series ADD COLUMN third_name TEXT")
-                LOG.info("📊 已添加 third_name 字段到 t_series 表")
-            
-            # 添加 third_file_path 字段（如果不存在）
-            if 'third_file_path' not in columns:
-                cursor.execute("ALTER TABLE t_series ADD COLUMN third_file_path TEXT")
-                LOG.info("📊 已添加 third_file_path 字段到 t_series 表")
-            
-            # 添加 first_name 字段（如果不存在）
-            if 'first_name' not in columns:
-                cursor.execute("ALTER TABLE t_series ADD COLUMN first_name TEXT")
-                LOG.info("📊 已添加 first_name 字段到 t_series 表")
-            
-            # 添加 first_file_path 字段（如果不存在）
-            if 'first_file_path' not in columns:
-                cursor.execute("ALTER TABLE t_series ADD COLUMN first_file_path TEXT")
-                LOG.info("📊 已添加 first_file_path 字段到 t_series 表")
-            
-            # 检查 t_keywords 表是否已有 coca 字段
-            cursor.execute("PRAGMA table_info(t_keywords)")
-            keyword_columns = [column[1] for column in cursor.fetchall()]
-            
-            # 添加 coca 字段（如果不存在）
-            if 'coca' not in keyword_columns:
-                cursor.execute("ALTER TABLE t_keywords ADD COLUMN coca INTEGER")
-                LOG.info("📊 已添加 coca 字段到 t_keywords 表")
-            
-            # 添加 is_selected 字段（如果不存在）
-            if 'is_selected' not in keyword_columns:
-                cursor.execute("ALTER TABLE t_keywords ADD COLUMN is_selected INTEGER DEFAULT 0")
-                LOG.info("📊 已添加 is_selected 字段到 t_keywords 表")
+            # 一次查询取出两张表的现有字段
+            cursor.execute("""
+                SELECT 't_series', name FROM pragma_table_info('t_series')
+                UNION ALL
+                SELECT 't_keywords', name FROM pragma_table_info('t_keywords')
+            """)
+            existing = set(cursor.fetchall())
+            
+            for table, column, definition in _MIGRATION_COLUMNS:
+                if (table, column) in existing:
+                    continue
                 
-                # 根据现有的coca值初始化is_selected字段
-                cursor.execute("""
-                    UPDATE t_keywords 
-                    SET is_selected = CASE 
-                        WHEN coca > 5000 THEN 1
-                        ELSE 0
-                    END
-                    WHERE coca IS NOT NULL
-                """)
-                LOG.info("📊 已根据coca值初始化 is_selected 字段")
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                LOG.info(f"📊 已添加 {column} 字段到 {table} 表")
+                
+                if (table, column) == ('t_keywords', 'is_selected'):
+                    # 根据现有的coca值初始化is_selected字段：新增字段的默认值0不需要改写行，
+                    # 只更新需要选中的单词
+                    cursor.execute("UPDATE t_keywords SET is_selected = 1 WHERE coca > ?", (_AUTO_SELECT_MIN_COCA,))
+                    LOG.info("📊 已根据coca值初始化 is_selected 字段")
                 
         except Exception as e:
+            # 交给 _init_database 回滚整个事务，版本号不会更新，下次启动时重新迁移
             LOG.error(f"❌ 数据库迁移失败: {e}")
+            raise
     
     def create_series(self, name: str, file_path: str = None, file_type: str = None, duration: float = None, 
                      new_name: str = None, new_file_path: str = None,
@@ -186,26 +678,39 @@ class DatabaseManager:
         返回:
         - series_id: 新创建的系列ID
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._transaction() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO t_series (name, file_path, file_type, duration, 
-                                     new_name, new_file_path,
-                                     first_name, first_file_path,
-                                     second_name, second_file_path,
-                                     third_name, third_file_path)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (name, file_path, file_type, duration, 
+            cursor.execute(_SQL_INSERT_SERIES, (name, file_path, file_type, duration, 
                  new_name, new_file_path,
                  first_name, first_file_path,
                  second_name, second_file_path,
                  third_name, third_file_path))
             
             series_id = cursor.lastrowid
-            conn.commit()
+        
+        # 提交后再写日志，不延长写锁的持有时间
+        LOG.info(f"📊 创建媒体系列: {name} (ID: {series_id})")
+        return series_id
+    
+    def create_series_batch(self, series_list: List[Dict]) -> List[int]:
+        """
+        在一个事务中批量创建媒体系列，整批只提交（同步磁盘）一次
+        
+        参数:
+        - series_list: 系列列表，每个系列是 create_series 的参数字典（name 必填）
+        
+        返回:
+        - List[int]: 按输入顺序排列的系列ID列表
+        """
+        rows = [tuple(series.get(column) for column in _SERIES_COLUMNS) for series in series_list]
+        
+        with self._transaction() as conn:
+            cursor = conn.cursor()
             
-            LOG.info(f"📊 创建媒体系列: {name} (ID: {series_id})")
-            return series_id
+            series_ids = self._insert_rows(cursor, _SQL_INSERT_SERIES, rows)
+        
+        LOG.info(f"📊 批量创建媒体系列: {len(series_ids)} 个")
+        return series_ids
     
     def update_series_video_info(self, series_id: int, new_name: str = None, new_file_path: str = None,
                             first_name: str = None, first_file_path: str = None,
@@ -228,59 +733,19 @@ class DatabaseManager:
         返回:
         - bool: 是否更新成功
         """
+        values = (new_name, new_file_path, first_name, first_file_path,
+                  second_name, second_file_path, third_name, third_file_path)
+        if all(value is None for value in values):
+            LOG.warning("⚠️ 没有提供要更新的字段")
+            return False
+        
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._transaction() as conn:
                 cursor = conn.cursor()
                 
-                # 构建动态更新语句
-                update_fields = []
-                update_values = []
-                
-                if new_name is not None:
-                    update_fields.append("new_name = ?")
-                    update_values.append(new_name)
-                
-                if new_file_path is not None:
-                    update_fields.append("new_file_path = ?")
-                    update_values.append(new_file_path)
-                
-                if first_name is not None:
-                    update_fields.append("first_name = ?")
-                    update_values.append(first_name)
-                
-                if first_file_path is not None:
-                    update_fields.append("first_file_path = ?")
-                    update_values.append(first_file_path)
-                
-                if second_name is not None:
-                    update_fields.append("second_name = ?")
-                    update_values.append(second_name)
-                
-                if second_file_path is not None:
-                    update_fields.append("second_file_path = ?")
-                    update_values.append(second_file_path)
-                
-                if third_name is not None:
-                    update_fields.append("third_name = ?")
-                    update_values.append(third_name)
-                
-                if third_file_path is not None:
-                    update_fields.append("third_file_path = ?")
-                    update_values.append(third_file_path)
-                
-                if not update_fields:
-                    LOG.warning("⚠️ 没有提供要更新的字段")
-                    return False
-                
-                # 添加更新时间
-                update_fields.append("updated_at = CURRENT_TIMESTAMP")
-                update_values.append(series_id)
-                
-                sql = f"UPDATE t_series SET {', '.join(update_fields)} WHERE id = ?"
-                cursor.execute(sql, update_values)
+                cursor.execute(_SQL_UPDATE_SERIES_VIDEO_INFO, values + (series_id,))
                 
                 if cursor.rowcount > 0:
-                    conn.commit()
                     LOG.info(f"📊 更新系列视频信息成功: ID={series_id}")
                     return True
                 else:
@@ -302,33 +767,22 @@ class DatabaseManager:
         返回:
         - List[int]: 创建的字幕ID列表
         """
-        subtitle_ids = []
+        # 替换英文和中文文本中的单引号为反引号
+        rows = [(
+            series_id,
+            subtitle.get('begin_time'),
+            subtitle.get('end_time'),
+            _sanitize_text(subtitle.get('english_text')),
+            _sanitize_text(subtitle.get('chinese_text'))
+        ) for subtitle in subtitles]
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._transaction() as conn:
             cursor = conn.cursor()
             
-            for subtitle in subtitles:
-                # 替换英文和中文文本中的单引号为反引号
-                english_text = subtitle.get('english_text', '').replace("'", "`").replace(":","：") if subtitle.get('english_text') else ''
-                chinese_text = subtitle.get('chinese_text', '').replace("'", "`").replace(":","：") if subtitle.get('chinese_text') else ''
-                
-                cursor.execute("""
-                    INSERT INTO t_subtitle (series_id, begin_time, end_time, english_text, chinese_text)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
-                    series_id,
-                    subtitle.get('begin_time'),
-                    subtitle.get('end_time'),
-                    english_text,
-                    chinese_text
-                ))
-                
-                subtitle_ids.append(cursor.lastrowid)
-            
-            conn.commit()
-            
-            LOG.info(f"📊 创建字幕条目: {len(subtitle_ids)} 条 (系列ID: {series_id})")
-            return subtitle_ids
+            subtitle_ids = self._insert_rows(cursor, _SQL_INSERT_SUBTITLE, rows)
+        
+        LOG.info(f"📊 创建字幕条目: {len(subtitle_ids)} 条 (系列ID: {series_id})")
+        return subtitle_ids
     
     def create_keywords(self, subtitle_id: int, keywords: List[Dict]) -> List[int]:
         """
@@ -337,161 +791,413 @@ class DatabaseManager:
         参数:
         - subtitle_id: 字幕ID (如果关键词列表中每个单词都有自己的subtitle_id，则此参数可以忽略)
         - keywords: 单词列表，每个单词包含 key_word, phonetic_symbol, explain_text, coca, subtitle_id(可选)
+                    未提供coca的单词会在写入前查询COCA排名补全
         
         返回:
         - List[int]: 创建的单词ID列表
         """
-        keyword_ids = []
+        missing_ranks = self._lookup_missing_coca(keywords)
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        rows = []
+        for keyword in keywords:
+            # 优先使用关键词自身的subtitle_id，如果没有则使用参数传入的subtitle_id
+            current_subtitle_id = keyword.get('subtitle_id', subtitle_id)
             
-            for keyword in keywords:
-                # 优先使用关键词自身的subtitle_id，如果没有则使用参数传入的subtitle_id
-                current_subtitle_id = keyword.get('subtitle_id', subtitle_id)
-                
-                if not current_subtitle_id:
-                    LOG.warning(f"⚠️ 跳过无效的字幕ID: {keyword.get('key_word', '未知单词')}")
-                    continue
-                
-                # 替换单词、音标和解释文本中的单引号为反引号
-                key_word = keyword.get('key_word', '').replace("'", "`").replace(":","：") if keyword.get('key_word') else ''
-                phonetic_symbol = keyword.get('phonetic_symbol', '').replace("'", "`").replace(":","：") if keyword.get('phonetic_symbol') else ''
-                explain_text = keyword.get('explain_text', '').replace("'", "`").replace(":","：") if keyword.get('explain_text') else ''
-                
-                # 获取coca值
-                coca_value = keyword.get('coca', None)
-                
-                # 根据coca值确定是否选中（大于5000则选中）
-                is_selected = 1 if coca_value and coca_value > 5000 else 0
-                
-                cursor.execute("""
-                    INSERT INTO t_keywords (subtitle_id, key_word, phonetic_symbol, explain_text, coca, is_selected)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
-                    current_subtitle_id,
-                    key_word,
-                    phonetic_symbol,
-                    explain_text,
-                    coca_value,
-                    is_selected
-                ))
-                
-                keyword_ids.append(cursor.lastrowid)
+            if not current_subtitle_id:
+                LOG.warning(f"⚠️ 跳过无效的字幕ID: {keyword.get('key_word', '未知单词')}")
+                continue
             
-            conn.commit()
+            # 替换单词、音标和解释文本中的单引号为反引号
+            key_word = _sanitize_text(keyword.get('key_word'))
+            phonetic_symbol = _sanitize_text(keyword.get('phonetic_symbol'))
+            explain_text = _sanitize_text(keyword.get('explain_text'))
+            
+            # 获取coca值（未提供时使用补全的排名）
+            coca_value = keyword.get('coca', None)
+            if coca_value is None:
+                coca_value = missing_ranks.get(keyword.get('key_word'))
+            
+            # 根据coca值确定是否选中（大于5000则选中）
+            is_selected = 1 if coca_value and coca_value > _AUTO_SELECT_MIN_COCA else 0
+            
+            rows.append((
+                current_subtitle_id,
+                key_word,
+                phonetic_symbol,
+                explain_text,
+                coca_value,
+                is_selected
+            ))
+        
+        with self._transaction() as conn:
+            cursor = conn.cursor()
             
-            LOG.info(f"📊 创建重点单词: {len(keyword_ids)} 个")
-            return keyword_ids
+            keyword_ids = self._insert_rows(cursor, _SQL_INSERT_KEYWORD, rows)
+        
+        LOG.info(f"📊 创建重点单词: {len(keyword_ids)} 个")
+        return keyword_ids
     
-    def get_series(self, series_id: int = None) -> List[Dict]:
+    def create_series_with_content(self, series: Dict, subtitles: List[Dict]) -> Dict:
+        """
+        在一个事务中创建系列、字幕及其重点单词，整批导入只提交（同步磁盘）一次
+        
+        参数:
+        - series: create_series 的参数字典（name 必填）
+        - subtitles: 字幕列表，格式同 create_subtitles，每条字幕可带 keywords 列表（格式同 create_keywords）
+        
+        返回:
+        - Dict: {'series_id': 系列ID, 'subtitle_ids': 字幕ID列表, 'keyword_ids': 单词ID列表}
+        """
+        # 先在事务外补全COCA排名，避免持有写锁期间查询词频
+        all_keywords = [keyword for subtitle in subtitles for keyword in subtitle.get('keywords') or []]
+        missing_ranks = self._lookup_missing_coca(all_keywords)
+        
+        with self._transaction():
+            series_id = self.create_series(**series)
+            subtitle_ids = self.create_subtitles(series_id, subtitles)
+            
+            keywords = []
+            for subtitle_id, subtitle in zip(subtitle_ids, subtitles):
+                for keyword in subtitle.get('keywords') or []:
+                    keyword = dict(keyword, subtitle_id=subtitle_id)
+                    if keyword.get('coca') is None:
+                        keyword['coca'] = missing_ranks.get(keyword.get('key_word'))
+                    keywords.append(keyword)
+            keyword_ids = self.create_keywords(None, keywords) if keywords else []
+        
+        return {'series_id': series_id, 'subtitle_ids': subtitle_ids, 'keyword_ids': keyword_ids}
+    
+    def _lookup_missing_coca(self, keywords: List[Dict]) -> Dict[str, Optional[int]]:
+        """
+        为没有coca值的单词查询COCA排名，写入时即保存排名，读取时无需再关联 t_coca
+        
+        参数:
+        - keywords: 单词列表
+        
+        返回:
+        - Dict[str, Optional[int]]: 单词 → 排名（查询失败或未找到为None）
+        """
+        words = {k['key_word'] for k in keywords if k.get('coca') is None and k.get('key_word')}
+        if not words:
+            return {}
+        
+        lookup = self._coca_lookup
+        if lookup is None:
+            lookup = self._coca_lookup = self._create_coca_lookup()
+            if lookup is None:
+                return {}
+        
+        # 与关键词提取时一致，使用 get_frequency_rank（短语和变形词会给出估算排名）
+        return {word: lookup.get_frequency_rank(word) for word in words}
+    
+    def _create_coca_lookup(self):
+        """
+        创建查询本数据库 t_coca 表的COCA查询器（默认数据库复用全局 coca_lookup，共享已加载的排名表）
+        
+        返回:
+        - COCADatabaseLookup: 查询器，模块无法加载时为None
+        """
+        try:
+            import coca_lookup as module
+        except ImportError:
+            try:
+                from src import coca_lookup as module
+            except ImportError as e:
+                LOG.warning(f"⚠️ 无法加载COCA查询模块，单词将不记录排名: {e}")
+                return None
+        
+        if self._conn is None and self.db_path == DEFAULT_DB_PATH:
+            return module.coca_lookup
+        return module.COCADatabaseLookup(self.db_path, conn=self._conn)
+    
+    def _insert_rows(self, cursor, insert_sql: str, rows: List[tuple]) -> List[int]:
+        """
+        批量插入并返回按插入顺序排列的行ID
+        
+        支持 RETURNING 时按块执行多行插入，直接取回ID；否则退回 executemany
+        加 last_insert_rowid() 推算。
+        
+        参数:
+        - cursor: 事务内的游标
+        - insert_sql: 单行插入语句
+        - rows: 参数元组列表
+        
+        返回:
+        - List[int]: 按插入顺序排列的ID列表
+        """
+        if not _HAS_RETURNING:
+            cursor.executemany(insert_sql, rows)
+            return self._inserted_ids(cursor, len(rows))
+        
+        ids = []
+        for start in range(0, len(rows), _RETURNING_BATCH_ROWS):
+            chunk = rows[start:start + _RETURNING_BATCH_ROWS]
+            cursor.execute(_multirow_insert_sql(insert_sql, len(chunk)),
+                           [value for row in chunk for value in row])
+            # RETURNING 不保证返回顺序；同一语句内 AUTOINCREMENT 按 VALUES 顺序递增分配ID
+            ids.extend(sorted(row[0] for row in cursor.fetchall()))
+        return ids
+    
+    def _inserted_ids(self, cursor, count: int) -> List[int]:
+        """
+        计算刚刚通过 executemany 批量插入的行ID
+        
+        executemany 不会为每一行提供 lastrowid。三张表的主键都是 AUTOINCREMENT，
+        且批量插入在同一个事务内完成，新分配的ID是连续的，因此可由
+        last_insert_rowid() 向前推算出整批ID。
+        
+        参数:
+        - cursor: 执行插入的游标
+        - count: 插入的行数
+        
+        返回:
+        - List[int]: 按插入顺序排列的ID列表
+        """
+        if count == 0:
+            return []
+        
+        last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+        return list(range(last_id - count + 1, last_id + 1))
+    
+    def _row_cursor(self, conn: sqlite3.Connection, as_dict: bool = True) -> sqlite3.Cursor:
+        """
+        创建读取多行结果的游标
+        
+        转换为字典时游标直接返回元组，由 _fetch_rows / _iter_rows 按列名一次性组装，
+        避免先构造 sqlite3.Row 再逐列按名称取值；只有 as_dict=False 时才使用 sqlite3.Row。
+        row_factory 只作用于本次查询的游标，不设置在共享连接上。
+        
+        参数:
+        - conn: 数据库连接
+        - as_dict: 调用方是否需要字典结果
+        
+        返回:
+        - sqlite3.Cursor: 游标
+        """
+        cursor = conn.cursor()
+        if not as_dict:
+            cursor.row_factory = sqlite3.Row
+        return cursor
+    
+    def _fetch_rows(self, cursor, as_dict: bool = True) -> List:
+        """
+        读取游标的全部结果
+        
+        参数:
+        - cursor: 由 _row_cursor 创建并已执行查询的游标
+        - as_dict: 是否转换为字典
+        
+        返回:
+        - List: 字典列表或 sqlite3.Row 列表
+        """
+        rows = cursor.fetchall()
+        if not as_dict:
+            return rows
+        keys = [column[0] for column in cursor.description]
+        return [dict(zip(keys, row)) for row in rows]
+    
+    def _iter_rows(self, cursor, as_dict: bool = True) -> Iterator:
+        """
+        按批逐行读取游标结果，不在内存中保留完整结果集
+        
+        参数:
+        - cursor: 由 _row_cursor 创建并已执行查询的游标
+        - as_dict: 是否转换为字典
+        
+        返回:
+        - Iterator: 逐行产出字典或 sqlite3.Row
+        """
+        keys = [column[0] for column in cursor.description] if as_dict else None
+        while True:
+            rows = cursor.fetchmany(_FETCH_BATCH_SIZE)
+            if not rows:
+                break
+            if keys is None:
+                yield from rows
+            else:
+                for row in rows:
+                    yield dict(zip(keys, row))
+    
+    def get_series(self, series_id: int = None, as_dict: bool = True,
+                   limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
         """
         获取媒体系列信息
         
         参数:
         - series_id: 系列ID，如果为None则返回所有系列
+        - as_dict: 为False时直接返回sqlite3.Row（支持按列名访问），省去逐行构造字典
+        - limit: 返回所有系列时最多返回的条数，None 表示不限制
+        - offset: 跳过的条数，与 limit 配合分页
         
         返回:
         - List[Dict]: 系列信息列表
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+        with self._reader() as conn:
+            cursor = self._row_cursor(conn, as_dict)
             
             if series_id:
-                cursor.execute("SELECT * FROM t_series WHERE id = ?", (series_id,))
-                result = cursor.fetchone()
-                return [dict(result)] if result else []
+                cursor.execute(_SQL_SERIES_BY_ID, (series_id,))
             else:
-                cursor.execute("SELECT * FROM t_series ORDER BY created_at DESC")
-                return [dict(row) for row in cursor.fetchall()]
+                cursor.execute(_SQL_ALL_SERIES, (-1 if limit is None else limit, offset))
+            
+            return self._fetch_rows(cursor, as_dict)
+    
+    def count_series(self) -> int:
+        """
+        获取系列总数（分页显示时计算总页数）
+        
+        返回:
+        - int: 系列数量
+        """
+        with self._reader() as conn:
+            return conn.execute(_SQL_COUNT_SERIES).fetchone()[0]
+    
+    def get_series_by_id(self, series_id: int) -> Optional[Dict]:
+        """
+        获取指定ID的系列（主键点查，不读取整张系列表）
+        
+        参数:
+        - series_id: 系列ID
+        
+        返回:
+        - Dict: 系列信息，如果不存在则返回None
+        """
+        with self._reader() as conn:
+            cursor = self._row_cursor(conn)
+            cursor.execute(_SQL_SERIES_BY_ID, (series_id,))
+            
+            rows = self._fetch_rows(cursor)
+            return rows[0] if rows else None
     
-    def get_subtitles(self, series_id: int) -> List[Dict]:
+    def get_subtitles(self, series_id: int, as_dict: bool = True) -> List[Dict]:
         """
         获取指定系列的所有字幕
         
         参数:
         - series_id: 系列ID
+        - as_dict: 为False时直接返回sqlite3.Row（支持按列名访问），省去逐行构造字典
         
         返回:
         - List[Dict]: 字幕列表
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+        return list(self.iter_subtitles(series_id, as_dict))
+    
+    def iter_subtitles(self, series_id: int, as_dict: bool = True) -> Iterator[Dict]:
+        """
+        逐条产出指定系列的字幕（参数同 get_subtitles），适合只需顺序处理一遍的长字幕
+        
+        迭代期间占用一个只读连接，迭代结束或生成器关闭时归还。
+        """
+        with self._reader() as conn:
+            cursor = self._row_cursor(conn, as_dict)
             
-            cursor.execute("""
-                SELECT * FROM t_subtitle 
-                WHERE series_id = ? 
-                ORDER BY begin_time
-            """, (series_id,))
+            cursor.execute(_SQL_SUBTITLES_BY_SERIES, (series_id,))
             
-            return [dict(row) for row in cursor.fetchall()]
+            yield from self._iter_rows(cursor, as_dict)
+    
+    def get_subtitles_display(self, series_id: int, text_length: int = 100) -> List[tuple]:
+        """
+        获取用于表格展示的字幕，时间取整和长文本截断在SQL中完成
+        
+        参数:
+        - series_id: 系列ID
+        - text_length: 英文、中文文本保留的最大字符数，超出部分替换为省略号
+        
+        返回:
+        - List[tuple]: (id, 开始时间, 结束时间, 英文文本, 中文文本) 元组列表，按开始时间排序
+        """
+        with self._reader() as conn:
+            return conn.execute(_SQL_SUBTITLES_DISPLAY, (text_length, series_id)).fetchall()
     
-    def get_keywords(self, subtitle_id: int = None, series_id: int = None) -> List[Dict]:
+    def get_keywords(self, subtitle_id: int = None, series_id: int = None, as_dict: bool = True,
+                     limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
         """
         获取重点单词
         
         参数:
         - subtitle_id: 字幕ID（获取特定字幕的单词）
         - series_id: 系列ID（获取整个系列的单词）
+        - as_dict: 为False时直接返回sqlite3.Row（支持按列名访问），省去逐行构造字典
+        - limit: 最多返回的条数，None 表示不限制
+        - offset: 跳过的条数，与 limit 配合分页
         
         返回:
         - List[Dict]: 单词列表
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            if subtitle_id:
-                cursor.execute("""
-                    SELECT * FROM t_keywords 
-                    WHERE subtitle_id = ?
-                    ORDER BY created_at
-                """, (subtitle_id,))
-            elif series_id:
-                cursor.execute("""
-                    SELECT k.*, s.begin_time, s.end_time
-                    FROM t_keywords k
-                    JOIN t_subtitle s ON k.subtitle_id = s.id
-                    WHERE s.series_id = ?
-                    ORDER BY s.begin_time, k.created_at
-                """, (series_id,))
-            else:
-                cursor.execute("SELECT * FROM t_keywords ORDER BY created_at DESC")
+        return list(self.iter_keywords(subtitle_id, series_id, as_dict, limit, offset))
+    
+    def iter_keywords(self, subtitle_id: int = None, series_id: int = None, as_dict: bool = True,
+                      limit: Optional[int] = None, offset: int = 0) -> Iterator[Dict]:
+        """
+        逐条产出重点单词（参数同 get_keywords）
+        
+        迭代期间占用一个只读连接，迭代结束或生成器关闭时归还。
+        """
+        # 三种查询都是预先写好的常量语句，这里只选出语句和参数，在借出连接前完成
+        if subtitle_id:
+            sql, params = _SQL_KEYWORDS_BY_SUBTITLE, (subtitle_id,)
+        elif series_id:
+            sql, params = _SQL_KEYWORDS_BY_SERIES, (series_id,)
+        else:
+            sql, params = _SQL_ALL_KEYWORDS, ()
+        params += (-1 if limit is None else limit, offset)
+        
+        with self._reader() as conn:
+            cursor = self._row_cursor(conn, as_dict)
+            cursor.execute(sql, params)
             
-            return [dict(row) for row in cursor.fetchall()]
+            yield from self._iter_rows(cursor, as_dict)
+    
+    def count_keywords(self, series_id: int) -> int:
+        """
+        获取系列中的单词总数（分页显示时计算总页数）
+        
+        参数:
+        - series_id: 系列ID
+        
+        返回:
+        - int: 单词数量
+        """
+        with self._reader() as conn:
+            return conn.execute(_SQL_COUNT_SERIES_KEYWORDS, (series_id,)).fetchone()[0]
     
-    def search_keywords(self, keyword: str) -> List[Dict]:
+    def search_keywords(self, keyword: str, as_dict: bool = True, include_explain: bool = False,
+                        limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
         """
         搜索单词（支持模糊匹配）
         
         参数:
         - keyword: 搜索关键词
+        - as_dict: 为False时直接返回sqlite3.Row（支持按列名访问），省去逐行构造字典
+        - include_explain: 是否同时在单词解释中搜索
+        - limit: 最多返回的条数，None 表示不限制；排序和分页都在SQL中完成
+        - offset: 跳过的条数，与 limit 配合分页
         
         返回:
         - List[Dict]: 匹配的单词及其上下文信息
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+        return list(self.iter_search_keywords(keyword, as_dict, include_explain, limit, offset))
+    
+    def iter_search_keywords(self, keyword: str, as_dict: bool = True, include_explain: bool = False,
+                             limit: Optional[int] = None, offset: int = 0) -> Iterator[Dict]:
+        """
+        逐条产出单词搜索结果（参数同 search_keywords）
+        
+        迭代期间占用一个只读连接，迭代结束或生成器关闭时归还。
+        """
+        pattern = f"%{keyword}%"
+        # 全文索引筛选候选单词，避免前导通配符导致的全表扫描；过短的搜索词退回普通 LIKE
+        sql = _SQL_SEARCH_VARIANTS[(bool(self._use_keyword_fts(keyword)), bool(include_explain))]
+        params = (pattern, pattern) if include_explain else (pattern,)
+        # LIMIT 为负数时 SQLite 不限制条数，分页与否共用同一条语句
+        params += (-1 if limit is None else limit, offset)
+        
+        with self._reader() as conn:
+            cursor = self._row_cursor(conn, as_dict)
             
-            cursor.execute("""
-                SELECT 
-                    k.*,
-                    s.begin_time,
-                    s.end_time,
-                    s.english_text,
-                    s.chinese_text,
-                    ser.name as series_name
-                FROM t_keywords k
-                JOIN t_subtitle s ON k.subtitle_id = s.id
-                JOIN t_series ser ON s.series_id = ser.id
-                WHERE k.key_word LIKE ?
-                ORDER BY k.key_word, ser.name, s.begin_time
-            """, (f"%{keyword}%",))
-            
-            return [dict(row) for row in cursor.fetchall()]
+            cursor.execute(sql, params)
+            
+            yield from self._iter_rows(cursor, as_dict)
     
     def get_statistics(self) -> Dict:
         """
@@ -500,26 +1206,11 @@ class DatabaseManager:
         返回:
         - Dict: 统计信息
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._reader() as conn:
             cursor = conn.cursor()
             
-            # 统计各表的记录数
-            cursor.execute("SELECT COUNT(*) FROM t_series")
-            series_count = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM t_subtitle")
-            subtitle_count = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) FROM t_keywords")
-            keyword_count = cursor.fetchone()[0]
-            
-            # 统计独特单词数
-            cursor.execute("SELECT COUNT(DISTINCT key_word) FROM t_keywords")
-            unique_words = cursor.fetchone()[0]
-            
-            # 总时长
-            cursor.execute("SELECT SUM(duration) FROM t_series WHERE duration IS NOT NULL")
-            total_duration = cursor.fetchone()[0] or 0
+            cursor.execute(_SQL_STATISTICS)
+            series_count, subtitle_count, keyword_count, unique_words, total_duration = cursor.fetchone()
             
             return {
                 'series_count': series_count,
@@ -531,7 +1222,10 @@ class DatabaseManager:
     
     def delete_series(self, series_id: int) -> bool:
         """
-        删除系列（级联删除相关字幕和单词）
+        删除系列（同时删除相关字幕和单词）
+        
+        在同一事务中按 单词 → 字幕 → 系列 的顺序显式删除：每一步都是按索引的范围删除，
+        删除父表时外键级联已无行可删；未开启外键约束的连接上也不会留下孤立数据。
         
         参数:
         - series_id: 系列ID
@@ -540,12 +1234,13 @@ class DatabaseManager:
         - bool: 是否删除成功
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._transaction() as conn:
                 cursor = conn.cursor()
+                cursor.execute(_SQL_DELETE_SERIES_KEYWORDS, (series_id,))
+                cursor.execute("DELETE FROM t_subtitle WHERE series_id = ?", (series_id,))
                 cursor.execute("DELETE FROM t_series WHERE id = ?", (series_id,))
                 
                 if cursor.rowcount > 0:
-                    conn.commit()
                     LOG.info(f"📊 删除系列: ID {series_id}")
                     return True
                 else:
@@ -565,19 +1260,12 @@ class DatabaseManager:
         返回:
         - Dict: 字幕信息，如果不存在则返回None
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT * FROM t_subtitle 
-                WHERE id = ?
-            """, (subtitle_id,))
+        with self._reader() as conn:
+            cursor = self._row_cursor(conn)
+            cursor.execute(_SQL_SUBTITLE_BY_ID, (subtitle_id,))
             
-            result = cursor.fetchone()
-            if result:
-                return dict(result)
-            return None
+            rows = self._fetch_rows(cursor)
+            return rows[0] if rows else None
     
     def get_translation(self, subtitle_id: int) -> Optional[Dict]:
         """
@@ -589,10 +1277,12 @@ class DatabaseManager:
         返回:
         - Dict: 包含中文翻译的字典，如果不存在则返回None
         """
-        subtitle = self.get_subtitle_by_id(subtitle_id)
-        if subtitle and 'chinese_text' in subtitle:
-            return {'text': subtitle['chinese_text']}
-        return None
+        with self._reader() as conn:
+            # 只读取需要的一列，不再整行查询后再取值
+            result = conn.execute(_SQL_TRANSLATION, (subtitle_id,)).fetchone()
+            if result:
+                return {'text': result[0]}
+            return None
 
     def find_series_by_new_file_path(self, new_file_path: str) -> Optional[Dict]:
         """
@@ -605,35 +1295,19 @@ class DatabaseManager:
         - dict: 系列信息，未找到返回None
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                
-                # 查询条件：精确匹配new_file_path
-                cursor.execute("""
-                    SELECT * FROM t_series 
-                    WHERE new_file_path = ?
-                    LIMIT 1
-                """, (new_file_path,))
-                
-                row = cursor.fetchone()
-                if not row:
-                    LOG.warning(f"⚠️ 未找到预处理视频路径对应的系列: {new_file_path}")
-                    
-                    # 尝试通过文件名匹配
-                    file_name = os.path.basename(new_file_path)
-                    cursor.execute("""
-                        SELECT * FROM t_series 
-                        WHERE new_name = ?
-                        LIMIT 1
-                    """, (file_name,))
-                    
-                    row = cursor.fetchone()
-                    if not row:
-                        LOG.warning(f"⚠️ 未找到预处理视频名称对应的系列: {file_name}")
-                        return None
-                
-                return dict(row)
+            file_name = os.path.basename(new_file_path)
+            with self._reader() as conn:
+                cursor = self._row_cursor(conn)
+                # 精确匹配 new_file_path，找不到时按文件名匹配 new_name，一次查询完成
+                cursor.execute(_SQL_SERIES_BY_NEW_FILE, (new_file_path, file_name, new_file_path))
+                rows = self._fetch_rows(cursor)
+            
+            if not rows:
+                LOG.warning(f"⚠️ 未找到预处理视频路径或名称对应的系列: {new_file_path}")
+                return None
+            if rows[0]['new_file_path'] != new_file_path:
+                LOG.warning(f"⚠️ 未找到预处理视频路径对应的系列，按文件名匹配: {file_name}")
+            return rows[0]
                 
         except Exception as e:
             LOG.error(f"❌ 根据预处理视频路径查找系列失败: {e}")
@@ -641,7 +1315,9 @@ class DatabaseManager:
 
     def delete_subtitles_by_series_id(self, series_id: int) -> bool:
         """
-        删除指定系列的所有字幕
+        删除指定系列的所有字幕（同时删除这些字幕的单词）
+        
+        与 delete_series 相同，先显式删除单词再删除字幕，未开启外键约束的连接上也不会留下孤立单词。
         
         参数:
         - series_id: 系列ID
@@ -650,12 +1326,12 @@ class DatabaseManager:
         - bool: 是否删除成功
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._transaction() as conn:
                 cursor = conn.cursor()
+                cursor.execute(_SQL_DELETE_SERIES_KEYWORDS, (series_id,))
                 cursor.execute("DELETE FROM t_subtitle WHERE series_id = ?", (series_id,))
                 
                 deleted_count = cursor.rowcount
-                conn.commit()
                 
                 LOG.info(f"📊 删除系列ID={series_id}的字幕: {deleted_count}条")
                 return True
@@ -675,32 +1351,19 @@ class DatabaseManager:
         - bool: 是否删除成功
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._transaction() as conn:
                 cursor = conn.cursor()
                 
-                # 先获取系列的所有字幕ID
-                cursor.execute("""
-                    SELECT id FROM t_subtitle 
-                    WHERE series_id = ?
-                """, (series_id,))
-                
-                subtitle_ids = [row[0] for row in cursor.fetchall()]
-                
-                if not subtitle_ids:
-                    LOG.warning(f"⚠️ 系列ID={series_id}没有字幕，无法删除关键词")
-                    return False
-                
-                # 拼接字幕ID的IN子句
-                placeholders = ','.join(['?'] * len(subtitle_ids))
-                
-                # 删除这些字幕相关的所有关键词
-                cursor.execute(f"""
-                    DELETE FROM t_keywords 
-                    WHERE subtitle_id IN ({placeholders})
-                """, subtitle_ids)
-                
+                # 子查询按 idx_subtitle_series_begin 找出系列的字幕，不把字幕ID取回Python再拼接IN列表
+                cursor.execute(_SQL_DELETE_SERIES_KEYWORDS, (series_id,))
+                # 后面的 SELECT 会覆盖游标的 rowcount，先记下删除的行数
                 deleted_count = cursor.rowcount
-                conn.commit()
+                
+                if deleted_count == 0:
+                    cursor.execute(_SQL_SERIES_HAS_SUBTITLES, (series_id,))
+                    if not cursor.fetchone()[0]:
+                        LOG.warning(f"⚠️ 系列ID={series_id}没有字幕，无法删除关键词")
+                        return False
                 
                 LOG.info(f"📊 删除系列ID={series_id}的关键词: {deleted_count}条")
                 return True
@@ -717,30 +1380,32 @@ class DatabaseManager:
         - Dict: 统计信息，包含更新的字幕数和关键词数
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._transaction() as conn:
                 cursor = conn.cursor()
                 
+                # 用 instr 查找单引号，不必像 LIKE 那样解析模式、逐字符做大小写折叠。
+                # 过滤条件不能去掉：无条件 REPLACE 会改写每一行（单词表还会触发全文索引重建），
+                # 而 instr 只是对已读出的页做字节查找；
+                # 字符串使用单引号字面量，不依赖 SQLite 把双引号标识符当作字符串的兼容行为
                 # 1. 更新字幕表中的英文和中文文本
                 cursor.execute("""
-                    UPDATE t_subtitle 
-                    SET english_text = REPLACE(english_text, "'", "`"),
-                        chinese_text = REPLACE(chinese_text, "'", "`")
-                    WHERE english_text LIKE '%''%' OR chinese_text LIKE '%''%'
+                    UPDATE t_subtitle
+                    SET english_text = REPLACE(english_text, '''', '`'),
+                        chinese_text = REPLACE(chinese_text, '''', '`')
+                    WHERE instr(english_text, '''') > 0 OR instr(chinese_text, '''') > 0
                 """)
                 subtitle_count = cursor.rowcount
                 
                 # 2. 更新关键词表中的单词、音标和解释文本
                 cursor.execute("""
                     UPDATE t_keywords
-                    SET key_word = REPLACE(key_word, "'", "`"),
-                        phonetic_symbol = REPLACE(phonetic_symbol, "'", "`"),
-                        explain_text = REPLACE(explain_text, "'", "`")
-                    WHERE key_word LIKE '%''%' OR phonetic_symbol LIKE '%''%' OR explain_text LIKE '%''%'
+                    SET key_word = REPLACE(key_word, '''', '`'),
+                        phonetic_symbol = REPLACE(phonetic_symbol, '''', '`'),
+                        explain_text = REPLACE(explain_text, '''', '`')
+                    WHERE instr(key_word, '''') > 0 OR instr(phonetic_symbol, '''') > 0 OR instr(explain_text, '''') > 0
                 """)
                 keyword_count = cursor.rowcount
                 
-                conn.commit()
-                
                 LOG.info(f"✅ 单引号替换完成: 更新了 {subtitle_count} 条字幕和 {keyword_count} 个关键词")
                 return {
                     "subtitle_count": subtitle_count,
@@ -769,19 +1434,13 @@ class DatabaseManager:
         - bool: 是否更新成功
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._transaction() as conn:
                 cursor = conn.cursor()
                 
                 # 将布尔值转换为整数（1为选中，0为不选中）
                 selection_value = 1 if is_selected else 0
                 
-                cursor.execute("""
-                    UPDATE t_keywords
-                    SET is_selected = ?
-                    WHERE id = ?
-                """, (selection_value, keyword_id))
-                
-                conn.commit()
+                cursor.execute(_SQL_UPDATE_KEYWORD_SELECTION, (selection_value, keyword_id))
                 
                 if cursor.rowcount > 0:
                     LOG.info(f"✅ 已更新关键词(ID: {keyword_id})的选择状态为: {is_selected}")
@@ -793,6 +1452,33 @@ class DatabaseManager:
         except Exception as e:
             LOG.error(f"❌ 更新关键词选择状态失败: {e}")
             return False
+    
+    def update_keywords_coca(self, updates: Iterable[Tuple[int, int]]) -> int:
+        """
+        批量更新关键词的COCA排名，所有行在一个事务中用同一条预编译语句写入
+        
+        参数:
+        - updates: (coca排名, 关键词ID) 元组列表
+        
+        返回:
+        - int: 实际更新的关键词数量，失败时返回0
+        """
+        updates = list(updates)
+        if not updates:
+            return 0
+        
+        try:
+            with self._transaction() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(_SQL_UPDATE_KEYWORD_COCA, updates)
+                updated_count = cursor.rowcount
+            
+            LOG.info(f"✅ 已更新 {updated_count} 个关键词的COCA排名")
+            return updated_count
+            
+        except Exception as e:
+            LOG.error(f"❌ 批量更新关键词COCA排名失败: {e}")
+            return 0
             
     def batch_update_keyword_selection(self, series_id: int, selection_rule: str) -> Dict:
         """
@@ -809,70 +1495,46 @@ class DatabaseManager:
         返回:
         - Dict: 更新结果统计
         """
+        return self.batch_update_keyword_selection_many([series_id], selection_rule)
+    
+    def batch_update_keyword_selection_many(self, series_ids: Iterable[int], selection_rule: str) -> Dict:
+        """
+        按同一规则批量更新多个系列中关键词的选择状态，所有系列在一个事务中更新、只提交一次
+        
+        参数:
+        - series_ids: 系列ID列表
+        - selection_rule: 选择规则，取值同 batch_update_keyword_selection
+        
+        返回:
+        - Dict: 更新结果统计
+        """
+        statements = _SELECTION_RULES.get(selection_rule)
+        if statements is None:
+            return {
+                "success": False,
+                "error": f"不支持的选择规则: {selection_rule}",
+                "updated_count": 0
+            }
+        
+        series_ids = list(series_ids)
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._transaction() as conn:
                 cursor = conn.cursor()
                 
-                # 构建更新条件
-                if selection_rule == "all":
-                    # 选择所有关键词
-                    update_sql = """
-                        UPDATE t_keywords 
-                        SET is_selected = 1 
-                        WHERE subtitle_id IN (
-                            SELECT id FROM t_subtitle WHERE series_id = ?
-                        )
-                    """
-                    params = (series_id,)
-                elif selection_rule == "none":
-                    # 取消选择所有关键词
-                    update_sql = """
-                        UPDATE t_keywords 
-                        SET is_selected = 0 
-                        WHERE subtitle_id IN (
-                            SELECT id FROM t_subtitle WHERE series_id = ?
-                        )
-                    """
-                    params = (series_id,)
-                elif selection_rule == "coca5000":
-                    # 选择COCA > 5000的关键词
-                    update_sql = """
-                        UPDATE t_keywords 
-                        SET is_selected = CASE WHEN coca > 5000 THEN 1 ELSE 0 END 
-                        WHERE subtitle_id IN (
-                            SELECT id FROM t_subtitle WHERE series_id = ?
-                        ) AND coca IS NOT NULL
-                    """
-                    params = (series_id,)
-                elif selection_rule == "coca10000":
-                    # 选择COCA > 10000的关键词
-                    update_sql = """
-                        UPDATE t_keywords 
-                        SET is_selected = CASE WHEN coca > 10000 THEN 1 ELSE 0 END 
-                        WHERE subtitle_id IN (
-                            SELECT id FROM t_subtitle WHERE series_id = ?
-                        ) AND coca IS NOT NULL
-                    """
-                    params = (series_id,)
-                else:
-                    return {
-                        "success": False,
-                        "error": f"不支持的选择规则: {selection_rule}",
-                        "updated_count": 0
-                    }
-                
-                # 执行更新
-                cursor.execute(update_sql, params)
-                updated_count = cursor.rowcount
-                
-                conn.commit()
-                
-                LOG.info(f"✅ 已更新 {updated_count} 个关键词的选择状态 (规则: {selection_rule})")
-                return {
-                    "success": True,
-                    "updated_count": updated_count,
-                    "rule": selection_rule
-                }
+                # 执行更新（同一规则族共用预编译语句，只有参数不同）
+                updated_count = 0
+                for update_sql, value in statements:
+                    cursor.executemany(update_sql, [(value, series_id) for series_id in series_ids])
+                    # DML 语句的 rowcount 直接取自 sqlite3_changes()（executemany 为各组参数之和），
+                    # 不需要再查询 SELECT changes()
+                    updated_count += cursor.rowcount
+            
+            LOG.info(f"✅ 已更新 {len(series_ids)} 个系列中 {updated_count} 个关键词的选择状态 (规则: {selection_rule})")
+            return {
+                "success": True,
+                "updated_count": updated_count,
+                "rule": selection_rule
+            }
                 
         except Exception as e:
             LOG.error(f"❌ 批量更新关键词选择状态失败: {e}")
@@ -882,5 +1544,26 @@ class DatabaseManager:
                 "updated_count": 0
             }
 
-# 全局数据库实例
-db_manager = DatabaseManager() 
\ No newline at end of file
+# 全局数据库实例：首次使用时才创建，只导入模块（如只用到 DatabaseManager 的工具和测试）不会打开数据库、执行建表
+_db_manager: Optional[DatabaseManager] = None
+_db_manager_lock = threading.Lock()
+
+def get_db_manager() -> DatabaseManager:
+    """
+    获取全局数据库实例（首次调用时初始化默认数据库）
+    
+    返回:
+    - DatabaseManager: 全局数据库实例
+    """
+    global _db_manager
+    if _db_manager is None:
+        with _db_manager_lock:
+            if _db_manager is None:
+                _db_manager = DatabaseManager()
+    return _db_manager
+
+def __getattr__(name: str):
+    """兼容旧的 `from database import db_manager` 写法，访问时才创建全局实例"""
+    if name == 'db_manager':
+        return get_db_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -12,11 +12,173 @@ for var in proxy_vars:
         print(f"🧹 清除代理环境变量: {var}={os.environ[var]}")
         del os.environ[var]
 
+import threading
+import time
+from collections import deque
 import gradio as gr
 import pandas as pd
-from database import db_manager
+from database import get_db_manager
+from coca_lookup import coca_lookup
+from video_subtitle_burner import video_burner
 from logger import LOG
-from typing import List, Dict
+from typing import Any, Callable, Iterable, List, Dict, Tuple
+
+# 关键词搜索结果表格默认展示的条数，以及界面上可调的上限（结果会全部发送到浏览器）
+SEARCH_PAGE_SIZE = 100
+SEARCH_MAX_LIMIT = 500
+
+# 各表格的表头；回调返回以表头为列名的DataFrame，界面按列序列化，不再逐个单元格转换
+SERIES_TABLE_HEADERS = ["ID", "名称", "文件类型", "时长(秒)", "9:16视频名", "9:16视频路径",
+                        "关键词视频名", "关键词视频路径", "字幕视频名", "字幕视频路径", "创建时间"]
+SUBTITLE_TABLE_HEADERS = ["ID", "开始时间", "结束时间", "英文文本", "中文文本"]
+# 字幕表格中英文、中文文本显示的最大字符数
+SUBTITLE_TEXT_LENGTH = 100
+KEYWORD_TABLE_HEADERS = ["ID", "单词", "音标", "解释", "COCA排名", "频率等级", "来源系列", "时间段"]
+
+# 系列表格中路径列显示的最大长度
+PATH_DISPLAY_LENGTH = 50
+
+# 系列列表和关键词列表默认每页显示的条数
+DEFAULT_PAGE_SIZE = 50
+
+# 同一界面事件可同时处理的请求数。Gradio 在工作线程中运行同步回调，阻塞操作不会卡住事件循环，
+# 但默认每个事件同时只处理一个请求，多个用户同时查询时会互相排队
+UI_CONCURRENCY_LIMIT = 4
+
+# 系列列表、字幕表格和统计信息缓存的有效期（秒）
+UI_CACHE_TTL = 30
+
+# COCA更新时每攒够这么多行写入一次数据库
+COCA_UPDATE_BATCH_SIZE = 200
+
+# COCA更新进度推送到界面的最小间隔（秒）和每条消息中保留的最近记录数
+COCA_PROGRESS_INTERVAL = 0.25
+COCA_PROGRESS_RECENT_EVENTS = 10
+
+class TTLCache:
+    """带过期时间的简单缓存（线程安全），界面事件反复读取同一份数据时不重复查询数据库"""
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[str, tuple] = {}
+        self._lock = threading.RLock()
+    
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        """
+        获取缓存值，不存在或已过期时调用 loader 加载
+        
+        参数:
+        - key: 缓存键
+        - loader: 加载数据的函数
+        
+        返回:
+        - 缓存的数据
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+        
+        # 加载时不持有锁，查询较慢时不阻塞其他键的读取
+        value = loader()
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+        return value
+    
+    def invalidate(self, key: str = None):
+        """
+        使缓存失效
+        
+        参数:
+        - key: 缓存键，为None时清空全部缓存
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+_cache = TTLCache(UI_CACHE_TTL)
+
+def cached_series_page(page: int, page_size: int) -> Tuple[List[Dict], int]:
+    """
+    获取一页系列和系列总数（有效期内复用上次的查询结果，调用方不要修改返回的列表）
+    
+    参数:
+    - page: 页码（从1开始）
+    - page_size: 每页条数
+    
+    返回:
+    - Tuple[List[Dict], int]: (当前页的系列, 系列总数)
+    """
+    series_list = _cache.get(
+        f"series:{page}:{page_size}",
+        lambda: get_db_manager().get_series(limit=page_size, offset=(page - 1) * page_size)
+    )
+    total = _cache.get('series_count', get_db_manager().count_series)
+    return series_list, total
+
+def shorten_path(path: str) -> str:
+    """截断过长的路径，保证表格中的路径不超过 PATH_DISPLAY_LENGTH 个字符"""
+    if len(path) <= PATH_DISPLAY_LENGTH:
+        return path
+    return path[:PATH_DISPLAY_LENGTH - 3] + '...'
+
+def subtitle_table(series_id: int) -> pd.DataFrame:
+    """
+    查询系列的字幕表格（时间保留两位小数、长文本截断都由SQL完成，这里只构造DataFrame）
+    
+    参数:
+    - series_id: 系列ID
+    
+    返回:
+    - pd.DataFrame: 以 SUBTITLE_TABLE_HEADERS 为列名的表格数据
+    """
+    rows = get_db_manager().get_subtitles_display(series_id, SUBTITLE_TEXT_LENGTH)
+    return pd.DataFrame(rows, columns=SUBTITLE_TABLE_HEADERS)
+
+def keyword_table(keywords: Iterable, with_series_name: bool) -> pd.DataFrame:
+    """
+    把单词查询结果转换为关键词表格（搜索结果和按系列加载共用）
+    
+    参数:
+    - keywords: 单词记录（dict 或 sqlite3.Row），需包含字幕的 begin_time、end_time
+    - with_series_name: 是否填充来源系列列（需要记录中有 series_name）
+    
+    返回:
+    - pd.DataFrame: 以 KEYWORD_TABLE_HEADERS 为列名的表格数据
+    """
+    table_data = []
+    for keyword in keywords:
+        coca_rank = keyword['coca']
+        table_data.append([
+            keyword['id'],
+            keyword['key_word'],
+            keyword['phonetic_symbol'],
+            keyword['explain_text'],
+            coca_rank or '',
+            coca_lookup.get_frequency_level(coca_rank) if coca_rank else "未知",
+            keyword['series_name'] if with_series_name else "",
+            f"{keyword['begin_time']:.1f}s - {keyword['end_time']:.1f}s"
+        ])
+    return pd.DataFrame(table_data, columns=KEYWORD_TABLE_HEADERS)
+
+def search_limit_value(limit) -> int:
+    """把界面输入的搜索条数转换为 1 到 SEARCH_MAX_LIMIT 之间的整数，留空或非法时使用默认值"""
+    if not limit or limit <= 0:
+        return SEARCH_PAGE_SIZE
+    return min(int(limit), SEARCH_MAX_LIMIT)
+
+def normalize_page(page, page_size) -> Tuple[int, int]:
+    """把界面输入的页码和每页条数转换为正整数，留空或非法时使用默认值"""
+    page = int(page) if page and page > 0 else 1
+    page_size = int(page_size) if page_size and page_size > 0 else DEFAULT_PAGE_SIZE
+    return page, page_size
+
+def format_page_info(page: int, page_size: int, total: int) -> str:
+    """生成 "第 X / Y 页" 的分页说明"""
+    pages = max(1, -(-total // page_size))
+    return f"第 {page} / {pages} 页，共 {total} 条"
 
 def create_database_interface():
     """创建数据库管理界面"""
@@ -36,14 +198,17 @@ def create_database_interface():
                 with gr.Row():
                     with gr.Column(scale=3):
                         series_table = gr.Dataframe(
-                            headers=["ID", "名称", "文件类型", "时长(秒)", "9:16视频名", "9:16视频路径", 
-                                    "关键词视频名", "关键词视频路径", "字幕视频名", "字幕视频路径", "创建时间"],
+                            headers=SERIES_TABLE_HEADERS,
                             datatype=["number", "str", "str", "number", "str", "str", 
                                      "str", "str", "str", "str", "str"],
                             label="媒体系列列表",
                             interactive=False,
                             wrap=True
                         )
+                        with gr.Row():
+                            series_page = gr.Number(label="页码", value=1, precision=0)
+                            series_page_size = gr.Number(label="每页条数", value=DEFAULT_PAGE_SIZE, precision=0)
+                            series_page_info = gr.Markdown("")
                     
                     with gr.Column(scale=1):
                         refresh_series_btn = gr.Button("🔄 刷新列表", variant="secondary")
@@ -79,7 +244,7 @@ def create_database_interface():
                     load_subtitles_btn = gr.Button("加载字幕", variant="primary")
                 
                 subtitles_table = gr.Dataframe(
-                    headers=["ID", "开始时间", "结束时间", "英文文本", "中文文本"],
+                    headers=SUBTITLE_TABLE_HEADERS,
                     datatype=["number", "number", "number", "str", "str"],
                     label="字幕列表",
                     interactive=False,
@@ -91,6 +256,7 @@ def create_database_interface():
                 with gr.Row():
                     with gr.Column():
                         search_keyword_input = gr.Textbox(label="搜索关键词", placeholder="输入要搜索的单词...")
+                        search_limit = gr.Number(label=f"最多显示条数（不超过{SEARCH_MAX_LIMIT}）", value=SEARCH_PAGE_SIZE, precision=0)
                         search_btn = gr.Button("🔍 搜索", variant="primary")
                     
                     with gr.Column():
@@ -103,12 +269,16 @@ def create_database_interface():
                             coca_update_status = gr.Textbox(label="更新状态", interactive=False, placeholder="等待更新...")
                 
                 keywords_table = gr.Dataframe(
-                    headers=["ID", "单词", "音标", "解释", "COCA排名", "频率等级", "来源系列", "时间段"],
+                    headers=KEYWORD_TABLE_HEADERS,
                     datatype=["number", "str", "str", "str", "number", "str", "str", "str"],
                     label="关键词列表",
                     interactive=False,
                     wrap=True
                 )
+                with gr.Row():
+                    keyword_page = gr.Number(label="页码", value=1, precision=0)
+                    keyword_page_size = gr.Number(label="每页条数", value=DEFAULT_PAGE_SIZE, precision=0)
+                    keyword_page_info = gr.Markdown("")
                 
                 # 手动添加关键词
                 with gr.Row():
@@ -171,7 +341,8 @@ def create_database_interface():
         def update_statistics():
             """更新统计信息"""
             try:
-                stats = db_manager.get_statistics()
+                # 统计需要扫描各表，每次打开页面都会调用，有效期内复用上次的结果
+                stats = _cache.get('stats', get_db_manager().get_statistics)
                 
                 stats_text = f"""## 📈 数据统计
 
@@ -186,32 +357,26 @@ def create_database_interface():
                 LOG.error(f"获取统计信息失败: {e}")
                 return "## 📈 数据统计\n❌ 加载失败"
 
-        def load_series_list():
-            """加载媒体系列列表"""
+        def load_series_list(page=1, page_size=DEFAULT_PAGE_SIZE):
+            """加载一页媒体系列列表，同时返回分页说明"""
             try:
-                series_list = db_manager.get_series()
+                page, page_size = normalize_page(page, page_size)
+                series_list, total = cached_series_page(page, page_size)
+                page_info = format_page_info(page, page_size, total)
                 
                 if not series_list:
-                    return []
+                    return [], page_info
                 
                 # 转换为表格数据
                 table_data = []
                 for series in series_list:
                     # 处理视频信息的显示
                     new_name = series.get('new_name', '') or '未处理'
-                    new_path = series.get('new_file_path', '') or '未设置'
+                    new_path = shorten_path(series.get('new_file_path', '') or '未设置')
                     second_name = series.get('second_name', '') or '未烧制'
-                    second_path = series.get('second_file_path', '') or '未设置'
+                    second_path = shorten_path(series.get('second_file_path', '') or '未设置')
                     third_name = series.get('third_name', '') or '未烧制'
-                    third_path = series.get('third_file_path', '') or '未设置'
-                    
-                    # 截断过长的路径显示
-                    if len(new_path) > 50:
-                        new_path = new_path[:47] + '...'
-                    if len(second_path) > 50:
-                        second_path = second_path[:47] + '...'
-                    if len(third_path) > 50:
-                        third_path = third_path[:47] + '...'
+                    third_path = shorten_path(series.get('third_file_path', '') or '未设置')
                     
                     table_data.append([
                         series['id'],
@@ -227,10 +392,10 @@ def create_database_interface():
                         series['created_at']
                     ])
                 
-                return table_data
+                return pd.DataFrame(table_data, columns=SERIES_TABLE_HEADERS), page_info
             except Exception as e:
                 LOG.error(f"加载系列列表失败: {e}")
-                return []
+                return [], ""
 
         def load_subtitles_by_series(series_id):
             """根据系列ID加载字幕"""
@@ -238,133 +403,65 @@ def create_database_interface():
                 return []
             
             try:
-                subtitles = db_manager.get_subtitles(int(series_id))
-                
-                if not subtitles:
-                    return []
-                
-                # 转换为表格数据
-                table_data = []
-                for subtitle in subtitles:
-                    table_data.append([
-                        subtitle['id'],
-                        round(subtitle['begin_time'], 2),
-                        round(subtitle['end_time'], 2),
-                        subtitle.get('english_text', '')[:100] + ('...' if len(subtitle.get('english_text', '')) > 100 else ''),
-                        subtitle.get('chinese_text', '')[:100] + ('...' if len(subtitle.get('chinese_text', '')) > 100 else '')
-                    ])
-                
-                return table_data
+                # 字幕表不分页，长字幕有数千行；有效期内重复查看同一系列直接返回上次生成的表格
+                series_id = int(series_id)
+                return _cache.get(f"subtitles:{series_id}", lambda: subtitle_table(series_id))
             except Exception as e:
                 LOG.error(f"加载字幕失败: {e}")
                 return []
 
-        def search_keywords_func(keyword):
+        def search_keywords_func(keyword, limit=SEARCH_PAGE_SIZE):
             """搜索关键词"""
             if not keyword.strip():
                 return []
             
             try:
-                results = db_manager.search_keywords(keyword.strip())
-                
-                if not results:
-                    return []
-                
-                # 转换为表格数据
-                table_data = []
-                for result in results:
-                    time_range = f"{result.get('begin_time', 0):.1f}s - {result.get('end_time', 0):.1f}s"
-                    coca_rank = result.get('coca', None)
-                    
-                    # 获取频率等级
-                    if coca_rank:
-                        from coca_lookup import coca_lookup
-                        frequency_level = coca_lookup.get_frequency_level(coca_rank)
-                    else:
-                        frequency_level = "未知"
-                    
-                    table_data.append([
-                        result['id'],
-                        result['key_word'],
-                        result.get('phonetic_symbol', ''),
-                        result.get('explain_text', ''),
-                        coca_rank or '',
-                        frequency_level,
-                        result.get('series_name', ''),
-                        time_range
-                    ])
-                
-                return table_data
+                # 表格只展示前 limit 条结果，条数限制交给SQL；结果只读，直接使用sqlite3.Row
+                results = get_db_manager().iter_search_keywords(keyword.strip(), as_dict=False, limit=search_limit_value(limit))
+                return keyword_table(results, with_series_name=True)
             except Exception as e:
                 LOG.error(f"搜索关键词失败: {e}")
                 return []
 
-        def load_keywords_by_series(series_id):
-            """根据系列ID加载关键词"""
+        def load_keywords_by_series(series_id, page=1, page_size=DEFAULT_PAGE_SIZE):
+            """根据系列ID加载一页关键词，同时返回分页说明"""
             if not series_id:
-                return []
+                return [], ""
             
             try:
-                keywords = db_manager.get_keywords(series_id=int(series_id))
-                
-                if not keywords:
-                    return []
-                
-                # 转换为表格数据
-                table_data = []
-                for keyword in keywords:
-                    time_range = f"{keyword.get('begin_time', 0):.1f}s - {keyword.get('end_time', 0):.1f}s"
-                    coca_rank = keyword.get('coca', None)
-                    
-                    # 获取频率等级
-                    if coca_rank:
-                        from coca_lookup import coca_lookup
-                        frequency_level = coca_lookup.get_frequency_level(coca_rank)
-                    else:
-                        frequency_level = "未知"
-                    
-                    table_data.append([
-                        keyword['id'],
-                        keyword['key_word'],
-                        keyword.get('phonetic_symbol', ''),
-                        keyword.get('explain_text', ''),
-                        coca_rank or '',
-                        frequency_level,
-                        "",  # 系列名（因为已经按系列筛选）
-                        time_range
-                    ])
+                page, page_size = normalize_page(page, page_size)
+                series_id = int(series_id)
+                page_info = format_page_info(page, page_size, get_db_manager().count_keywords(series_id))
                 
-                return table_data
+                # 只查询当前页；已按系列筛选，不显示系列名
+                keywords = get_db_manager().iter_keywords(series_id=series_id, as_dict=False,
+                                                          limit=page_size, offset=(page - 1) * page_size)
+                return keyword_table(keywords, with_series_name=False), page_info
             except Exception as e:
                 LOG.error(f"加载关键词失败: {e}")
-                return []
+                return [], ""
 
         def update_video_info_func(series_id, new_name, new_path, second_name, second_path, third_name, third_path):
             """更新系列的烧制视频信息"""
             if not series_id:
                 return "❌ 请输入有效的系列ID"
             
-            has_input = any([
-                new_name.strip(), new_path.strip(),
-                second_name.strip(), second_path.strip(),
-                third_name.strip(), third_path.strip()
-            ])
+            # 每个字段只去除一次首尾空白，留空的字段传None（保持数据库中的原值）
+            fields = {
+                'new_name': new_name, 'new_file_path': new_path,
+                'second_name': second_name, 'second_file_path': second_path,
+                'third_name': third_name, 'third_file_path': third_path,
+            }
+            fields = {key: value.strip() or None for key, value in fields.items()}
             
-            if not has_input:
+            if not any(fields.values()):
                 return "❌ 请至少输入一个视频信息字段"
             
             try:
-                success = db_manager.update_series_video_info(
-                    int(series_id),
-                    new_name=new_name.strip() if new_name.strip() else None,
-                    new_file_path=new_path.strip() if new_path.strip() else None,
-                    second_name=second_name.strip() if second_name.strip() else None,
-                    second_file_path=second_path.strip() if second_path.strip() else None,
-                    third_name=third_name.strip() if third_name.strip() else None,
-                    third_file_path=third_path.strip() if third_path.strip() else None
-                )
+                success = get_db_manager().update_series_video_info(int(series_id), **fields)
                 
                 if success:
+                    _cache.invalidate()
                     return f"✅ 系列 {series_id} 的视频信息已更新"
                 else:
                     return f"❌ 更新失败，请检查系列ID是否存在"
@@ -379,8 +476,9 @@ def create_database_interface():
                 return "请输入有效的系列ID"
             
             try:
-                success = db_manager.delete_series(int(series_id))
+                success = get_db_manager().delete_series(int(series_id))
                 if success:
+                    _cache.invalidate()
                     return f"✅ 成功删除系列 {series_id}"
                 else:
                     return f"❌ 删除失败，系列 {series_id} 不存在"
@@ -396,7 +494,6 @@ def create_database_interface():
             try:
                 # 如果未提供COCA排名，自动从数据库查询
                 if not coca_rank:
-                    from coca_lookup import coca_lookup
                     coca_rank = coca_lookup.get_frequency_rank(keyword.strip())
                 
                 keyword_data = [{
@@ -406,8 +503,9 @@ def create_database_interface():
                     'coca': int(coca_rank) if coca_rank else None
                 }]
                 
-                keyword_ids = db_manager.create_keywords(int(subtitle_id), keyword_data)
+                keyword_ids = get_db_manager().create_keywords(int(subtitle_id), keyword_data)
                 if keyword_ids:
+                    _cache.invalidate('stats')
                     coca_info = f" (COCA: {coca_rank})" if coca_rank else ""
                     return f"✅ 成功添加关键词: {keyword}{coca_info} (ID: {keyword_ids[0]})"
                 else:
@@ -426,12 +524,7 @@ def create_database_interface():
                 series_id = int(series_id)
                 
                 # 检查系列是否存在
-                series_list = db_manager.get_series()
-                target_series = None
-                for series in series_list:
-                    if series['id'] == series_id:
-                        target_series = series
-                        break
+                target_series = get_db_manager().get_series_by_id(series_id)
                 
                 if not target_series:
                     yield "❌ 找不到指定的系列"
@@ -440,66 +533,90 @@ def create_database_interface():
                 yield f"🔍 开始更新系列 '{target_series['name']}' 的COCA信息..."
                 
                 # 获取该系列的所有关键词
-                keywords = db_manager.get_keywords(series_id=series_id)
+                keywords = get_db_manager().get_keywords(series_id=series_id)
                 if not keywords:
                     yield "❌ 该系列没有关键词数据"
                     return
                 
-                yield f"📚 找到 {len(keywords)} 个关键词，开始更新COCA排名..."
-                
-                from coca_lookup import coca_lookup
-                import sqlite3
+                total = len(keywords)
+                yield f"📚 找到 {total} 个关键词，开始更新COCA排名..."
                 
                 updated_count = 0
                 skipped_count = 0
                 failed_count = 0
-                
-                with sqlite3.connect(db_manager.db_path) as conn:
-                    cursor = conn.cursor()
-                    
-                    for i, keyword in enumerate(keywords):
-                        try:
-                            word = keyword['key_word']
-                            is_phrase = ' ' in word  # 判断是否为短语
-                            
-                            # 检查是否已有COCA信息
-                            if keyword.get('coca') is not None and not is_phrase:
-                                # 单词有COCA排名就跳过，但短语需要强制更新
-                                skipped_count += 1
-                                progress = f"处理中: {i+1}/{len(keywords)} (已更新: {updated_count}, 跳过: {skipped_count}, 失败: {failed_count})"
-                                yield f"⏭️ '{word}' 已有COCA排名 {keyword['coca']}，跳过\n{progress}"
-                                continue
-                            elif keyword.get('coca') is not None and is_phrase:
+                pending_updates = []
+                # 需要查询的单词（没有排名的单词和所有短语）一次批量取回排名
+                coca_ranks = coca_lookup.get_frequency_ranks([
+                    keyword['key_word'] for keyword in keywords
+                    if keyword.get('coca') is None or ' ' in keyword['key_word']
+                ])
+                # 最近处理的几条记录与进度合并成一条消息，按时间间隔节流推送到界面
+                recent_events = deque(maxlen=COCA_PROGRESS_RECENT_EVENTS)
+                last_yield = time.monotonic()
+                
+                def progress_message(i):
+                    progress = f"处理中: {i+1}/{total} (已更新: {updated_count}, 跳过: {skipped_count}, 失败: {failed_count})"
+                    return "\n".join(recent_events) + f"\n{progress}"
+                
+                def flush_updates():
+                    """写入待更新的行；未能写入的行从成功数转为失败数"""
+                    nonlocal updated_count, failed_count
+                    # update_keywords_coca 出错时回滚整批并返回0，按实际写入的行数统计
+                    written = get_db_manager().update_keywords_coca(pending_updates)
+                    lost = len(pending_updates) - written
+                    if lost:
+                        updated_count -= lost
+                        failed_count += lost
+                        recent_events.append(f"❌ {lost} 个关键词的COCA排名写入数据库失败")
+                    pending_updates.clear()
+                
+                for i, keyword in enumerate(keywords):
+                    try:
+                        word = keyword['key_word']
+                        is_phrase = ' ' in word  # 判断是否为短语
+                        
+                        # 检查是否已有COCA信息
+                        if keyword.get('coca') is not None and not is_phrase:
+                            # 单词有COCA排名就跳过，但短语需要强制更新
+                            skipped_count += 1
+                            recent_events.append(f"⏭️ '{word}' 已有COCA排名 {keyword['coca']}，跳过")
+                        else:
+                            if keyword.get('coca') is not None:
                                 # 短语需要强制更新到20000+
-                                progress = f"处理中: {i+1}/{len(keywords)} (已更新: {updated_count}, 跳过: {skipped_count}, 失败: {failed_count})"
-                                yield f"🔄 '{word}' 是短语，强制更新COCA排名（旧值: {keyword['coca']}）\n{progress}"
+                                recent_events.append(f"🔄 '{word}' 是短语，强制更新COCA排名（旧值: {keyword['coca']}）")
                             
-                            # 查询COCA排名
-                            coca_rank = coca_lookup.get_frequency_rank(word)
+                            coca_rank = coca_ranks.get(word)
                             
                             if coca_rank:
-                                # 更新数据库
-                                cursor.execute(
-                                    "UPDATE t_keywords SET coca = ? WHERE id = ?",
-                                    (coca_rank, keyword['id'])
-                                )
+                                # 先记录待更新行，攒够一批再写入数据库（每批一个事务）
+                                pending_updates.append((coca_rank, keyword['id']))
                                 updated_count += 1
+                                if len(pending_updates) >= COCA_UPDATE_BATCH_SIZE:
+                                    flush_updates()
                                 
                                 freq_level = coca_lookup.get_frequency_level(coca_rank)
-                                progress = f"处理中: {i+1}/{len(keywords)} (已更新: {updated_count}, 跳过: {skipped_count}, 失败: {failed_count})"
                                 update_type = "强制更新" if is_phrase and keyword.get('coca') is not None else "新增"
-                                yield f"✅ '{word}' → COCA排名: {coca_rank} ({freq_level}) [{update_type}]\n{progress}"
+                                recent_events.append(f"✅ '{word}' → COCA排名: {coca_rank} ({freq_level}) [{update_type}]")
                             else:
                                 failed_count += 1
-                                progress = f"处理中: {i+1}/{len(keywords)} (已更新: {updated_count}, 跳过: {skipped_count}, 失败: {failed_count})"
-                                yield f"⚠️ '{word}' 未找到COCA排名\n{progress}"
-                            
-                        except Exception as e:
-                            failed_count += 1
-                            progress = f"处理中: {i+1}/{len(keywords)} (已更新: {updated_count}, 跳过: {skipped_count}, 失败: {failed_count})"
-                            yield f"❌ '{word}' 更新失败: {str(e)}\n{progress}"
+                                recent_events.append(f"⚠️ '{word}' 未找到COCA排名")
+                        
+                    except Exception as e:
+                        failed_count += 1
+                        recent_events.append(f"❌ '{word}' 更新失败: {str(e)}")
+                        # 出错时立即推送
+                        last_yield = time.monotonic()
+                        yield progress_message(i)
+                        continue
                     
-                    conn.commit()
+                    now = time.monotonic()
+                    if now - last_yield >= COCA_PROGRESS_INTERVAL:
+                        last_yield = now
+                        yield progress_message(i)
+                
+                # 写入最后一批不足 COCA_UPDATE_BATCH_SIZE 的行
+                if pending_updates:
+                    flush_updates()
                 
                 # 最终报告
                 final_result = f"""🎉 COCA更新完成！
@@ -507,8 +624,8 @@ def create_database_interface():
 📊 **更新统计**:
 - ✅ 成功更新: {updated_count} 个
 - ⏭️ 已有排名: {skipped_count} 个  
-- ❌ 查询失败: {failed_count} 个
-- 📚 总计处理: {len(keywords)} 个关键词
+- ❌ 查询或写入失败: {failed_count} 个
+- 📚 总计处理: {total} 个关键词
 
 💡 提示: 刷新关键词列表查看更新结果"""
 
@@ -524,15 +641,8 @@ def create_database_interface():
                 return "## 📋 烧制预览\n❌ 请输入系列ID"
             
             try:
-                from video_subtitle_burner import video_burner
-                
                 # 获取系列信息
-                series_list = db_manager.get_series()
-                target_series = None
-                for series in series_list:
-                    if series['id'] == int(series_id):
-                        target_series = series
-                        break
+                target_series = get_db_manager().get_series_by_id(int(series_id))
                 
                 if not target_series:
                     return "## 📋 烧制预览\n❌ 找不到指定的系列"
@@ -580,8 +690,6 @@ def create_database_interface():
                 return
             
             try:
-                from video_subtitle_burner import video_burner
-                
                 progress_log = []
                 
                 def progress_callback(message):
@@ -617,6 +725,8 @@ def create_database_interface():
                 )
                 
                 if output_video:
+                    # 烧制后会记录新视频的信息
+                    _cache.invalidate()
                     final_message = "✅ 烧制完成！"
                     progress_log.append(final_message)
                     yield '\n'.join(progress_log), f"🎉 烧制成功！\n输出文件: {output_video}"
@@ -640,7 +750,7 @@ def create_database_interface():
                 from keyword_extractor import keyword_extractor
                 
                 # 获取系列字幕
-                subtitles = db_manager.get_subtitles(int(series_id))
+                subtitles = get_db_manager().get_subtitles(int(series_id))
                 if not subtitles:
                     return "❌ 该系列没有字幕数据", "未找到字幕"
                 
@@ -651,10 +761,11 @@ def create_database_interface():
                 
                 yield f"🔄 开始AI分析...", f"准备分析 {len(english_subtitles)} 条字幕"
                 
-                # 使用批量提取模式（更高效）
-                extracted_keywords = keyword_extractor.batch_extract_with_context(
-                    english_subtitles, batch_size=3
-                )
+                # 使用批量提取模式（更高效），各批次并发请求，每完成一批更新一次进度
+                extracted_keywords = []
+                for done, total, keywords in keyword_extractor.iter_extract_batches(english_subtitles, batch_size=3):
+                    extracted_keywords.extend(keywords)
+                    yield f"🔄 AI分析中...", f"已完成 {done}/{total} 批，提取到 {len(extracted_keywords)} 个关键词"
                 
                 if not extracted_keywords:
                     yield "⚠️ AI未提取到关键词", "分析完成，但未找到重点词汇"
@@ -662,23 +773,23 @@ def create_database_interface():
                 
                 yield f"💾 保存到数据库...", f"提取到 {len(extracted_keywords)} 个关键词"
                 
-                # 分组保存到数据库
+                # 每个关键词带有自己的字幕ID，在一个事务中批量写入
+                keyword_data = [{
+                    'subtitle_id': keyword['subtitle_id'],
+                    'key_word': keyword['key_word'],
+                    'phonetic_symbol': keyword.get('phonetic_symbol', ''),
+                    'explain_text': keyword.get('explain_text', ''),
+                    # 解析AI结果时已查询过COCA排名，不再重复查询
+                    'coca': keyword.get('coca')
+                } for keyword in extracted_keywords if keyword['subtitle_id']]
+                
                 saved_count = 0
-                for keyword in extracted_keywords:
-                    subtitle_id = keyword['subtitle_id']
-                    if subtitle_id:
-                        keyword_data = [{
-                            'key_word': keyword['key_word'],
-                            'phonetic_symbol': keyword.get('phonetic_symbol', ''),
-                            'explain_text': keyword.get('explain_text', '')
-                        }]
-                        
-                        try:
-                            db_manager.create_keywords(subtitle_id, keyword_data)
-                            saved_count += 1
-                        except Exception as e:
-                            LOG.error(f"保存关键词失败: {e}")
+                try:
+                    saved_count = len(get_db_manager().create_keywords(None, keyword_data))
+                except Exception as e:
+                    LOG.error(f"保存关键词失败: {e}")
                 
+                _cache.invalidate('stats')
                 yield f"✅ AI提取完成！", f"成功保存 {saved_count} 个关键词到数据库"
                 
             except Exception as e:
@@ -687,15 +798,29 @@ def create_database_interface():
 
         # 绑定事件
         interface.load(
-            fn=lambda: (update_statistics(), load_series_list()),
-            outputs=[stats_display, series_table]
+            fn=lambda: (update_statistics(), *load_series_list()),
+            outputs=[stats_display, series_table, series_page_info]
         )
         
+        def refresh_series(page, page_size):
+            """手动刷新时丢弃缓存，重新查询系列列表"""
+            _cache.invalidate()
+            return (update_statistics(), *load_series_list(page, page_size))
+        
         refresh_series_btn.click(
-            fn=lambda: (update_statistics(), load_series_list()),
-            outputs=[stats_display, series_table]
+            fn=refresh_series,
+            inputs=[series_page, series_page_size],
+            outputs=[stats_display, series_table, series_page_info]
         )
         
+        # 修改页码或每页条数时重新加载当前页
+        for page_input in (series_page, series_page_size):
+            page_input.submit(
+                fn=load_series_list,
+                inputs=[series_page, series_page_size],
+                outputs=[series_table, series_page_info]
+            )
+        
         view_subtitles_btn.click(
             fn=load_subtitles_by_series,
             inputs=[selected_series_id],
@@ -709,17 +834,25 @@ def create_database_interface():
         )
         
         search_btn.click(
-            fn=search_keywords_func,
-            inputs=[search_keyword_input],
-            outputs=[keywords_table]
+            fn=lambda keyword, limit: (search_keywords_func(keyword, limit),
+                                       f"搜索结果最多显示前 {search_limit_value(limit)} 条"),
+            inputs=[search_keyword_input, search_limit],
+            outputs=[keywords_table, keyword_page_info]
         )
         
         load_keywords_btn.click(
             fn=load_keywords_by_series,
-            inputs=[keyword_series_id],
-            outputs=[keywords_table]
+            inputs=[keyword_series_id, keyword_page, keyword_page_size],
+            outputs=[keywords_table, keyword_page_info]
         )
         
+        for page_input in (keyword_page, keyword_page_size):
+            page_input.submit(
+                fn=load_keywords_by_series,
+                inputs=[keyword_series_id, keyword_page, keyword_page_size],
+                outputs=[keywords_table, keyword_page_info]
+            )
+        
         delete_series_btn.click(
             fn=delete_series_func,
             inputs=[selected_series_id],
@@ -752,8 +885,8 @@ def create_database_interface():
             outputs=[update_result]
         ).then(
             fn=load_series_list,
-            inputs=[],
-            outputs=[series_table]
+            inputs=[series_page, series_page_size],
+            outputs=[series_table, series_page_info]
         )
         
         # 视频烧制事件绑定
@@ -763,10 +896,12 @@ def create_database_interface():
             outputs=[preview_info]
         )
         
+        # ffmpeg 烧制本身会占满所有CPU核心，同一时间只运行一个烧制任务，其余排队
         burn_btn.click(
             fn=burn_video_with_progress,
             inputs=[burn_series_id, output_dir_input],
-            outputs=[burn_progress, burn_result]
+            outputs=[burn_progress, burn_result],
+            concurrency_limit=1
         )
     
     return interface
@@ -774,7 +909,7 @@ def create_database_interface():
 if __name__ == "__main__":
     LOG.info("🚀 启动数据库管理界面...")
     interface = create_database_interface()
-    interface.queue().launch(
+    interface.queue(default_concurrency_limit=UI_CONCURRENCY_LIMIT).launch(
         server_name="0.0.0.0",
         server_port=7861,
         share=False,
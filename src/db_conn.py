@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+数据库连接管理模块
+同一数据库文件在进程内只打开一个读写长连接，由DatabaseManager和COCA查询器共享，
+避免各自维护一份重复的页缓存；另有一组只读连接供查询使用，在WAL模式下与写入并发
+"""
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Tuple
+from urllib.parse import quote
+
+try:
+    from src.logger import LOG
+except ImportError:
+    from logger import LOG
+
+DEFAULT_DB_PATH = "data/englishcut.db"
+# 内存数据库只存在于打开它的连接中，不能转换为绝对路径，也没有只读连接可用
+MEMORY_DB_PATH = ":memory:"
+
+# 连接级PRAGMA：WAL允许读写并发，synchronous=NORMAL在WAL下每次提交少一次fsync，
+# 64MB页缓存可容纳整张t_coca表，内存临时表和mmap减少磁盘读写与read()系统调用。
+# journal_mode 持久化在数据库文件中，其余参数只对当前连接有效，每个新连接都要重新设置：
+# busy_timeout 让其他进程持有写锁时等待而不是立即报 SQLITE_BUSY，
+# foreign_keys 使表结构中声明的 ON DELETE CASCADE 真正生效
+_JOURNAL_MODE_PRAGMA = "PRAGMA journal_mode=WAL"
+_FOREIGN_KEYS_PRAGMA = "PRAGMA foreign_keys=ON"
+_CONNECTION_PRAGMAS = (
+    _JOURNAL_MODE_PRAGMA,
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+    _FOREIGN_KEYS_PRAGMA,
+    "PRAGMA mmap_size=268435456",
+)
+
+# 只读连接只需要会话级参数；多个只读连接同时存在，页缓存设得比读写连接小，
+# 数据页主要通过mmap共享操作系统的页缓存
+_READER_PRAGMAS = (
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-16384",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+)
+
+# 每个连接的预编译语句缓存容量：连接长期存在，缓存放宽后高频语句不会被
+# 迁移、统计等偶发语句挤出（sqlite3默认只有128条）
+_CACHED_STATEMENTS = 512
+
+# 每个数据库最多保留的空闲只读连接数
+_READER_POOL_SIZE = min(8, os.cpu_count() or 4)
+
+# 数据库绝对路径 → 共享连接 / 保护该连接的可重入锁
+_connections: Dict[str, sqlite3.Connection] = {}
+_path_locks: Dict[str, threading.RLock] = {}
+# id(连接) → (连接, 锁)；保存连接本身，保证id在登记期间不会被复用
+_conn_locks: Dict[int, Tuple[sqlite3.Connection, threading.RLock]] = {}
+# 数据库绝对路径 → 空闲只读连接池
+_reader_pools: Dict[str, queue.LifoQueue] = {}
+_registry_lock = threading.Lock()
+
+def _key(db_path: str) -> str:
+    """同一文件的不同写法（相对/绝对路径）映射到同一个连接"""
+    if db_path == MEMORY_DB_PATH:
+        return db_path
+    return os.path.abspath(db_path)
+
+def configure_connection(conn: sqlite3.Connection, pragmas: Tuple[str, ...] = _CONNECTION_PRAGMAS):
+    """
+    为连接设置PRAGMA
+
+    参数:
+    - conn: 数据库连接
+    - pragmas: 要执行的PRAGMA语句，默认为读写连接的参数
+    """
+    for pragma in pragmas:
+        try:
+            row = conn.execute(pragma).fetchone()
+            # journal_mode 返回实际生效的模式（文件系统不支持时会保持原模式）
+            if pragma == _JOURNAL_MODE_PRAGMA and row and row[0].lower() != 'wal':
+                LOG.warning(f"⚠️ 数据库未能切换到WAL模式，当前日志模式: {row[0]}")
+        except Exception as e:
+            LOG.warning(f"⚠️ 设置数据库连接参数失败 ({pragma}): {e}")
+    
+    # 设置 foreign_keys 不返回结果，且在事务中设置会被静默忽略，需要单独确认
+    if _FOREIGN_KEYS_PRAGMA in pragmas and not conn.execute("PRAGMA foreign_keys").fetchone()[0]:
+        LOG.warning("⚠️ 外键约束未能开启，删除系列或字幕时不会级联删除")
+
+def get_lock(db_path: str = DEFAULT_DB_PATH) -> threading.RLock:
+    """
+    获取保护指定数据库共享连接的锁（不会打开连接）
+
+    参数:
+    - db_path: 数据库文件路径
+
+    返回:
+    - threading.RLock: 该数据库共享连接的可重入锁
+    """
+    key = _key(db_path)
+    with _registry_lock:
+        lock = _path_locks.get(key)
+        if lock is None:
+            lock = _path_locks[key] = threading.RLock()
+        return lock
+
+def get_connection(db_path: str = DEFAULT_DB_PATH) -> sqlite3.Connection:
+    """
+    获取指定数据库的共享长连接（首次调用时打开并设置PRAGMA）
+
+    连接允许跨线程使用，调用方需持有 get_lock() / lock_for() 返回的锁再访问。
+    连接处于自动提交模式（isolation_level=None），需要事务时由调用方显式 BEGIN/COMMIT。
+
+    参数:
+    - db_path: 数据库文件路径
+
+    返回:
+    - sqlite3.Connection: 共享连接
+    """
+    key = _key(db_path)
+    lock = get_lock(db_path)
+    with lock:
+        conn = _connections.get(key)
+        if conn is None:
+            conn = sqlite3.connect(key, check_same_thread=False, cached_statements=_CACHED_STATEMENTS, isolation_level=None)
+            if key == MEMORY_DB_PATH:
+                # 内存数据库没有日志文件可切换，只设置会话级参数
+                configure_connection(conn, tuple(p for p in _CONNECTION_PRAGMAS if p != _JOURNAL_MODE_PRAGMA))
+            else:
+                configure_connection(conn)
+            with _registry_lock:
+                _connections[key] = conn
+                _conn_locks[id(conn)] = (conn, lock)
+        return conn
+
+def lock_for(conn: sqlite3.Connection) -> threading.RLock:
+    """
+    获取保护某个连接的锁，外部注入的连接首次使用时登记一把新锁
+
+    参数:
+    - conn: 数据库连接
+
+    返回:
+    - threading.RLock: 该连接的可重入锁
+    """
+    with _registry_lock:
+        entry = _conn_locks.get(id(conn))
+        if entry is None or entry[0] is not conn:
+            entry = _conn_locks[id(conn)] = (conn, threading.RLock())
+        return entry[1]
+
+def forget(conn: sqlite3.Connection):
+    """
+    注销外部注入连接登记的锁（不关闭连接，连接仍归调用方所有）
+
+    参数:
+    - conn: 之前通过 lock_for() 登记过的连接
+    """
+    with _registry_lock:
+        entry = _conn_locks.get(id(conn))
+        if entry is not None and entry[0] is conn:
+            del _conn_locks[id(conn)]
+
+def close_connection(db_path: str = DEFAULT_DB_PATH):
+    """
+    关闭指定数据库的共享连接，之后再调用 get_connection() 会重新打开
+
+    参数:
+    - db_path: 数据库文件路径
+    """
+    key = _key(db_path)
+    with get_lock(db_path):
+        with _registry_lock:
+            conn = _connections.pop(key, None)
+            if conn is not None:
+                _conn_locks.pop(id(conn), None)
+            pool = _reader_pools.pop(key, None)
+        if conn is not None:
+            conn.close()
+    
+    # 正在使用中的只读连接归还时发现连接池已移除，会自行关闭
+    while pool is not None:
+        try:
+            pool.get_nowait().close()
+        except queue.Empty:
+            break
+
+def close_all():
+    """
+    关闭进程内所有共享连接和空闲只读连接（进程退出时自动调用）
+    
+    最后一个连接关闭时 SQLite 会把WAL中的内容写回数据库文件并删除WAL文件。
+    """
+    with _registry_lock:
+        keys = set(_connections) | set(_reader_pools)
+    for key in keys:
+        try:
+            close_connection(key)
+        except Exception as e:
+            LOG.warning(f"⚠️ 关闭数据库连接失败 ({key}): {e}")
+
+atexit.register(close_all)
+
+def _open_reader(key: str) -> sqlite3.Connection:
+    """以只读模式打开数据库（数据库文件必须已存在）"""
+    conn = sqlite3.connect(f"file:{quote(key)}?mode=ro", uri=True, check_same_thread=False,
+                           cached_statements=_CACHED_STATEMENTS, isolation_level=None)
+    configure_connection(conn, _READER_PRAGMAS)
+    return conn
+
+@contextmanager
+def reader(db_path: str = DEFAULT_DB_PATH):
+    """
+    借出一个只读连接，退出时归还到连接池
+
+    只读连接不需要加锁：每个连接同一时刻只被一个线程使用，
+    WAL模式下读取不会被写入阻塞，只能看到已提交的数据。
+    内存数据库没有只读连接，借出的是持锁的共享连接。
+
+    参数:
+    - db_path: 数据库文件路径
+    """
+    key = _key(db_path)
+    if key == MEMORY_DB_PATH:
+        # 内存数据库只能通过共享连接访问，持锁使用
+        with get_lock(db_path):
+            yield get_connection(db_path)
+        return
+    
+    with _registry_lock:
+        pool = _reader_pools.get(key)
+        if pool is None:
+            pool = _reader_pools[key] = queue.LifoQueue(maxsize=_READER_POOL_SIZE)
+    
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = _open_reader(key)
+    
+    try:
+        yield conn
+    finally:
+        with _registry_lock:
+            keep = _reader_pools.get(key) is pool
+        if keep:
+            try:
+                pool.put_nowait(conn)
+            except queue.Full:
+                keep = False
+        if not keep:
+            conn.close()
@@ -25,7 +25,7 @@ import gradio as gr
 from logger import LOG
 from media_processor import process_media_file, get_media_formats_info
 from file_detector import FileType, get_file_type, validate_file
-from database import db_manager
+from database import get_db_manager
 import pandas as pd
 
 # 初始化视频列表
@@ -33,7 +33,7 @@ def load_video_list():
     """加载视频列表"""
     try:
         # 从数据库获取所有视频列表
-        series_list = db_manager.get_series()
+        series_list = get_db_manager().get_series()
         
         if not series_list:
             LOG.warning("⚠️ 数据库中没有系列数据")
@@ -80,7 +80,7 @@ def load_subtitle_videos():
     """加载已有字幕的视频列表"""
     try:
         # 从数据库获取所有视频列表
-        series_list = db_manager.get_series()
+        series_list = get_db_manager().get_series()
         
         if not series_list:
             LOG.warning("⚠️ 数据库中没有系列数据")
@@ -92,7 +92,7 @@ def load_subtitle_videos():
         options = []
         for series in series_list:
             # 检查是否有字幕
-            subtitles = db_manager.get_subtitles(series['id'])
+            subtitles = get_db_manager().get_subtitles(series['id'])
             if subtitles:
                 option_text = f"{series['id']}-{series['name']} (字幕数: {len(subtitles)})"
                 options.append(option_text)
@@ -660,7 +660,7 @@ def create_main_interface():
                     )
                 
                 # 获取视频信息
-                series_list = db_manager.get_series(video_id)
+                series_list = get_db_manager().get_series(video_id)
                 if not series_list:
                     LOG.error(f"未找到ID为 {video_id} 的视频")
                     return (
@@ -775,7 +775,7 @@ def create_main_interface():
                     )
                 
                 # 获取视频信息
-                series_list = db_manager.get_series(video_id)
+                series_list = get_db_manager().get_series(video_id)
                 if not series_list:
                     LOG.error(f"未找到ID为 {video_id} 的视频")
                     return (
@@ -886,7 +886,7 @@ def create_main_interface():
                         )
                 
                 # 获取视频信息
-                series_list = db_manager.get_series(video_id)
+                series_list = get_db_manager().get_series(video_id)
                 if not series_list:
                     LOG.error(f"未找到ID为 {video_id} 的视频")
                     return (
@@ -899,7 +899,7 @@ def create_main_interface():
                 series = series_list[0]
                 
                 # 获取字幕
-                subtitles = db_manager.get_subtitles(video_id)
+                subtitles = get_db_manager().get_subtitles(video_id)
                 if not subtitles:
                     LOG.error(f"所选视频没有字幕: {video_id}")
                     return (
@@ -920,10 +920,10 @@ def create_main_interface():
                     LOG.info(f"开始提取关键词，系列ID: {video_id}，字幕数量: {len(subtitles)}")
                     
                     # 首先检查是否有现有的关键词，如果有则删除
-                    existing_keywords = db_manager.get_keywords(series_id=video_id)
+                    existing_keywords = get_db_manager().get_keywords(series_id=video_id)
                     if existing_keywords:
                         LOG.info(f"发现 {len(existing_keywords)} 个现有关键词，将删除并重新提取")
-                        db_manager.delete_keywords_by_series_id(video_id)
+                        get_db_manager().delete_keywords_by_series_id(video_id)
                     
                     # 使用batch_extract_with_context可以更有效地提取关键词
                     extracted_keywords = keyword_extractor.batch_extract_with_context(subtitles, batch_size=3)
@@ -941,25 +941,14 @@ def create_main_interface():
                     LOG.info(f"提取到 {len(extracted_keywords)} 个关键词")
                     
                     # 保存关键词到数据库
-                    # 将每个关键词按照subtitle_id分组
-                    keywords_by_subtitle = {}
-                    for kw in extracted_keywords:
-                        subtitle_id = kw.get('subtitle_id')
-                        if subtitle_id not in keywords_by_subtitle:
-                            keywords_by_subtitle[subtitle_id] = []
-                        keywords_by_subtitle[subtitle_id].append(kw)
-                    
-                    # 按照subtitle_id分批保存
-                    saved_count = 0
-                    for subtitle_id, keywords in keywords_by_subtitle.items():
-                        if keywords:
-                            keyword_ids = db_manager.create_keywords(subtitle_id, keywords)
-                            saved_count += len(keyword_ids)
+                    # 每个关键词带有自己的subtitle_id，一次调用在同一个事务中全部写入
+                    keyword_ids = get_db_manager().create_keywords(None, extracted_keywords)
+                    saved_count = len(keyword_ids)
                     
                     LOG.info(f"成功保存 {saved_count} 个关键词到数据库")
                     
                     # 获取保存后的关键词，确保使用正确的ID
-                    updated_keywords = db_manager.get_keywords(series_id=video_id)
+                    updated_keywords = get_db_manager().get_keywords(series_id=video_id)
                     if not updated_keywords:
                         LOG.warning("无法获取保存后的关键词")
                         return (
@@ -1099,7 +1088,7 @@ def create_main_interface():
                         )
                 
                 # 获取视频信息
-                series_list = db_manager.get_series(video_id)
+                series_list = get_db_manager().get_series(video_id)
                 if not series_list:
                     LOG.error(f"未找到ID为 {video_id} 的视频")
                     return (
@@ -1112,7 +1101,7 @@ def create_main_interface():
                 series = series_list[0]
                 
                 # 获取字幕
-                subtitles = db_manager.get_subtitles(video_id)
+                subtitles = get_db_manager().get_subtitles(video_id)
                 if not subtitles:
                     LOG.error(f"所选视频没有字幕: {video_id}")
                     return (
@@ -1123,7 +1112,7 @@ def create_main_interface():
                     )
                 
                 # 获取关键词
-                keywords = db_manager.get_keywords(series_id=video_id)
+                keywords = get_db_manager().get_keywords(series_id=video_id)
                 if not keywords:
                     LOG.warning(f"所选视频没有关键词: {video_id}")
                     return (
@@ -1216,7 +1205,7 @@ def create_main_interface():
                     return "### ❌ 错误\n无法确定视频ID", "## ℹ️ 系统状态\n保存失败，无法确定视频ID"
                 
                 # 获取关键词数据 - 用于验证ID
-                keywords = db_manager.get_keywords(series_id=video_id)
+                keywords = get_db_manager().get_keywords(series_id=video_id)
                 if not keywords:
                     return "### ⚠️ 没有关键词数据\n无法更新关键词状态", "## ℹ️ 系统状态\n未找到关键词数据"
                 
@@ -1304,7 +1293,7 @@ def create_main_interface():
                                     processed_count += 1
                                     LOG.info(f"尝试更新关键词 ID={keyword_id} 的选中状态为 {is_selected}")
                                     # 更新数据库
-                                    if db_manager.update_keyword_selection(keyword_id, bool(is_selected)):
+                                    if get_db_manager().update_keyword_selection(keyword_id, bool(is_selected)):
                                         success_count += 1
                                         LOG.info(f"✅ 成功更新关键词 ID={keyword_id} 的选中状态为 {is_selected}")
                                     else:
@@ -1367,7 +1356,7 @@ def create_main_interface():
                     return "### ❌ 错误\n视频选择格式错误", gr.update(visible=False), gr.update(visible=False), gr.update(visible=False), gr.update(visible=False), gr.update(visible=False), gr.update(visible=False)
                 
                 # 获取系列信息
-                series_list = db_manager.get_series(video_id)
+                series_list = get_db_manager().get_series(video_id)
                 if not series_list:
                     LOG.error(f"未找到ID为 {video_id} 的视频")
                     return "### ❌ 错误\n未找到选择的视频", gr.update(visible=False), gr.update(visible=False), gr.update(visible=False), gr.update(visible=False), gr.update(visible=False), gr.update(visible=False)
@@ -1375,8 +1364,8 @@ def create_main_interface():
                 series = series_list[0]
                 
                 # 获取字幕和关键词信息
-                subtitles = db_manager.get_subtitles(video_id)
-                keywords = db_manager.get_keywords(series_id=video_id)
+                subtitles = get_db_manager().get_subtitles(video_id)
+                keywords = get_db_manager().get_keywords(series_id=video_id)
                 
                 if not subtitles:
                     return "### ❌ 错误\n所选视频没有字幕", gr.update(visible=False), gr.update(visible=False), gr.update(visible=False), gr.update(visible=False), gr.update(visible=False), gr.update(visible=False)
@@ -1574,7 +1563,7 @@ def create_main_interface():
                 yield "🔄 准备烧制...", "### ⏳ 处理中\n正在准备烧制视频..."
                 
                 # 获取系列信息以显示更详细的进度
-                series_list = db_manager.get_series(video_id)
+                series_list = get_db_manager().get_series(video_id)
                 if series_list:
                     series = series_list[0]
                     input_video = series.get('new_file_path', '')
@@ -1592,7 +1581,7 @@ def create_main_interface():
                 
                 if output_video:
                     # 将烧制视频路径保存到third_name和third_file_path
-                    db_manager.update_series_video_info(
+                    get_db_manager().update_series_video_info(
                         video_id,
                         third_name=os.path.basename(output_video),
                         third_file_path=output_video
@@ -1691,7 +1680,7 @@ def create_main_interface():
                 yield "🔄 准备烧制...", "### ⏳ 处理中\n正在准备烧制关键词视频..."
                 
                 # 获取系列信息以显示更详细的进度
-                series_list = db_manager.get_series(video_id)
+                series_list = get_db_manager().get_series(video_id)
                 if series_list:
                     series = series_list[0]
                     input_video = series.get('new_file_path', '')
@@ -1709,7 +1698,7 @@ def create_main_interface():
                 
                 if output_video:
                     # 将烧制视频路径保存到second_name和second_file_path
-                    db_manager.update_series_video_info(
+                    get_db_manager().update_series_video_info(
                         video_id,
                         second_name=os.path.basename(output_video),
                         second_file_path=output_video
@@ -1793,7 +1782,7 @@ def create_main_interface():
                 yield "🔄 准备烧制无字幕视频...", "### ⏳ 处理中\n正在准备烧制无字幕视频..."
                 
                 # 获取系列信息以显示更详细的进度
-                series_list = db_manager.get_series(video_id)
+                series_list = get_db_manager().get_series(video_id)
                 if series_list:
                     series = series_list[0]
                     input_video = series.get('new_file_path', '')
@@ -1887,7 +1876,7 @@ def create_main_interface():
                 yield "🔄 准备合并视频...", "### ⏳ 处理中\n正在准备合并视频..."
                 
                 # 获取系列信息以获取三个视频的路径
-                series_list = db_manager.get_series(video_id)
+                series_list = get_db_manager().get_series(video_id)
                 if not series_list:
                     LOG.error(f"未找到ID为 {video_id} 的视频")
                     yield "❌ 未找到选择的视频", "### ❌ 错误\n未找到视频信息"
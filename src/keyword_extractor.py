@@ -6,10 +6,14 @@
 
 import re
 import json
-from typing import List, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, Dict, Tuple
 from openai import OpenAI
 from logger import LOG
 
+# 批量提取时同时进行的API请求数（请求以等待网络为主，适度并发即可，过高容易触发限流）
+_MAX_CONCURRENT_REQUESTS = 4
+
 class KeywordExtractor:
     """关键词提取器"""
     
@@ -202,31 +206,69 @@ artificial /ˌɑːtɪˈfɪʃəl/ adj. 人工的，人造的
         
         LOG.info(f"📦 批量提取模式: {len(subtitles)} 条字幕，批次大小={batch_size}")
         
-        for i in range(0, len(subtitles), batch_size):
-            batch = subtitles[i:i+batch_size]
-            
-            # 合并当前批次的文本
-            combined_text = " ".join([sub.get('english_text', '') for sub in batch if sub.get('english_text')])
-            
-            if not combined_text.strip():
-                continue
-            
-            LOG.info(f"📝 处理批次 {i//batch_size + 1}: {len(batch)} 条字幕")
-            
-            # 提取关键词
-            keywords = self.extract_keywords_from_text(combined_text)
-            
-            # 为每个关键词找到最匹配的字幕ID
-            for keyword in keywords:
-                best_subtitle_id = self._find_best_matching_subtitle(
-                    keyword['key_word'], batch
-                )
-                keyword['subtitle_id'] = best_subtitle_id
-                all_keywords.append(keyword)
+        # 各批次并发请求，结果仍按批次顺序合并
+        batches = [subtitles[i:i+batch_size] for i in range(0, len(subtitles), batch_size)]
+        executor = ThreadPoolExecutor(max_workers=_MAX_CONCURRENT_REQUESTS)
+        try:
+            for keywords in executor.map(self._extract_batch, batches):
+                all_keywords.extend(keywords)
+        finally:
+            # 某个批次出错时取消尚未开始的请求，不等其余批次完成就抛出异常
+            executor.shutdown(wait=False, cancel_futures=True)
         
         LOG.info(f"🎉 批量提取完成: {len(all_keywords)} 个关键词")
         return all_keywords
     
+    def iter_extract_batches(self, subtitles: List[Dict], batch_size: int = 5) -> Iterator[Tuple[int, int, List[Dict]]]:
+        """
+        并发批量提取关键词，每完成一个批次就产出一次结果（用于显示进度）
+        
+        参数:
+        - subtitles: 字幕列表
+        - batch_size: 批次大小
+        
+        返回:
+        - Iterator[Tuple[int, int, List[Dict]]]: (已完成批次数, 总批次数, 该批次的关键词)，按完成顺序产出
+        """
+        batches = [subtitles[i:i+batch_size] for i in range(0, len(subtitles), batch_size)]
+        
+        executor = ThreadPoolExecutor(max_workers=_MAX_CONCURRENT_REQUESTS)
+        try:
+            futures = [executor.submit(self._extract_batch, batch) for batch in batches]
+            for done, future in enumerate(as_completed(futures), 1):
+                yield done, len(batches), future.result()
+        finally:
+            # 生成器被提前关闭（事件取消、客户端断开或被回收）时取消排队中的批次，
+            # 不再发出剩余的API请求，也不等待进行中的请求返回
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _extract_batch(self, batch: List[Dict]) -> List[Dict]:
+        """
+        合并一个批次的字幕文本提取关键词，并为每个关键词找到最匹配的字幕ID
+        
+        参数:
+        - batch: 同一批次的字幕
+        
+        返回:
+        - List[Dict]: 该批次的关键词列表
+        """
+        # 合并当前批次的文本
+        combined_text = " ".join([sub.get('english_text', '') for sub in batch if sub.get('english_text')])
+        
+        if not combined_text.strip():
+            return []
+        
+        LOG.info(f"📝 处理批次: {len(batch)} 条字幕")
+        
+        # 提取关键词
+        keywords = self.extract_keywords_from_text(combined_text)
+        
+        # 为每个关键词找到最匹配的字幕ID
+        for keyword in keywords:
+            keyword['subtitle_id'] = self._find_best_matching_subtitle(keyword['key_word'], batch)
+        
+        return keywords
+    
     def _find_best_matching_subtitle(self, keyword: str, subtitles: List[Dict]) -> int:
         """
         为关键词找到最匹配的字幕
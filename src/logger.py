@@ -12,8 +12,9 @@ logger.remove()
 logger.add(sys.stdout, level="DEBUG", format=log_format, colorize=True)
 logger.add(sys.stderr, level="ERROR", format=log_format, colorize=True)
 
-# 同样使用统一的格式配置日志文件输出，设置文件大小为1MB自动轮换
-logger.add("logs/app.log", rotation="1 MB", level="DEBUG", format=log_format)
+# 同样使用统一的格式配置日志文件输出，设置文件大小为1MB自动轮换；
+# enqueue=True 由后台线程写文件，调用方（如数据库写事务内）不等待磁盘I/O，进程退出时队列会被写完
+logger.add("logs/app.log", rotation="1 MB", level="DEBUG", format=log_format, enqueue=True)
 
 # 为 logger 设置别名，方便在其他模块中导入和使用
 LOG = logger
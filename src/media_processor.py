@@ -18,13 +18,13 @@ from src.file_detector import FileType, validate_file, get_file_info
 from src.video_processor import extract_audio_from_video, check_ffmpeg_availability
 from src.openai_whisper import asr, generate_lrc_content, save_lrc_file, generate_srt_content, save_srt_file
 try:
-    from src.database import db_manager
+    from src.database import get_db_manager
 except ImportError:
     # 如果在其他目录运行，尝试相对导入
     import sys
     import os
     sys.path.append(os.path.dirname(__file__))
-    from src.database import db_manager
+    from src.database import get_db_manager
 
 class MediaProcessor:
     """多媒体处理器类"""
@@ -115,7 +115,7 @@ class MediaProcessor:
                 # 如果跳过预处理，需要从文件名获取原始系列信息
                 # 一般情况下，传入的file_path是9:16预处理后的视频路径
                 # 我们需要查找对应的系列
-                series_with_path = db_manager.find_series_by_new_file_path(processed_video_path)
+                series_with_path = get_db_manager().find_series_by_new_file_path(processed_video_path)
                 if series_with_path:
                     # 如果找到了对应的系列，更新file_info并记录系列ID
                     existing_series_id = series_with_path['id']
@@ -353,7 +353,7 @@ class MediaProcessor:
                 original_path = file_info.get('original_path', file_info['path'])
                 
                 # 1. 创建媒体系列记录
-                series_id = db_manager.create_series(
+                series_id = get_db_manager().create_series(
                     name=file_info['name'],
                     file_path=original_path,  # 保存原始文件路径
                     file_type=file_info['type'],
@@ -376,7 +376,7 @@ class MediaProcessor:
                 
                 # 执行更新
                 if update_params:
-                    db_manager.update_series_video_info(
+                    get_db_manager().update_series_video_info(
                         series_id,
                         **update_params
                     )
@@ -507,7 +507,7 @@ class MediaProcessor:
             # 3. 首先删除现有的所有字幕
             if series_id:
                 LOG.info(f"🗑️ 删除系列ID={series_id}的现有字幕")
-                db_manager.delete_subtitles_by_series_id(series_id)
+                get_db_manager().delete_subtitles_by_series_id(series_id)
             
             # 4. 批量创建字幕记录
             if subtitles_data:
@@ -516,7 +516,7 @@ class MediaProcessor:
                 for i, subtitle in enumerate(subtitles_data[:3]):
                     LOG.info(f"字幕 {i+1}: begin_time={subtitle['begin_time']}, end_time={subtitle['end_time']}")
                 
-                subtitle_ids = db_manager.create_subtitles(series_id, subtitles_data)
+                subtitle_ids = get_db_manager().create_subtitles(series_id, subtitles_data)
                 LOG.info(f"✅ 数据库保存成功: 系列ID {series_id}, {len(subtitle_ids)} 条字幕")
                 
                 # 5. 提取并保存重点单词（可选功能，暂时留空，后续实现）
@@ -14,7 +14,7 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(current_dir)
 sys.path.append(project_root)
 
-from src.database import db_manager
+from src.database import get_db_manager
 from src.logger import LOG
 
 def main():
@@ -36,7 +36,7 @@ def main():
     LOG.info(f"🔄 开始更新系列 {args.series_id} 的关键词选择状态，规则: {args.rule}")
     
     # 获取系列信息
-    series_list = db_manager.get_series(args.series_id)
+    series_list = get_db_manager().get_series(args.series_id)
     if not series_list:
         LOG.error(f"❌ 找不到系列 {args.series_id}")
         return 1
@@ -45,13 +45,13 @@ def main():
     LOG.info(f"📋 系列名称: {series_name}")
     
     # 执行批量更新
-    result = db_manager.batch_update_keyword_selection(args.series_id, args.rule)
+    result = get_db_manager().batch_update_keyword_selection(args.series_id, args.rule)
     
     if result['success']:
         LOG.info(f"✅ 成功更新 {result['updated_count']} 个关键词的选择状态")
         
         # 获取更新后的选中关键词数量
-        keywords = db_manager.get_keywords(series_id=args.series_id)
+        keywords = get_db_manager().get_keywords(series_id=args.series_id)
         selected_count = sum(1 for kw in keywords if kw.get('is_selected', 0) == 1)
         
         LOG.info(f"📊 统计信息:")
@@ -11,7 +11,7 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(current_dir)
 sys.path.append(project_root)
 
-from src.database import db_manager
+from src.database import get_db_manager
 from src.logger import LOG
 
 def main():
@@ -19,7 +19,7 @@ def main():
     LOG.info("🔄 开始执行单引号到反引号的批量替换...")
     
     # 执行替换
-    result = db_manager.update_all_quotes_to_backticks()
+    result = get_db_manager().update_all_quotes_to_backticks()
     
     # 显示结果
     if result["success"]:
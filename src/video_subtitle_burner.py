@@ -9,7 +9,7 @@ import json
 import tempfile
 from typing import List, Dict, Optional, Tuple
 from logger import LOG
-from database import db_manager
+from database import get_db_manager
 
 class VideoSubtitleBurner:
     """视频字幕烧制器"""
@@ -29,15 +29,11 @@ class VideoSubtitleBurner:
         - List[Dict]: 每条字幕的信息，包含该字幕的关键词（如果有）
         """
         try:
-            # 获取系列的所有字幕
-            subtitles = db_manager.get_subtitles(series_id)
-            if not subtitles:
-                return []
-            
             burn_data = []
             keyword_count = 0
             
-            for subtitle in subtitles:
+            # 逐条读取系列的字幕，不一次性载入整个结果集
+            for subtitle in get_db_manager().iter_subtitles(series_id):
                 subtitle_id = subtitle['id']
                 begin_time = subtitle['begin_time']
                 end_time = subtitle['end_time']
@@ -60,7 +56,7 @@ class VideoSubtitleBurner:
                 }
                 
                 # 获取该字幕的所有关键词
-                keywords = db_manager.get_keywords(subtitle_id=subtitle_id)
+                keywords = get_db_manager().get_keywords(subtitle_id=subtitle_id)
                 if keywords:
                     # 筛选已选中的关键词
                     eligible_keywords = []
@@ -826,12 +822,7 @@ class VideoSubtitleBurner:
             if progress_callback:
                 progress_callback("🔍 开始处理系列视频...")
             
-            series_list = db_manager.get_series()
-            target_series = None
-            for series in series_list:
-                if series['id'] == series_id:
-                    target_series = series
-                    break
+            target_series = get_db_manager().get_series_by_id(series_id)
             
             if not target_series:
                 if progress_callback:
@@ -875,7 +866,7 @@ class VideoSubtitleBurner:
             )
             
             if success:
-                db_manager.update_series_video_info(
+                get_db_manager().update_series_video_info(
                     series_id,
                     third_name=os.path.basename(output_video),
                     third_file_path=output_video
@@ -1124,8 +1115,7 @@ class VideoSubtitleBurner:
             if progress_callback:
                 progress_callback("🔍 开始处理关键词视频（完整长度）...")
             
-            series_list = db_manager.get_series()
-            target_series = next((s for s in series_list if s['id'] == series_id), None)
+            target_series = get_db_manager().get_series_by_id(series_id)
                 
             if not target_series:
                 if progress_callback:
@@ -1174,7 +1164,7 @@ class VideoSubtitleBurner:
             )
             
             if success:
-                    db_manager.update_series_video_info(
+                    get_db_manager().update_series_video_info(
                         series_id,
                         second_name=os.path.basename(output_video),
                         second_file_path=output_video
@@ -1301,8 +1291,7 @@ class VideoSubtitleBurner:
             if progress_callback:
                 progress_callback("🔍 开始处理无字幕视频...")
             
-            series_list = db_manager.get_series()
-            target_series = next((s for s in series_list if s['id'] == series_id), None)
+            target_series = get_db_manager().get_series_by_id(series_id)
             if not target_series:
                 if progress_callback:
                     progress_callback("❌ 找不到指定的系列")
@@ -1337,7 +1326,7 @@ class VideoSubtitleBurner:
             subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
             if os.path.exists(output_video):
-                db_manager.update_series_video_info(
+                get_db_manager().update_series_video_info(
                     series_id,
                     first_name=os.path.basename(output_video),
                     first_file_path=output_video
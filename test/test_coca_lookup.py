@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+测试COCA词频查询模块的查询路径与性能相关行为
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(os.path.join(project_root, 'src'))
+
+from coca_lookup import COCADatabaseLookup
+from db_conn import close_connection
+
+# 仓库中的数据库只作为数据来源：查询器初始化时会建索引并切换到WAL模式，测试在副本上进行
+SOURCE_DB_PATH = os.path.join(project_root, 'data', 'englishcut.db')
+
+class TestCOCALookup(unittest.TestCase):
+    """COCA查询测试"""
+
+    @classmethod
+    def setUpClass(cls):
+        """把数据库复制到临时目录，所有测试共用这份副本"""
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.db_path = os.path.join(cls.temp_dir, 'englishcut.db')
+        shutil.copyfile(SOURCE_DB_PATH, cls.db_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        close_connection(cls.db_path)
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
+
+    def setUp(self):
+        """每个测试使用独立的查询器实例"""
+        self.lookup = COCADatabaseLookup(self.db_path)
+
+    def test_nocase_query_uses_index(self):
+        """不区分大小写的查询应命中 idx_coca_word_nocase 索引"""
+        from coca_lookup import _SQL_RANK_NOCASE
+
+        # 触发连接初始化（包含索引迁移）
+        self.assertEqual(self.lookup.get_frequency_rank("the"), 1)
+
+        with self.lookup._lock:
+            plan = self.lookup._get_conn().execute(
+                "EXPLAIN QUERY PLAN " + _SQL_RANK_NOCASE, ("the",)
+            ).fetchall()
+        details = " ".join(row[3] for row in plan)
+        self.assertIn("idx_coca_word_nocase", details)
+        self.assertNotIn("SCAN", details)
+
+    def test_index_check_keeps_open_transaction(self):
+        """首次查询发生在调用方的事务中时，建索引不能提交调用方尚未完成的写入"""
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        self.addCleanup(conn.close)
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("CREATE TABLE t_probe (x INTEGER)")
+
+        lookup = COCADatabaseLookup(self.db_path, conn=conn)
+        lookup._rank_map_loaded = True  # 走数据库查询路径
+        self.assertEqual(lookup.get_frequency_rank("the"), 1)
+        self.assertTrue(conn.in_transaction)
+
+        conn.execute("ROLLBACK")
+        self.assertIsNone(conn.execute("SELECT name FROM sqlite_master WHERE name = 't_probe'").fetchone())
+
+    def test_shares_connection_per_database(self):
+        """同一数据库的查询器应复用db_conn中的共享连接和锁"""
+        import coca_lookup
+
+        other = COCADatabaseLookup(self.db_path)
+        self.assertIs(self.lookup._get_conn(), other._get_conn())
+        self.assertIs(self.lookup._get_conn(), coca_lookup.get_connection(self.db_path))
+        self.assertIs(self.lookup._lock, other._lock)
+
+    def test_case_insensitive_lookup(self):
+        """大小写不同的输入应得到相同的排名"""
+        self.assertEqual(
+            self.lookup.get_frequency_rank("Computer"),
+            self.lookup.get_frequency_rank("computer")
+        )
+        details = self.lookup.get_word_details("COMPUTER")
+        self.assertIsNotNone(details)
+        self.assertEqual(details['word'], "computer")
+
+    def test_repeated_lookup_hits_cache(self):
+        """重复查询同一单词应命中LRU缓存"""
+        first = self.lookup.get_frequency_rank("Running")
+        second = self.lookup.get_frequency_rank("running")
+        self.assertEqual(first, second)
+        self.assertGreaterEqual(self.lookup._cached_rank.cache_info().hits, 1)
+        
+        self.lookup.clear_cache()
+        self.assertEqual(self.lookup._cached_rank.cache_info().currsize, 0)
+
+    def test_batch_lookup_matches_single_lookup(self):
+        """批量查询结果应与逐个精确查询一致，并保留原始输入作为键"""
+        words = ["the", "The", "computer", "that", "xyzqwv", "Hello!"]
+        results = self.lookup.batch_lookup(words)
+        
+        self.assertEqual(set(results.keys()), set(words))
+        self.assertEqual(results["the"], 1)
+        self.assertEqual(results["The"], 1)
+        # 多词性单词取排名最小的条目
+        self.assertEqual(results["that"], 12)
+        self.assertIsNone(results["xyzqwv"])
+        self.assertEqual(results["Hello!"], self.lookup.get_frequency_rank("hello"))
+
+    def test_sql_fallback_matches_rank_map(self):
+        """内存词表不可用时，数据库回退路径应给出相同结果"""
+        words = ["the", "Computer", "that", "running", "look up", "xyzqwv"]
+        expected_ranks = [self.lookup.get_frequency_rank(w) for w in words]
+        expected_batch = self.lookup.batch_lookup(words)
+        self.assertIsNotNone(self.lookup._rank_map)
+        
+        fallback = COCADatabaseLookup(self.db_path)
+        fallback._rank_map_loaded = True  # 模拟词表加载失败
+        self.assertEqual([fallback.get_frequency_rank(w) for w in words], expected_ranks)
+        self.assertEqual(fallback.batch_lookup(words), expected_batch)
+
+    def test_frequency_ranks_match_single_lookup(self):
+        """批量获取排名应与逐个查询一致，包括短语估算、词根匹配和空输入"""
+        words = ["the", "Computer", "running", "look up", "xyzqwv", "", "the"]
+        expected = {w: self.lookup.get_frequency_rank(w) for w in words}
+        self.assertEqual(self.lookup.get_frequency_ranks(words), expected)
+
+        fallback = COCADatabaseLookup(self.db_path)
+        fallback._rank_map_loaded = True  # 模拟词表加载失败
+        self.assertEqual(fallback.get_frequency_ranks(words), expected)
+
+    def test_normalize_word_matches_regex(self):
+        """各分支的标准化结果应与直接使用正则一致"""
+        from coca_lookup import _NORM_RE
+
+        for word in ["Running", "  Hello!  ", "don't", "state-of-the-art", "a_b\tc", "Café!", "naïve", "ÉCOLE", ""]:
+            self.assertEqual(self.lookup._normalize_word(word), _NORM_RE.sub('', word.lower().strip()))
+
+    def test_batch_frequency_level_matches_scalar(self):
+        """批量分级应与逐个分级一致，边界值归入较高频的等级"""
+        ranks = [1, 100, 101, 500, 501, 1000, 2000, 5000, 10000, 10001, 60000]
+        expected = [self.lookup.get_frequency_level(r) for r in ranks]
+        self.assertEqual(expected[:3], ["极高频", "极高频", "高频"])
+        self.assertEqual(expected[-2:], ["很低频", "很低频"])
+        self.assertEqual(self.lookup.batch_get_frequency_level(ranks), expected)
+        self.assertEqual(self.lookup.batch_get_frequency_level([]), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,930 @@
+#!/usr/bin/env python3
+"""
+测试DatabaseManager的批量写入与查询行为
+"""
+
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(project_root)
+
+from src.database import DatabaseManager
+from src.db_conn import get_connection
+
+class FakeCOCALookup:
+    """记录查询的单词，按固定词表返回排名"""
+
+    def __init__(self, ranks):
+        self.ranks = ranks
+        self.queried = []
+
+    def get_frequency_rank(self, word):
+        self.queried.append(word)
+        return self.ranks.get(word)
+
+class TestDatabaseManager(unittest.TestCase):
+    """DatabaseManager测试，每个测试使用独立的临时数据库"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.coca = FakeCOCALookup({"rare": 12000, "the": 1})
+        self.db = DatabaseManager(os.path.join(self.temp_dir, "test.db"), coca_lookup=self.coca)
+        self.series_id = self.db.create_series("demo.mp4", "/tmp/demo.mp4", "video")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_data_dir_created_once(self):
+        """数据目录只在首次使用时创建；数据库位于当前目录时不创建目录"""
+        nested = os.path.join(self.temp_dir, "nested")
+        with patch("src.database.os.makedirs", wraps=os.makedirs) as makedirs:
+            DatabaseManager(os.path.join(nested, "a.db"))
+            DatabaseManager(os.path.join(nested, "b.db"))
+            DatabaseManager._ensure_data_dir("local.db")
+        makedirs.assert_called_once_with(nested, exist_ok=True)
+
+    def test_close_all_closes_every_connection(self):
+        """close_all 关闭共享连接和空闲只读连接，之后仍可重新打开"""
+        from src import db_conn
+
+        self.db.get_series()
+        with self.db._connect() as conn:
+            pass
+        with db_conn.reader(self.db.db_path) as read_conn:
+            pass
+        db_conn.close_all()
+        self.assertRaises(sqlite3.ProgrammingError, conn.execute, "SELECT 1")
+        self.assertRaises(sqlite3.ProgrammingError, read_conn.execute, "SELECT 1")
+        self.assertEqual(len(self.db.get_series()), 1)
+
+    def test_memory_database(self):
+        """内存数据库不创建文件、不切换WAL，读写都通过共享连接完成"""
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        self.addCleanup(os.chdir, cwd)
+        db = DatabaseManager(":memory:", coca_lookup=self.coca)
+        self.addCleanup(db.close)
+
+        series_id = db.create_series("memory.mp4")
+        subtitle_ids = db.create_subtitles(series_id, [
+            {'begin_time': 0, 'end_time': 1, 'english_text': "in memory", 'chinese_text': "内存"}
+        ])
+        db.create_keywords(subtitle_ids[0], [{'key_word': "memory", 'coca': 100}])
+        self.assertEqual([k['key_word'] for k in db.search_keywords("memo")], ["memory"])
+        self.assertEqual(db.get_statistics()['series_count'], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, ":memory:")))
+
+    def test_instances_share_one_connection(self):
+        """同一数据库文件（不同路径写法）只应打开一个共享连接"""
+        other = DatabaseManager(os.path.relpath(self.db.db_path))
+        with self.db._connect() as conn, other._connect() as other_conn:
+            self.assertIs(conn, other_conn)
+        self.assertIs(conn, get_connection(self.db.db_path))
+
+        injected = sqlite3.connect(":memory:")
+        self.assertIsNot(DatabaseManager(self.db.db_path, conn=injected)._conn, conn)
+
+    def test_failed_write_rolls_back(self):
+        """批量写入中途失败时整个事务回滚，连接仍可继续使用"""
+        subtitles = [
+            {'begin_time': 0, 'end_time': 1, 'english_text': "ok", 'chinese_text': "好"},
+            {'begin_time': None, 'end_time': 2, 'english_text': "bad", 'chinese_text': "坏"},
+        ]
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db.create_subtitles(self.series_id, subtitles)
+
+        self.assertEqual(self.db.get_subtitles(self.series_id), [])
+        self.assertEqual(len(self.db.create_subtitles(self.series_id, subtitles[:1])), 1)
+
+    def test_create_series_with_content(self):
+        """系列、字幕和单词在一个事务中写入，任一步失败时全部回滚"""
+        subtitles = [
+            {'begin_time': 0, 'end_time': 1, 'english_text': "a rare word", 'chinese_text': "甲",
+             'keywords': [{'key_word': "rare"}, {'key_word': "the", 'coca': 7}]},
+            {'begin_time': 1, 'end_time': 2, 'english_text': "no keywords", 'chinese_text': "乙"},
+        ]
+        result = self.db.create_series_with_content({'name': "full.mp4", 'file_type': "video"}, subtitles)
+
+        self.assertEqual(len(result['subtitle_ids']), 2)
+        keywords = self.db.get_keywords(series_id=result['series_id'])
+        self.assertEqual([k['id'] for k in keywords], result['keyword_ids'])
+        self.assertEqual({k['key_word']: k['coca'] for k in keywords}, {"rare": 12000, "the": 7})
+        self.assertEqual({k['subtitle_id'] for k in keywords}, {result['subtitle_ids'][0]})
+
+        broken = subtitles + [{'begin_time': None, 'end_time': 3}]
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db.create_series_with_content({'name': "broken.mp4"}, broken)
+        self.assertEqual([s['name'] for s in self.db.get_series()].count("broken.mp4"), 0)
+        self.assertEqual(len(self.db.get_keywords()), 2)
+
+    def test_close_and_reopen(self):
+        """关闭后再次访问会重新打开共享连接"""
+        with self.db._connect() as conn:
+            pass
+        self.db.close()
+        self.assertRaises(sqlite3.ProgrammingError, conn.execute, "SELECT 1")
+
+        self.assertEqual(len(self.db.get_series()), 1)
+        with self.db._connect() as reopened:
+            self.assertIsNot(reopened, conn)
+
+    def test_close_keeps_injected_connection(self):
+        """外部注入的连接在 close() 后仍可使用，锁登记被注销"""
+        from src import db_conn
+
+        conn = sqlite3.connect(self.db.db_path, check_same_thread=False)
+        self.addCleanup(conn.close)
+        db = DatabaseManager(self.db.db_path, conn=conn, coca_lookup=self.coca)
+        self.assertEqual(len(db.get_series()), 1)
+        self.assertIn(id(conn), db_conn._conn_locks)
+
+        db.close()
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM t_series").fetchone()[0], 1)
+        self.assertNotIn(id(conn), db_conn._conn_locks)
+
+    def test_reads_do_not_wait_for_writer(self):
+        """写事务进行中，其他线程的查询走只读连接，不等待写锁且只看到已提交的数据"""
+        result = {}
+
+        def read_series():
+            result['names'] = [row['name'] for row in self.db.get_series()]
+
+        with self.db._transaction() as conn:
+            conn.execute("INSERT INTO t_series (name) VALUES ('uncommitted')")
+            thread = threading.Thread(target=read_series)
+            thread.start()
+            thread.join(timeout=5)
+            self.assertFalse(thread.is_alive())
+
+        self.assertEqual(result['names'], ["demo.mp4"])
+        self.assertEqual(len(self.db.get_series()), 2)
+
+    def test_create_subtitles_returns_ids_in_order(self):
+        """批量插入字幕返回的ID应与插入顺序一一对应"""
+        subtitles = [
+            {'begin_time': i, 'end_time': i + 1, 'english_text': f"line {i}", 'chinese_text': f"第{i}行"}
+            for i in range(5)
+        ]
+        ids = self.db.create_subtitles(self.series_id, subtitles)
+
+        self.assertEqual(len(ids), 5)
+        for subtitle_id, expected in zip(ids, subtitles):
+            row = self.db.get_subtitle_by_id(subtitle_id)
+            self.assertEqual(row['english_text'], expected['english_text'])
+        self.assertEqual(self.db.create_subtitles(self.series_id, []), [])
+
+    def test_insert_paths_return_same_ids(self):
+        """RETURNING 分块插入与 executemany 回退路径应返回相同顺序的ID"""
+        from src import database
+
+        count = database._RETURNING_BATCH_ROWS * 2 + 7
+        subtitles = [
+            {'begin_time': i, 'end_time': i + 1, 'english_text': f"line {i}", 'chinese_text': "行"}
+            for i in range(count)
+        ]
+        for has_returning in (True, False):
+            with patch.object(database, '_HAS_RETURNING', has_returning):
+                ids = self.db.create_subtitles(self.series_id, subtitles)
+            self.assertEqual(len(ids), count)
+            self.assertEqual(ids, sorted(ids))
+            self.assertEqual(self.db.get_subtitle_by_id(ids[-1])['english_text'], f"line {count - 1}")
+            self.assertEqual(self.db.get_subtitle_by_id(ids[100])['english_text'], "line 100")
+
+    def test_create_series_batch(self):
+        """批量创建系列返回按输入顺序排列的ID，任一行失败时整批回滚"""
+        from src import database
+
+        count = database._RETURNING_BATCH_ROWS + 3
+        for has_returning in (True, False):
+            series_list = [{'name': f"{has_returning}-{i}.mp4", 'duration': i} for i in range(count)]
+            series_list[1]['third_file_path'] = "/tmp/third.mp4"
+            with patch.object(database, '_HAS_RETURNING', has_returning):
+                ids = self.db.create_series_batch(series_list)
+            self.assertEqual([self.db.get_series(i)[0]['name'] for i in ids], [s['name'] for s in series_list])
+            self.assertEqual(self.db.get_series(ids[1])[0]['third_file_path'], "/tmp/third.mp4")
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db.create_series_batch([{'name': "kept.mp4"}, {'file_path': "/tmp/no-name.mp4"}])
+        self.assertNotIn("kept.mp4", [s['name'] for s in self.db.get_series()])
+        self.assertEqual(self.db.create_series_batch([]), [])
+
+    def test_get_subtitles_display(self):
+        """展示用字幕按开始时间排序，时间保留两位小数，超长文本截断，空文本显示为空字符串"""
+        self.db.create_subtitles(self.series_id, [
+            {'begin_time': 2.345, 'end_time': 3.0, 'english_text': "x" * 5, 'chinese_text': None},
+            {'begin_time': 0.111, 'end_time': 1.999, 'english_text': "a" * 6, 'chinese_text': "中文"},
+        ])
+        rows = self.db.get_subtitles_display(self.series_id, text_length=5)
+        self.assertEqual([tuple(row[1:]) for row in rows], [
+            (0.11, 2.0, "aaaaa...", "中文"),
+            (2.35, 3.0, "xxxxx", ""),
+        ])
+
+    def test_get_series_by_id(self):
+        """按ID点查系列应与全表查询结果一致，不存在时返回None"""
+        series = self.db.get_series_by_id(self.series_id)
+        self.assertEqual(series, self.db.get_series(self.series_id)[0])
+        self.assertIsNone(self.db.get_series_by_id(-1))
+
+    def test_series_and_keywords_pagination(self):
+        """分页查询按原有顺序切片，总数查询与全量结果一致"""
+        self.db.create_series_batch([{'name': f"page-{i}.mp4"} for i in range(4)])
+        all_series = self.db.get_series()
+        self.assertEqual(self.db.count_series(), len(all_series))
+        self.assertEqual(self.db.get_series(limit=2, offset=1), all_series[1:3])
+        self.assertEqual(self.db.get_series(limit=2, offset=len(all_series)), [])
+
+        subtitle_ids = self.db.create_subtitles(self.series_id, [
+            {'begin_time': i, 'end_time': i + 1, 'english_text': f"line {i}", 'chinese_text': "行"} for i in range(3)
+        ])
+        for subtitle_id in subtitle_ids:
+            self.db.create_keywords(subtitle_id, [{'key_word': "alpha"}, {'key_word': "beta"}])
+        keywords = self.db.get_keywords(series_id=self.series_id)
+        self.assertEqual(self.db.count_keywords(self.series_id), len(keywords))
+        self.assertEqual(self.db.get_keywords(series_id=self.series_id, limit=4, offset=2), keywords[2:6])
+        self.assertEqual(self.db.get_keywords(subtitle_id=subtitle_ids[0], limit=1),
+                         self.db.get_keywords(subtitle_id=subtitle_ids[0])[:1])
+
+    def test_inserted_ids_after_deletes(self):
+        """删除最新的行后再批量插入，推算出的ID仍应对应实际插入的行"""
+        subtitle = {'begin_time': 0, 'end_time': 1, 'english_text': "first", 'chinese_text': "一"}
+        self.db.create_subtitles(self.series_id, [subtitle, subtitle])
+        self.db.delete_subtitles_by_series_id(self.series_id)
+
+        ids = self.db.create_subtitles(self.series_id, [
+            dict(subtitle, english_text="second"), dict(subtitle, english_text="third")
+        ])
+        self.assertEqual([self.db.get_subtitle_by_id(i)['english_text'] for i in ids], ["second", "third"])
+
+    def test_create_keywords_skips_invalid_rows(self):
+        """没有字幕ID的单词应被跳过，其余单词的ID仍然正确"""
+        subtitle_ids = self.db.create_subtitles(self.series_id, [
+            {'begin_time': 0, 'end_time': 1, 'english_text': "it's fine", 'chinese_text': "没问题"}
+        ])
+        keywords = [
+            {'key_word': "fine", 'coca': 800},
+            {'key_word': "orphan", 'subtitle_id': None},
+            {'key_word': "it's", 'coca': 9000},
+        ]
+        ids = self.db.create_keywords(subtitle_ids[0], keywords)
+
+        self.assertEqual(len(ids), 2)
+        rows = {row['id']: row for row in self.db.get_keywords(subtitle_id=subtitle_ids[0])}
+        self.assertEqual(rows[ids[0]]['key_word'], "fine")
+        self.assertEqual(rows[ids[0]]['is_selected'], 0)
+        self.assertEqual(rows[ids[1]]['key_word'], "it`s")
+        self.assertEqual(rows[ids[1]]['is_selected'], 1)
+
+    def test_create_keywords_fills_missing_coca(self):
+        """未提供coca的单词在写入时补全排名，并据此决定是否选中"""
+        subtitle_ids = self.db.create_subtitles(self.series_id, [
+            {'begin_time': 0, 'end_time': 1, 'english_text': "the rare one", 'chinese_text': "罕见"}
+        ])
+        self.db.create_keywords(subtitle_ids[0], [
+            {'key_word': "rare"}, {'key_word': "the", 'coca': None}, {'key_word': "one", 'coca': 300},
+            {'key_word': "unknown"}, {'key_word': "rare"},
+        ])
+
+        self.assertEqual(sorted(self.coca.queried), ["rare", "the", "unknown"])
+        rows = [(row['key_word'], row['coca'], row['is_selected'])
+                for row in self.db.get_keywords(subtitle_id=subtitle_ids[0])]
+        self.assertEqual(rows, [("rare", 12000, 1), ("the", 1, 0), ("one", 300, 0),
+                                ("unknown", None, 0), ("rare", 12000, 1)])
+
+    def test_search_keywords_tracks_changes(self):
+        """全文索引应随单词的插入、修改、删除同步，并在旧库上自动回填"""
+        subtitle_ids = self.db.create_subtitles(self.series_id, [
+            {'begin_time': 0, 'end_time': 1, 'english_text': "Hello shell", 'chinese_text': "你好"}
+        ])
+        self.db.create_keywords(subtitle_ids[0], [{'key_word': "Hello"}, {'key_word': "shell"}, {'key_word': "ab"}])
+
+        def found(term):
+            return sorted(row['key_word'] for row in self.db.search_keywords(term))
+
+        self.assertEqual(found("ELL"), ["Hello", "shell"])
+        self.assertEqual(found("b"), ["ab"])
+
+        with sqlite3.connect(self.db.db_path) as conn:
+            conn.execute("UPDATE t_keywords SET key_word = 'yellow' WHERE key_word = 'Hello'")
+        self.assertEqual(found("ell"), ["shell", "yellow"])
+
+        # 模拟升级前没有全文索引的数据库
+        with sqlite3.connect(self.db.db_path) as conn:
+            conn.execute("DROP TABLE t_keywords_fts")
+            for name in ("insert", "delete", "update"):
+                conn.execute(f"DROP TRIGGER trg_keywords_fts_{name}")
+        self.db._init_database()
+        self.assertEqual(found("ell"), ["shell", "yellow"])
+
+        self.db.delete_keywords_by_series_id(self.series_id)
+        self.assertEqual(found("ell"), [])
+
+    def test_getters_can_return_rows(self):
+        """as_dict=False 返回的 sqlite3.Row 应与默认字典结果内容一致"""
+        self.db.create_subtitles(self.series_id, [
+            {'begin_time': 0, 'end_time': 1, 'english_text': "a", 'chinese_text': "甲"}
+        ])
+
+        for getter, kwargs in ((self.db.get_series, {}), (self.db.get_series, {'series_id': self.series_id}),
+                               (self.db.get_subtitles, {'series_id': self.series_id})):
+            rows = getter(as_dict=False, **kwargs)
+            self.assertIsInstance(rows[0], sqlite3.Row)
+            self.assertEqual([dict(row) for row in rows], getter(**kwargs))
+        self.assertEqual(self.db.get_series(series_id=-1, as_dict=False), [])
+
+    def test_iterators_stream_in_batches(self):
+        """iter_* 应分批产出与 get_* 相同的结果，提前关闭时归还只读连接"""
+        from src import database
+
+        subtitle_ids = self.db.create_subtitles(self.series_id, [
+            {'begin_time': i, 'end_time': i + 1, 'english_text': f"line {i}", 'chinese_text': "行"}
+            for i in range(5)
+        ])
+        for sid in subtitle_ids:
+            self.db.create_keywords(sid, [{'key_word': f"word{sid}", 'explain_text': "词"}])
+
+        original = database._FETCH_BATCH_SIZE
+        database._FETCH_BATCH_SIZE = 2
+        try:
+            self.assertEqual(list(self.db.iter_subtitles(self.series_id)), self.db.get_subtitles(self.series_id))
+            self.assertEqual(list(self.db.iter_keywords(series_id=self.series_id)),
+                             self.db.get_keywords(series_id=self.series_id))
+            self.assertEqual(len(list(self.db.iter_search_keywords("word"))), 5)
+            self.assertIsInstance(next(self.db.iter_subtitles(self.series_id, as_dict=False)), sqlite3.Row)
+
+            # 遍历字幕的同时查询每条字幕的关键词（字幕烧制的访问方式）
+            nested = [len(self.db.get_keywords(subtitle_id=s['id'])) for s in self.db.iter_subtitles(self.series_id)]
+            self.assertEqual(nested, [1] * 5)
+
+            iterator = self.db.iter_subtitles(self.series_id)
+            next(iterator)
+            iterator.close()
+            self.assertEqual(len(self.db.get_subtitles(self.series_id)), 5)
+        finally:
+            database._FETCH_BATCH_SIZE = original
+
+    def test_get_translation(self):
+        """翻译查询只返回中文文本，字幕不存在时返回None"""
+        subtitle_ids = self.db.create_subtitles(self.series_id, [
+            {'begin_time': 0, 'end_time': 1, 'english_text': "a", 'chinese_text': "甲"}
+        ])
+        self.assertEqual(self.db.get_translation(subtitle_ids[0]), {'text': "甲"})
+        self.assertIsNone(self.db.get_translation(subtitle_ids[0] + 100))
+
+    def test_search_keywords_short_and_explain_terms(self):
+        """短搜索词、非ASCII搜索词和解释搜索的结果应与直接 LIKE 一致"""
+        subtitle_ids = self.db.create_subtitles(self.series_id, [
+            {'begin_time': 0, 'end_time': 1, 'english_text': "apple café", 'chinese_text': "苹果"}
+        ])
+        self.db.create_keywords(subtitle_ids[0], [
+            {'key_word': "apple", 'explain_text': "苹果，一种水果", 'coca': 100},
+            {'key_word': "café", 'explain_text': "咖啡馆", 'coca': 100},
+        ])
+
+        def found(term, **kwargs):
+            return sorted(row['key_word'] for row in self.db.search_keywords(term, **kwargs))
+
+        self.assertEqual(found("fé"), ["café"])
+        self.assertEqual(found("水果"), [])
+        self.assertEqual(found("水果", include_explain=True), ["apple"])
+        self.assertEqual(found("一种水果", include_explain=True), ["apple"])
+        self.assertEqual(found("app", include_explain=True), ["apple"])
+        self.assertEqual(found("a_p"), ["apple"])
+
+    def test_search_keywords_uses_fts_index(self):
+        """三个字符以上的搜索词应通过全文索引筛选，而不是扫描 t_keywords"""
+        from src import database
+
+        self.assertTrue(self.db._use_keyword_fts("app"))
+        self.assertFalse(self.db._use_keyword_fts("ap"))
+        with self.db._connect() as conn:
+            for include_explain in (False, True):
+                params = ("%app%",) * (2 if include_explain else 1) + (-1, 0)
+                plan = " ".join(row[3] for row in conn.execute(
+                    "EXPLAIN QUERY PLAN " + database._SQL_SEARCH_VARIANTS[(True, include_explain)], params))
+                self.assertIn("t_keywords_fts VIRTUAL TABLE INDEX", plan)
+                self.assertNotIn("SCAN k", plan)
+
+    def test_search_keywords_pagination(self):
+        """limit/offset 分页结果应与完整结果的切片一致"""
+        subtitle_ids = self.db.create_subtitles(self.series_id, [
+            {'begin_time': i, 'end_time': i + 1, 'english_text': f"line {i}", 'chinese_text': "行"}
+            for i in range(3)
+        ])
+        for subtitle_id in subtitle_ids:
+            self.db.create_keywords(subtitle_id, [{'key_word': w, 'coca': 1} for w in ("apple", "apply", "maple")])
+
+        for term in ("app", "pl"):
+            full = self.db.search_keywords(term)
+            self.assertEqual(self.db.search_keywords(term, limit=4), full[:4])
+            self.assertEqual(self.db.search_keywords(term, limit=4, offset=4), full[4:8])
+            self.assertEqual(self.db.search_keywords(term, limit=0), [])
+        self.assertEqual(len(self.db.search_keywords("pl")), 9)
+
+    def test_default_coca_lookup_uses_own_database(self):
+        """未注入查询器时按本数据库的 t_coca 补全排名，而不是默认数据库的全局查询器"""
+        path = os.path.join(self.temp_dir, "coca.db")
+        with sqlite3.connect(path) as conn:
+            conn.execute("CREATE TABLE t_coca (word TEXT, rank INTEGER)")
+            conn.execute("INSERT INTO t_coca VALUES ('rare', 4321)")
+        db = DatabaseManager(path)
+        series_id = db.create_series("own.mp4")
+        subtitle_ids = db.create_subtitles(series_id, [
+            {'begin_time': 0, 'end_time': 1, 'english_text': "rare", 'chinese_text': "罕见"}
+        ])
+        db.create_keywords(subtitle_ids[0], [{'key_word': "rare"}])
+
+        self.assertEqual(db.get_keywords(subtitle_id=subtitle_ids[0])[0]['coca'], 4321)
+        self.assertEqual(db._coca_lookup.db_path, path)
+
+    def test_new_database_needs_no_migration(self):
+        """新建的数据库已包含全部迁移字段，初始化时不执行 ALTER TABLE"""
+        from src import database
+
+        statements = []
+        conn = sqlite3.connect(os.path.join(self.temp_dir, "fresh.db"), check_same_thread=False)
+        self.addCleanup(conn.close)
+        conn.set_trace_callback(statements.append)
+        DatabaseManager(os.path.join(self.temp_dir, "fresh.db"), conn=conn)
+        self.assertEqual([sql for sql in statements if 'ALTER TABLE' in sql], [])
+
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(t_series)")]
+        legacy_order = [column for table, column, _ in database._MIGRATION_COLUMNS if table == 't_series']
+        self.assertEqual(columns[-len(legacy_order):], legacy_order)
+
+    def test_init_skips_ddl_when_version_matches(self):
+        """数据库已是当前版本时，再次初始化不执行任何DDL"""
+        from src import database
+
+        with self.db._connect() as conn:
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], database._SCHEMA_VERSION)
+            statements = []
+            conn.set_trace_callback(statements.append)
+            try:
+                other = DatabaseManager(self.db.db_path)
+            finally:
+                conn.set_trace_callback(None)
+        self.assertEqual([sql for sql in statements if 'CREATE' in sql or 'ANALYZE' in sql], [])
+        self.assertEqual(statements[0], database._SQL_SCHEMA_STATE)
+        self.assertTrue(other._keyword_fts)
+        self.assertEqual(len(other.search_keywords("demo")), 0)
+
+    def test_versioned_upgrade_skips_column_migration(self):
+        """已设置过版本号的旧版本数据库升级时不再检查迁移字段"""
+        with self.db._connect() as conn:
+            conn.execute("PRAGMA user_version=2")
+        with patch.object(DatabaseManager, '_migrate_database') as migrate:
+            DatabaseManager(self.db.db_path)
+        migrate.assert_not_called()
+
+        with self.db._connect() as conn:
+            conn.execute("PRAGMA user_version=0")
+        with patch.object(DatabaseManager, '_migrate_database') as migrate:
+            DatabaseManager(self.db.db_path)
+        migrate.assert_called_once()
+
+    def test_failed_migration_keeps_version(self):
+        """字段迁移失败时回滚初始化事务，不写入版本号，下次初始化时重新迁移"""
+        from src import database
+
+        path = os.path.join(self.temp_dir, "broken.db")
+        broken = database._MIGRATION_COLUMNS + (('t_series', 'broken', 'TEXT UNIQUE'),)
+        with patch.object(database, '_MIGRATION_COLUMNS', broken):
+            with self.assertRaises(sqlite3.OperationalError):
+                DatabaseManager(path)
+        with sqlite3.connect(path) as conn:
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], 0)
+
+        with patch.object(DatabaseManager, '_migrate_database') as migrate:
+            DatabaseManager(path)
+        migrate.assert_called_once()
+        with sqlite3.connect(path) as conn:
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], database._SCHEMA_VERSION)
+
+    def test_coca_threshold_uses_partial_index(self):
+        """旧版本的单列 coca 索引升级时被 (subtitle_id, coca) 部分索引取代"""
+        with self.db._connect() as conn:
+            conn.execute("DROP INDEX idx_keywords_subid_coca_nn")
+            conn.execute("CREATE INDEX idx_keywords_coca ON t_keywords(coca)")
+            conn.execute("CREATE INDEX idx_keywords_coca_notnull ON t_keywords(coca) WHERE coca IS NOT NULL")
+            conn.execute("PRAGMA user_version=4")
+        DatabaseManager(self.db.db_path)
+
+        with self.db._connect() as conn:
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertNotIn("idx_keywords_coca", indexes)
+        self.assertNotIn("idx_keywords_coca_notnull", indexes)
+        self.assertIn("idx_keywords_subid_coca_nn", indexes)
+
+    def test_upgrades_keyword_only_fts(self):
+        """旧版只索引 key_word 的全文索引应被重建为包含 explain_text 的新结构"""
+        with sqlite3.connect(self.db.db_path) as conn:
+            conn.execute("DROP TABLE t_keywords_fts")
+            conn.execute("""
+                CREATE VIRTUAL TABLE t_keywords_fts USING fts5(
+                    key_word, content='t_keywords', content_rowid='id', tokenize='trigram'
+                )
+            """)
+            conn.execute("PRAGMA user_version = 0")
+        self.db._init_database()
+
+        with self.db._connect() as conn:
+            columns = [row[0] for row in conn.execute("SELECT name FROM pragma_table_info('t_keywords_fts')")]
+        self.assertEqual(columns, ['key_word', 'explain_text'])
+
+    def test_delete_series_cascades(self):
+        """开启外键约束后，删除系列会级联删除字幕、单词及其全文索引"""
+        subtitle_ids = self.db.create_subtitles(self.series_id, [
+            {'begin_time': 0, 'end_time': 1, 'english_text': "cascade", 'chinese_text': "级联"}
+        ])
+        self.db.create_keywords(subtitle_ids[0], [{'key_word': "cascade", 'coca': 100}])
+
+        self.assertTrue(self.db.delete_series(self.series_id))
+        self.assertEqual(self.db.get_subtitles(self.series_id), [])
+        self.assertEqual(self.db.get_keywords(), [])
+        self.assertEqual(self.db.search_keywords("cascade"), [])
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db.create_keywords(subtitle_ids[0], [{'key_word': "orphan", 'coca': 100}])
+
+    def test_delete_keywords_by_series_id(self):
+        """只删除该系列字幕下的单词；系列没有字幕时返回False"""
+        other_series = self.db.create_series("other.mp4")
+        subtitle_ids = self.db.create_subtitles(self.series_id, [
+            {'begin_time': 0, 'end_time': 1, 'english_text': "a", 'chinese_text': "甲"}
+        ])
+        other_ids = self.db.create_subtitles(other_series, [
+            {'begin_time': 0, 'end_time': 1, 'english_text': "b", 'chinese_text': "乙"}
+        ])
+        self.db.create_keywords(subtitle_ids[0], [{'key_word': "mine", 'coca': 1}])
+        self.db.create_keywords(other_ids[0], [{'key_word': "theirs", 'coca': 1}])
+
+        self.assertTrue(self.db.delete_keywords_by_series_id(self.series_id))
+        self.assertEqual([k['key_word'] for k in self.db.get_keywords()], ["theirs"])
+        # 没有单词可删时记录的是删除的行数0，而不是检查字幕的 SELECT 的 rowcount(-1)
+        from src import database
+        with patch.object(database.LOG, "info") as log_info:
+            self.assertTrue(self.db.delete_keywords_by_series_id(self.series_id))
+        self.assertIn("0条", log_info.call_args[0][0])
+        self.assertFalse(self.db.delete_keywords_by_series_id(self.db.create_series("empty.mp4")))
+
+    def test_delete_series_without_foreign_keys(self):
+        """未开启外键约束的连接上删除字幕或系列，也应删除相关单词及其全文索引"""
+        conn = sqlite3.connect(self.db.db_path, check_same_thread=False)
+        self.addCleanup(conn.close)
+        db = DatabaseManager(self.db.db_path, conn=conn, coca_lookup=self.coca)
+        self.assertEqual(conn.execute("PRAGMA foreign_keys").fetchone()[0], 0)
+
+        subtitle_ids = db.create_subtitles(self.series_id, [
+            {'begin_time': 0, 'end_time': 1, 'english_text': "explicit", 'chinese_text': "显式"}
+        ])
+        db.create_keywords(subtitle_ids[0], [{'key_word': "explicit", 'coca': 100}])
+
+        self.assertTrue(db.delete_subtitles_by_series_id(self.series_id))
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM t_keywords").fetchone()[0], 0)
+        subtitle_ids = db.create_subtitles(self.series_id, [
+            {'begin_time': 0, 'end_time': 1, 'english_text': "explicit", 'chinese_text': "显式"}
+        ])
+        db.create_keywords(subtitle_ids[0], [{'key_word': "explicit", 'coca': 100}])
+
+        self.assertTrue(db.delete_series(self.series_id))
+        self.assertFalse(db.delete_series(self.series_id))
+        for table in ("t_series", "t_subtitle", "t_keywords"):
+            self.assertEqual(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0], 0)
+        self.assertEqual(db.search_keywords("explicit"), [])
+
+    def test_series_queries_use_composite_indexes(self):
+        """按系列/字幕查询时应直接按复合索引顺序读取，不再单独排序"""
+        with self.db._connect() as conn:
+            plans = {
+                sql: " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, (1,)))
+                for sql in (
+                    "SELECT * FROM t_subtitle WHERE series_id = ? ORDER BY begin_time",
+                    "SELECT * FROM t_keywords WHERE subtitle_id = ? ORDER BY created_at",
+                )
+            }
+        for sql, plan in plans.items():
+            self.assertNotIn("TEMP B-TREE", plan, sql)
+        self.assertIn("idx_subtitle_series_begin", " ".join(plans.values()))
+        self.assertIn("idx_keywords_subtitle_created", " ".join(plans.values()))
+
+    def test_find_series_by_new_file_path(self):
+        """路径完全匹配优先，其次按文件名匹配 new_name，两个条件都走索引"""
+        from src import database
+
+        by_name = self.db.create_series("a.mp4")
+        self.db.update_series_video_info(by_name, new_name="clip.mp4", new_file_path="/old/clip.mp4")
+        by_path = self.db.create_series("b.mp4")
+        self.db.update_series_video_info(by_path, new_name="other.mp4", new_file_path="/new/clip.mp4")
+
+        self.assertEqual(self.db.find_series_by_new_file_path("/new/clip.mp4")['id'], by_path)
+        self.assertEqual(self.db.find_series_by_new_file_path("/moved/clip.mp4")['id'], by_name)
+        self.assertIsNone(self.db.find_series_by_new_file_path("/new/missing.mp4"))
+
+        with self.db._connect() as conn:
+            plan = " ".join(row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN " + database._SQL_SERIES_BY_NEW_FILE, ("p", "n", "p")))
+        self.assertIn("idx_series_new_file_path", plan)
+        self.assertIn("idx_series_new_name", plan)
+
+    def test_update_all_quotes_to_backticks(self):
+        """只改写含单引号的行，替换结果与写入时的清洗一致"""
+        subtitle_ids = self.db.create_subtitles(self.series_id, [
+            {'begin_time': 0, 'end_time': 1, 'english_text': "plain", 'chinese_text': "普通"},
+            {'begin_time': 1, 'end_time': 2, 'english_text': "quoted", 'chinese_text': "引号"},
+        ])
+        self.db.create_keywords(subtitle_ids[0], [{'key_word': "plain", 'coca': 1}, {'key_word': "odd", 'coca': 1}])
+        with self.db._transaction() as conn:
+            conn.execute("UPDATE t_subtitle SET english_text = ? WHERE id = ?", ("it's", subtitle_ids[1]))
+            conn.execute("UPDATE t_keywords SET explain_text = ? WHERE key_word = 'odd'", ("o'clock",))
+
+        result = self.db.update_all_quotes_to_backticks()
+        self.assertEqual((result['subtitle_count'], result['keyword_count']), (1, 1))
+        self.assertEqual(self.db.get_subtitle_by_id(subtitle_ids[1])['english_text'], "it`s")
+        self.assertEqual([k['explain_text'] for k in self.db.search_keywords("odd")], ["o`clock"])
+
+        # 再次执行时没有含单引号的行，不改写任何数据
+        with self.db._connect() as conn:
+            changes = conn.total_changes
+            result = self.db.update_all_quotes_to_backticks()
+            self.assertEqual(conn.total_changes, changes)
+        self.assertEqual((result['subtitle_count'], result['keyword_count']), (0, 0))
+
+    def test_batch_update_keyword_selection(self):
+        """all/none 更新系列内全部单词，cocaN 只按阈值更新有COCA排名的单词，其他系列不受影响"""
+        subtitle_id = self.db.create_subtitles(self.series_id, [
+            {'begin_time': 0, 'end_time': 1, 'english_text': "words", 'chinese_text': "词"}
+        ])[0]
+        self.db.create_keywords(subtitle_id, [
+            {'key_word': "common", 'coca': 100}, {'key_word': "middle", 'coca': 6000},
+            {'key_word': "rare", 'coca': 20000}, {'key_word': "unknown"},
+        ])
+        other = self.db.create_subtitles(self.db.create_series("other.mp4"), [
+            {'begin_time': 0, 'end_time': 1, 'english_text': "other", 'chinese_text': "其他"}
+        ])[0]
+        self.db.create_keywords(other, [{'key_word': "other", 'coca': 100}])
+
+        def selected():
+            return {k['key_word']: k['is_selected'] for k in self.db.get_keywords(series_id=self.series_id)}
+
+        # 只改写选中状态变化的单词，重复执行不再改写
+        self.assertEqual(self.db.batch_update_keyword_selection(self.series_id, "all")['updated_count'], 2)
+        self.assertEqual(self.db.batch_update_keyword_selection(self.series_id, "all")['updated_count'], 0)
+        self.assertEqual(set(selected().values()), {1})
+        with self.db._connect() as conn:
+            changes = conn.total_changes
+            self.assertEqual(self.db.batch_update_keyword_selection(self.series_id, "coca10000")['updated_count'], 2)
+            # 两条语句的 rowcount 之和与连接记录的实际改写行数一致
+            self.assertEqual(conn.total_changes - changes, 2)
+        self.assertEqual(selected(), {"common": 0, "middle": 0, "rare": 1, "unknown": 1})
+        self.db.batch_update_keyword_selection(self.series_id, "none")
+        self.db.batch_update_keyword_selection(self.series_id, "coca5000")
+        self.assertEqual(selected(), {"common": 0, "middle": 1, "rare": 1, "unknown": 0})
+        self.assertEqual([k['is_selected'] for k in self.db.get_keywords(subtitle_id=other)], [0])
+        self.assertFalse(self.db.batch_update_keyword_selection(self.series_id, "bogus")['success'])
+
+    def test_update_series_video_info_keeps_missing_fields(self):
+        """只更新传入的字段，未传入的字段保持原值"""
+        self.assertTrue(self.db.update_series_video_info(self.series_id, new_name="new.mp4", third_file_path="/t.mp4"))
+        self.assertTrue(self.db.update_series_video_info(self.series_id, new_file_path="/new.mp4"))
+        series = self.db.get_series(self.series_id)[0]
+        self.assertEqual((series['new_name'], series['new_file_path'], series['third_file_path'], series['first_name']),
+                         ("new.mp4", "/new.mp4", "/t.mp4", None))
+
+        self.assertFalse(self.db.update_series_video_info(self.series_id))
+        self.assertFalse(self.db.update_series_video_info(-1, new_name="missing.mp4"))
+
+    def test_create_keywords_across_subtitles(self):
+        """每个单词自带字幕ID时一次写入多条字幕的单词，没有字幕ID的单词被跳过"""
+        subtitle_ids = self.db.create_subtitles(self.series_id, [
+            {'begin_time': i, 'end_time': i + 1, 'english_text': f"line {i}", 'chinese_text': "行"} for i in range(2)
+        ])
+        ids = self.db.create_keywords(None, [
+            {'subtitle_id': subtitle_ids[1], 'key_word': "rare"},
+            {'subtitle_id': subtitle_ids[0], 'key_word': "the", 'coca': 1},
+            {'subtitle_id': None, 'key_word': "lost"},
+        ])
+        self.assertEqual(len(ids), 2)
+        rows = {row['key_word']: row for row in self.db.get_keywords(series_id=self.series_id)}
+        self.assertEqual(set(rows), {"rare", "the"})
+        self.assertEqual((rows["rare"]['subtitle_id'], rows["rare"]['coca']), (subtitle_ids[1], 12000))
+        self.assertEqual(rows["the"]['subtitle_id'], subtitle_ids[0])
+
+    def test_update_keywords_coca(self):
+        """批量更新COCA排名只写入给定的行，空列表不开启事务"""
+        subtitle_ids = self.db.create_subtitles(self.series_id, [
+            {'begin_time': 0, 'end_time': 1, 'english_text': "alpha beta", 'chinese_text': "甲乙"}
+        ])
+        ids = self.db.create_keywords(subtitle_ids[0], [{'key_word': "alpha"}, {'key_word': "beta"}])
+        self.assertEqual(self.db.update_keywords_coca([(1200, ids[0]), (300, ids[1]), (5, -1)]), 2)
+        coca = {k['id']: k['coca'] for k in self.db.get_keywords(subtitle_id=subtitle_ids[0])}
+        self.assertEqual((coca[ids[0]], coca[ids[1]]), (1200, 300))
+        self.assertEqual(self.db.update_keywords_coca([]), 0)
+
+        # 后续批次复用已打开的共享连接，不再新建连接
+        with patch("sqlite3.connect", side_effect=AssertionError("opened a new connection")):
+            self.assertEqual(self.db.update_keywords_coca([(1300, ids[0])]), 1)
+
+    def test_batch_update_keyword_selection_many(self):
+        """多个系列在一个事务中按同一规则更新，未列出的系列不受影响"""
+        series_ids = [self.series_id] + self.db.create_series_batch([{'name': "b.mp4"}, {'name': "c.mp4"}])
+        for series_id in series_ids:
+            subtitle_id = self.db.create_subtitles(series_id, [
+                {'begin_time': 0, 'end_time': 1, 'english_text': "x", 'chinese_text': "甲"}
+            ])[0]
+            self.db.create_keywords(subtitle_id, [{'key_word': "common", 'coca': 100}, {'key_word': "rare", 'coca': 20000}])
+
+        statements = []
+        with self.db._connect() as conn:
+            conn.set_trace_callback(statements.append)
+            try:
+                result = self.db.batch_update_keyword_selection_many(series_ids[:2], "all")
+            finally:
+                conn.set_trace_callback(None)
+        self.assertEqual(result['updated_count'], 2)
+        self.assertEqual([sql for sql in statements if sql in ("BEGIN IMMEDIATE", "COMMIT")], ["BEGIN IMMEDIATE", "COMMIT"])
+        self.assertEqual([[k['is_selected'] for k in self.db.get_keywords(series_id=s)] for s in series_ids],
+                         [[1, 1], [1, 1], [0, 1]])
+        self.assertEqual(self.db.batch_update_keyword_selection_many([], "none")['updated_count'], 0)
+        self.assertFalse(self.db.batch_update_keyword_selection_many(series_ids, "bogus")['success'])
+
+    def test_check_query_plans_reports_table_scans(self):
+        """调试模式下初始化时检查查询计划，索引缺失导致整表扫描时给出对应语句"""
+        self.assertEqual(self.db._check_query_plans(), [])
+        with patch.dict(os.environ, {"DEBUG": "1"}), \
+                patch.object(DatabaseManager, '_check_query_plans', return_value=[]) as check:
+            DatabaseManager(self.db.db_path)
+        check.assert_called_once()
+
+        with self.db._connect() as conn:
+            conn.execute("DROP INDEX idx_keywords_subtitle_created")
+            conn.execute("DROP INDEX idx_keywords_subid_coca_nn")
+        # EXPLAIN 语句不校验表结构版本，改用新连接，避免复用共享连接缓存的旧计划
+        fresh = sqlite3.connect(self.db.db_path, check_same_thread=False)
+        self.addCleanup(fresh.close)
+        regressed = DatabaseManager(self.db.db_path, conn=fresh)._check_query_plans()
+        self.assertEqual(len(regressed), 4)
+
+    def test_batch_selection_threshold_boundaries(self):
+        """cocaN 规则选中排名严格大于阈值的单词，与 CASE WHEN coca > N 的结果一致"""
+        from src import database
+
+        subtitle_id = self.db.create_subtitles(self.series_id, [
+            {'begin_time': 0, 'end_time': 1, 'english_text': "edge", 'chinese_text': "边界"}
+        ])[0]
+        ranks = [4999, 5000, 5001, 9999, 10000, 10001, None]
+        self.db.create_keywords(subtitle_id, [{'key_word': f"w{i}", 'coca': rank} for i, rank in enumerate(ranks)])
+
+        for rule, statements in database._SELECTION_RULES.items():
+            if not rule.startswith("coca"):
+                continue
+            threshold = statements[0][1]
+            self.db.batch_update_keyword_selection(self.series_id, "none")
+            self.db.batch_update_keyword_selection(self.series_id, rule)
+            expected = [int(rank is not None and rank > threshold) for rank in ranks]
+            self.assertEqual([k['is_selected'] for k in self.db.get_keywords(subtitle_id=subtitle_id)], expected, rule)
+
+    def test_batch_selection_runs_in_immediate_transaction(self):
+        """批量选择在 BEGIN IMMEDIATE 事务中执行，连接使用WAL和 synchronous=NORMAL"""
+        statements = []
+        with self.db._connect() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # 1 = NORMAL
+            conn.set_trace_callback(statements.append)
+            try:
+                self.db.batch_update_keyword_selection(self.series_id, "coca5000")
+            finally:
+                conn.set_trace_callback(None)
+        self.assertEqual(statements[0], "BEGIN IMMEDIATE")
+        self.assertEqual(statements[-1], "COMMIT")
+        self.assertEqual(len(statements), 4)
+
+    def test_batch_selection_uses_indexes(self):
+        """批量选择的系列字幕ID只物化一次，再按字幕ID索引查找单词，不扫描整张单词表"""
+        from src import database
+
+        with self.db._connect() as conn:
+            for statements in database._SELECTION_RULES.values():
+                for sql, value in statements:
+                    plan = " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, (value, 1)))
+                    self.assertIn("LIST SUBQUERY", plan)
+                    self.assertIn("SEARCH t_subtitle USING COVERING INDEX idx_subtitle_series_begin", plan)
+                    # 按阈值筛选时同时用字幕ID和词频范围定位单词
+                    index = "idx_keywords_subid_coca_nn" if "coca" in sql else "idx_keywords_subtitle_created"
+                    self.assertIn(f"SEARCH t_keywords USING INDEX {index}", plan)
+                    self.assertNotIn("SCAN", plan)
+
+    def test_keyword_coca_update_and_series_read_use_indexes(self):
+        """按ID更新COCA排名走rowid查找，按系列读取单词经字幕索引连接，都不扫描整表"""
+        from src import database
+
+        with self.db._connect() as conn:
+            plan = " ".join(row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN " + database._SQL_UPDATE_KEYWORD_COCA, (1, 1)))
+            self.assertIn("SEARCH t_keywords USING INTEGER PRIMARY KEY (rowid=?)", plan)
+
+            plan = " ".join(row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN " + database._SQL_KEYWORDS_BY_SERIES, (1, -1, 0)))
+            self.assertIn("USING INDEX idx_subtitle_series_begin", plan)
+            self.assertIn("USING INDEX idx_keywords_subtitle_created", plan)
+            self.assertNotIn("SCAN", plan)
+
+    def test_get_statistics(self):
+        """统计信息应覆盖各表记录数、独特单词数和总时长"""
+        self.assertEqual(self.db.get_statistics()['total_duration'], 0)
+
+        self.db.create_series("other.mp4", duration=12.5)
+        subtitle_ids = self.db.create_subtitles(self.series_id, [
+            {'begin_time': 0, 'end_time': 1, 'english_text': "a", 'chinese_text': "甲"},
+            {'begin_time': 1, 'end_time': 2, 'english_text': "b", 'chinese_text': "乙"},
+        ])
+        self.db.create_keywords(subtitle_ids[0], [{'key_word': "word"}, {'key_word': "word"}, {'key_word': "term"}])
+
+        self.assertEqual(self.db.get_statistics(), {
+            'series_count': 2,
+            'subtitle_count': 2,
+            'keyword_count': 3,
+            'unique_words': 2,
+            'total_duration': 12.5
+        })
+
+    def test_unique_word_count_uses_index(self):
+        """统计独特单词数时应只扫描 key_word 覆盖索引，统计所用的只读连接临时数据放在内存中"""
+        from src import database
+
+        with self.db._reader() as conn:
+            plan = " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + database._SQL_STATISTICS))
+            temp_store = conn.execute("PRAGMA temp_store").fetchone()[0]
+        self.assertIn("COVERING INDEX idx_keywords_word", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+        self.assertEqual(temp_store, 2)  # 2 = MEMORY
+
+    def test_global_manager_is_created_lazily(self):
+        """全局实例在首次访问时才创建，之后重复使用同一个实例"""
+        from src import database
+
+        created = []
+        with patch.object(database, '_db_manager', None), \
+                patch.object(database, 'DatabaseManager', side_effect=lambda: created.append(object()) or created[-1]):
+            self.assertEqual(created, [])
+            manager = database.get_db_manager()
+            self.assertIs(database.db_manager, manager)
+            self.assertIs(database.get_db_manager(), manager)
+        self.assertEqual(len(created), 1)
+        with self.assertRaises(AttributeError):
+            database.no_such_attribute
+
+    def test_migrates_legacy_schema(self):
+        """旧版数据库应补齐缺失字段，并按coca值初始化is_selected"""
+        legacy_path = os.path.join(self.temp_dir, "legacy.db")
+        with sqlite3.connect(legacy_path) as conn:
+            conn.executescript("""
+                CREATE TABLE t_series (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,
+                    file_path TEXT, file_type TEXT, duration REAL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+                CREATE TABLE t_subtitle (id INTEGER PRIMARY KEY AUTOINCREMENT, series_id INTEGER NOT NULL,
+                    begin_time REAL NOT NULL, end_time REAL NOT NULL, english_text TEXT, chinese_text TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+                CREATE TABLE t_keywords (id INTEGER PRIMARY KEY AUTOINCREMENT, subtitle_id INTEGER NOT NULL,
+                    key_word TEXT NOT NULL, phonetic_symbol TEXT, explain_text TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, coca INTEGER);
+                INSERT INTO t_series (name) VALUES ('old.mp4');
+                INSERT INTO t_subtitle (series_id, begin_time, end_time) VALUES (1, 0, 1);
+                INSERT INTO t_keywords (subtitle_id, key_word, coca) VALUES (1, 'rare', 8000), (1, 'the', 1), (2, 'orphan', 5);
+                UPDATE t_keywords SET created_at = '2024-01-02 03:04:05' WHERE key_word = 'rare';
+            """)
+
+        DatabaseManager(legacy_path)
+
+        with sqlite3.connect(legacy_path) as conn:
+            series_columns = {row[1] for row in conn.execute("PRAGMA table_info(t_series)")}
+            selected = dict(conn.execute("SELECT key_word, is_selected FROM t_keywords"))
+            strict = conn.execute("SELECT strict FROM pragma_table_list WHERE name = 't_keywords'").fetchone()[0]
+            sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 't_keywords'").fetchone()[0]
+            created_at = dict(conn.execute("SELECT key_word, created_at FROM t_keywords"))
+            orphaned = conn.execute("SELECT id, subtitle_id, key_word, coca FROM t_keywords_orphaned").fetchall()
+        self.assertTrue({'new_name', 'first_file_path', 'third_file_path'} <= series_columns)
+        # 孤立单词（字幕已不存在）重建为 STRICT 表时移到 t_keywords_orphaned，AUTOINCREMENT 序号保持不变
+        self.assertEqual(selected, {'rare': 1, 'the': 0})
+        self.assertEqual(orphaned, [(3, 2, 'orphan', 5)])
+        self.assertEqual(strict, 1)
+        self.assertEqual(sequence, 3)
+        # 文本时间转换为秒级时间戳
+        self.assertEqual(created_at['rare'], 1704164645)
+        self.assertIsInstance(created_at['the'], int)
+
+        legacy = DatabaseManager(legacy_path)
+        self.assertEqual([k['key_word'] for k in legacy.search_keywords("rar")], ['rare'])
+        self.assertEqual(legacy.create_keywords(1, [{'key_word': "new", 'coca': 1}]), [4])
+        self.assertIsInstance(legacy.get_keywords(subtitle_id=1)[-1]['created_at'], int)
+
+if __name__ == "__main__":
+    unittest.main()
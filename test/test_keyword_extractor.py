@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+测试KeywordExtractor批量并发提取的取消行为（不发出真实的API请求）
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.append(os.path.join(project_root, 'src'))
+
+try:
+    from keyword_extractor import KeywordExtractor, _MAX_CONCURRENT_REQUESTS
+except ImportError:  # 依赖openai/gradio，未安装时跳过
+    KeywordExtractor = None
+
+@unittest.skipIf(KeywordExtractor is None, "缺少关键词提取模块的依赖")
+class TestBatchCancellation(unittest.TestCase):
+    """批次并发提取：提前结束时不再发出剩余请求"""
+
+    def setUp(self):
+        # 绕过 __init__，不需要API客户端
+        self.extractor = KeywordExtractor.__new__(KeywordExtractor)
+        self.subtitles = [{'id': i, 'english_text': f"line {i}"} for i in range(40)]
+        self.started = []
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def fake_extract(self, text):
+        """第一个请求立即返回，其余请求阻塞到测试放行"""
+        self.started.append(text)
+        if len(self.started) > 1:
+            self.release.wait(5)
+        return []
+
+    def test_closing_generator_cancels_pending_batches(self):
+        """生成器提前关闭后，排队中的批次不再开始，close() 不等待进行中的请求"""
+        with patch.object(self.extractor, 'extract_keywords_from_text', side_effect=self.fake_extract):
+            batches = self.extractor.iter_extract_batches(self.subtitles, batch_size=1)
+            done, total, keywords = next(batches)
+            self.assertEqual((done, total, keywords), (1, 40, []))
+
+            start = time.monotonic()
+            batches.close()
+            self.assertLess(time.monotonic() - start, 1)
+
+            self.release.set()
+            time.sleep(0.2)
+        # 关闭时最多已有一轮并发请求在进行，第一个请求返回后还可能多取一个批次
+        self.assertLessEqual(len(self.started), _MAX_CONCURRENT_REQUESTS + 1)
+
+    def test_failed_batch_raises_without_waiting(self):
+        """第一个批次出错时立即抛出异常，并取消尚未开始的批次"""
+        def failing_extract(text):
+            self.started.append(text)
+            if text == "line 0":
+                raise RuntimeError("rate limited")
+            self.release.wait(5)
+            return []
+
+        with patch.object(self.extractor, 'extract_keywords_from_text', side_effect=failing_extract):
+            start = time.monotonic()
+            with self.assertRaises(RuntimeError):
+                self.extractor.batch_extract_with_context(self.subtitles, batch_size=1)
+            self.assertLess(time.monotonic() - start, 1)
+
+            self.release.set()
+            time.sleep(0.2)
+        self.assertLessEqual(len(self.started), _MAX_CONCURRENT_REQUESTS + 1)
+
+if __name__ == "__main__":
+    unittest.main()